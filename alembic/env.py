@@ -6,9 +6,8 @@ from alembic import context
 # Load environment variables from .env if present
 from pydantic_settings import BaseSettings
 
-from database import sync_engine, Base
+from database import Base
 
-connectable = sync_engine
 target_metadata = Base.metadata
 
 
@@ -40,6 +39,14 @@ from main_app import models
 
 target_metadata = models.Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip read models that are managed as materialized views, not tables"""
+    if type_ == "table" and object.info.get("is_view"):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -64,6 +71,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -85,7 +93,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
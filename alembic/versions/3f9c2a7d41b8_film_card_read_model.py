@@ -0,0 +1,65 @@
+"""film card read model
+
+Revision ID: 3f9c2a7d41b8
+Revises: 0b1e6adca222
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, Sequence[str], None] = '0b1e6adca222'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One denormalized row per film: card columns, genre ids/names and the first actors
+    op.execute("""
+        CREATE MATERIALIZED VIEW content.film_card AS
+        SELECT fw.id,
+               fw.title,
+               fw.rating,
+               fw.type,
+               fw.creation_date,
+               fw.modified,
+               COALESCE(g.genre_ids, ARRAY[]::uuid[]) AS genre_ids,
+               COALESCE(g.genres, ARRAY[]::text[]) AS genres,
+               COALESCE(c.top_cast, '[]'::jsonb) AS top_cast
+        FROM content.film_work fw
+        LEFT JOIN LATERAL (
+            SELECT array_agg(gn.id ORDER BY gn.name) AS genre_ids,
+                   array_agg(gn.name ORDER BY gn.name) AS genres
+            FROM content.genre_film_work gfw
+            JOIN content.genre gn ON gn.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+        ) g ON true
+        LEFT JOIN LATERAL (
+            SELECT jsonb_agg(jsonb_build_object('uuid', a.id, 'full_name', a.full_name)
+                             ORDER BY a.created, a.full_name) AS top_cast
+            FROM (
+                SELECT p.id, p.full_name, pfw.created
+                FROM content.person_film_work pfw
+                JOIN content.person p ON p.id = pfw.person_id
+                WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+                ORDER BY pfw.created, p.full_name
+                LIMIT 5
+            ) a
+        ) c ON true
+        WITH DATA;
+    """)
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX film_card_id_idx ON content.film_card (id);")
+    op.execute("CREATE INDEX film_card_rating_idx ON content.film_card (rating DESC NULLS LAST, id);")
+    op.execute("CREATE INDEX film_card_genre_ids_idx ON content.film_card USING gin (genre_ids);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS content.film_card;")
@@ -0,0 +1,44 @@
+"""film similarity
+
+Revision ID: 4a8d2f61c9e3
+Revises: e71b4c0a9d26
+Create Date: 2026-10-19 16:37:12.095481
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8d2f61c9e3'
+down_revision: Union[str, Sequence[str], None] = 'e71b4c0a9d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'film_similarity',
+        sa.Column('film_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('similar_film_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('score', sa.REAL(), nullable=False),
+        sa.ForeignKeyConstraint(['film_id'], ['content.film_work.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['similar_film_id'], ['content.film_work.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('film_id', 'similar_film_id'),
+        schema='content'
+    )
+    # GET /films/{id}/similar/ reads one film's rows best first straight from this index
+    op.execute("CREATE INDEX film_similarity_film_score_idx ON content.film_similarity (film_id, score DESC);")
+    # Cascaded deletes from film_work look rows up by the referencing column
+    op.execute("CREATE INDEX film_similarity_similar_film_idx ON content.film_similarity (similar_film_id);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('film_similarity_similar_film_idx', table_name='film_similarity', schema='content')
+    op.drop_index('film_similarity_film_score_idx', table_name='film_similarity', schema='content')
+    op.drop_table('film_similarity', schema='content')
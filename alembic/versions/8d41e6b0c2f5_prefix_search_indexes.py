@@ -0,0 +1,31 @@
+"""prefix search indexes
+
+Revision ID: 8d41e6b0c2f5
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 10:03:27.541930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b0c2f5'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # text_pattern_ops lets lower(col) LIKE 'prefix%' use a btree range scan
+    op.execute("CREATE INDEX film_work_title_prefix_idx ON content.film_work (lower(title) text_pattern_ops);")
+    op.execute("CREATE INDEX person_full_name_prefix_idx ON content.person (lower(full_name) text_pattern_ops);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('person_full_name_prefix_idx', table_name='person', schema='content')
+    op.drop_index('film_work_title_prefix_idx', table_name='film_work', schema='content')
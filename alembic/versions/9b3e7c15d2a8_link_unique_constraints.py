@@ -0,0 +1,49 @@
+"""link unique constraints
+
+Revision ID: 9b3e7c15d2a8
+Revises: 4a8d2f61c9e3
+Create Date: 2026-10-19 18:21:40.512903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e7c15d2a8'
+down_revision: Union[str, Sequence[str], None] = '4a8d2f61c9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> (constraint name, columns identifying one link)
+CONSTRAINTS = {
+    'genre_film_work': ('genre_film_work_film_genre_key', ('film_work_id', 'genre_id')),
+    'person_film_work': ('person_film_work_film_person_role_key', ('film_work_id', 'person_id', 'role')),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (name, columns) in CONSTRAINTS.items():
+        # Keep the first row of each duplicated link so its billing order survives
+        op.execute(f"""
+            DELETE FROM content.{table} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY {', '.join(columns)} ORDER BY created NULLS LAST, id
+                    ) AS duplicate_rank
+                    FROM content.{table}
+                ) ranked
+                WHERE duplicate_rank > 1
+            );
+        """)
+        # The constraint's index also serves film -> links lookups and ON CONFLICT
+        op.create_unique_constraint(name, table, list(columns), schema='content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (name, _) in CONSTRAINTS.items():
+        op.drop_constraint(name, table, type_='unique', schema='content')
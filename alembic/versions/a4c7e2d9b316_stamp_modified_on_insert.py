@@ -0,0 +1,46 @@
+"""stamp modified on insert
+
+Revision ID: a4c7e2d9b316
+Revises: d8b4e1f7a295
+Create Date: 2026-10-20 00:12:38.540917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2d9b316'
+down_revision: Union[str, Sequence[str], None] = 'd8b4e1f7a295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables of the change feed (see c5e2a9d7f314)
+TABLES = ('film_work', 'person', 'genre')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows inserted by raw SQL or bulk loads without modified were invisible to the feed,
+    # and ORM inserts were stamped with the app clock while the settle horizon uses the DB clock
+    for table in TABLES:
+        op.execute(f"UPDATE content.{table} SET modified = COALESCE(created, timezone('utc', now())) WHERE modified IS NULL;")
+        op.alter_column(table, 'modified', server_default=sa.text("timezone('utc', now())"), schema='content')
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_modified ON content.{table};")
+        op.execute(f"""
+            CREATE TRIGGER {table}_touch_modified BEFORE INSERT OR UPDATE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.touch_modified();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_modified ON content.{table};")
+        op.execute(f"""
+            CREATE TRIGGER {table}_touch_modified BEFORE UPDATE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.touch_modified();
+        """)
+        op.alter_column(table, 'modified', server_default=None, schema='content')
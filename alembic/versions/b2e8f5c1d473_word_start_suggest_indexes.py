@@ -0,0 +1,33 @@
+"""word start suggest indexes
+
+Revision ID: b2e8f5c1d473
+Revises: a4c7e2d9b316
+Create Date: 2026-10-20 00:48:15.731062
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8f5c1d473'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e2d9b316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The suggest fallback also matches word starts (lower(col) ~ '\mprefix'), which
+    # text_pattern_ops cannot serve; trigram GIN indexes can
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.execute("CREATE INDEX film_work_title_trgm_idx ON content.film_work USING gin (lower(title) gin_trgm_ops);")
+    op.execute("CREATE INDEX person_full_name_trgm_idx ON content.person USING gin (lower(full_name) gin_trgm_ops);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('person_full_name_trgm_idx', table_name='person', schema='content')
+    op.drop_index('film_work_title_trgm_idx', table_name='film_work', schema='content')
@@ -0,0 +1,79 @@
+"""change feed
+
+Revision ID: c5e2a9d7f314
+Revises: 8d41e6b0c2f5
+Create Date: 2026-10-19 14:21:06.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a9d7f314'
+down_revision: Union[str, Sequence[str], None] = '8d41e6b0c2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Change feed entity name of each table
+TABLES = {'film_work': 'film', 'person': 'person', 'genre': 'genre'}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tombstone',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('entity_type', sa.Text(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        schema='content'
+    )
+    op.execute("CREATE INDEX tombstone_deleted_at_idx ON content.tombstone (deleted_at, id);")
+
+    # Deletes are recorded whatever issued them (API, cascades, manual SQL)
+    op.execute("""
+        CREATE FUNCTION content.record_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO content.tombstone (entity_type, entity_id) VALUES (TG_ARGV[0], OLD.id);
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Updates made outside the ORM (which sets modified itself) must move the row in the feed too
+    op.execute("""
+        CREATE FUNCTION content.touch_modified() RETURNS trigger AS $$
+        BEGIN
+            NEW.modified := timezone('utc', now());
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table, entity in TABLES.items():
+        op.execute(f"UPDATE content.{table} SET modified = COALESCE(created, timezone('utc', now())) WHERE modified IS NULL;")
+        op.execute(f"CREATE INDEX {table}_modified_id_idx ON content.{table} (modified, id);")
+        op.execute(f"""
+            CREATE TRIGGER {table}_tombstone AFTER DELETE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.record_tombstone('{entity}');
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_touch_modified BEFORE UPDATE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.touch_modified();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_modified ON content.{table};")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_tombstone ON content.{table};")
+        op.drop_index(f'{table}_modified_id_idx', table_name=table, schema='content')
+    op.execute("DROP FUNCTION IF EXISTS content.touch_modified();")
+    op.execute("DROP FUNCTION IF EXISTS content.record_tombstone();")
+    op.drop_index('tombstone_deleted_at_idx', table_name='tombstone', schema='content')
+    op.drop_table('tombstone', schema='content')
@@ -0,0 +1,32 @@
+"""film card rating order
+
+Revision ID: d8b4e1f7a295
+Revises: f3a7c9e2b614
+Create Date: 2026-10-19 23:41:06.218735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4e1f7a295'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c9e2b614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same order as the "-rating" card list (rating DESC, id DESC; NULL ratings first),
+    # so it is read by an ordered index scan; "rating" scans it backwards
+    op.execute("DROP INDEX IF EXISTS content.film_card_rating_idx;")
+    op.execute("CREATE INDEX film_card_rating_idx ON content.film_card (rating DESC, id DESC);")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS content.film_card_rating_idx;")
+    op.execute("CREATE INDEX film_card_rating_idx ON content.film_card (rating DESC NULLS LAST, id);")
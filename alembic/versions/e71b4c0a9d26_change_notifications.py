@@ -0,0 +1,65 @@
+"""change notifications
+
+Revision ID: e71b4c0a9d26
+Revises: c5e2a9d7f314
+Create Date: 2026-10-19 15:02:44.817330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e71b4c0a9d26'
+down_revision: Union[str, Sequence[str], None] = 'c5e2a9d7f314'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> (entity type, id column) pairs announced for each changed row.
+# Link rows announce an update of the entities on both sides.
+TRIGGERS = {
+    'film_work': ('FilmWork', 'id'),
+    'person': ('Person', 'id'),
+    'genre': ('Genre', 'id'),
+    'genre_film_work': ('FilmWork', 'film_work_id', 'Genre', 'genre_id'),
+    'person_film_work': ('FilmWork', 'film_work_id', 'Person', 'person_id'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY is delivered on commit, so listeners never see rolled back writes
+    op.execute("""
+        CREATE FUNCTION content.notify_change() RETURNS trigger AS $$
+        DECLARE
+            changed_row jsonb := CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE to_jsonb(NEW) END;
+            operation text := CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END;
+            i integer := 0;
+        BEGIN
+            WHILE i < TG_NARGS LOOP
+                PERFORM pg_notify('content_changes', json_build_object(
+                    'type', TG_ARGV[i],
+                    'id', changed_row ->> TG_ARGV[i + 1],
+                    'op', CASE WHEN TG_ARGV[i + 1] = 'id' THEN operation ELSE 'update' END
+                )::text);
+                i := i + 2;
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table, arguments in TRIGGERS.items():
+        quoted = ", ".join(f"'{argument}'" for argument in arguments)
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_change AFTER INSERT OR UPDATE OR DELETE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.notify_change({quoted});
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON content.{table};")
+    op.execute("DROP FUNCTION IF EXISTS content.notify_change();")
@@ -0,0 +1,119 @@
+"""statement change notifications
+
+Revision ID: f3a7c9e2b614
+Revises: 9b3e7c15d2a8
+Create Date: 2026-10-19 22:17:53.604128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c9e2b614'
+down_revision: Union[str, Sequence[str], None] = '9b3e7c15d2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> (entity type, id column) pairs announced for each changed row, as in e71b4c0a9d26.
+# Link rows announce an update of the entities on both sides.
+TRIGGERS = {
+    'film_work': ('FilmWork', 'id'),
+    'person': ('Person', 'id'),
+    'genre': ('Genre', 'id'),
+    'genre_film_work': ('FilmWork', 'film_work_id', 'Genre', 'genre_id'),
+    'person_film_work': ('FilmWork', 'film_work_id', 'Person', 'person_id'),
+}
+
+# Statement event -> transition table it reads; one trigger per event because
+# Postgres only allows transition tables on single-event triggers
+EVENTS = {
+    'INSERT': 'NEW TABLE AS changed_rows',
+    'UPDATE': 'NEW TABLE AS changed_rows',
+    'DELETE': 'OLD TABLE AS changed_rows',
+}
+
+# Matches BaseService.BULK_NOTIFY_LIMIT: more distinct entities than this in one
+# statement are announced as a single flush
+BULK_NOTIFY_LIMIT = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON content.{table};")
+    op.execute("DROP FUNCTION IF EXISTS content.notify_change();")
+
+    # One notification per distinct entity and statement instead of one per row
+    op.execute(f"""
+        CREATE FUNCTION content.notify_changes() RETURNS trigger AS $$
+        DECLARE
+            operation text := CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END;
+            changed_ids uuid[];
+            changed_id uuid;
+            i integer := 0;
+        BEGIN
+            WHILE i < TG_NARGS LOOP
+                EXECUTE format('SELECT array_agg(DISTINCT %I) FROM changed_rows', TG_ARGV[i + 1]) INTO changed_ids;
+                IF cardinality(changed_ids) > {BULK_NOTIFY_LIMIT} THEN
+                    PERFORM pg_notify('content_changes', json_build_object('type', TG_ARGV[i], 'op', 'flush')::text);
+                ELSE
+                    FOREACH changed_id IN ARRAY COALESCE(changed_ids, ARRAY[]::uuid[]) LOOP
+                        PERFORM pg_notify('content_changes', json_build_object(
+                            'type', TG_ARGV[i],
+                            'id', changed_id,
+                            'op', CASE WHEN TG_ARGV[i + 1] = 'id' THEN operation ELSE 'update' END
+                        )::text);
+                    END LOOP;
+                END IF;
+                i := i + 2;
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table, arguments in TRIGGERS.items():
+        quoted = ", ".join(f"'{argument}'" for argument in arguments)
+        for event, transition in EVENTS.items():
+            op.execute(f"""
+                CREATE TRIGGER {table}_notify_{event.lower()} AFTER {event} ON content.{table}
+                REFERENCING {transition}
+                FOR EACH STATEMENT EXECUTE FUNCTION content.notify_changes({quoted});
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TRIGGERS:
+        for event in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event.lower()} ON content.{table};")
+    op.execute("DROP FUNCTION IF EXISTS content.notify_changes();")
+
+    # Row-level triggers of e71b4c0a9d26
+    op.execute("""
+        CREATE FUNCTION content.notify_change() RETURNS trigger AS $$
+        DECLARE
+            changed_row jsonb := CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE to_jsonb(NEW) END;
+            operation text := CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END;
+            i integer := 0;
+        BEGIN
+            WHILE i < TG_NARGS LOOP
+                PERFORM pg_notify('content_changes', json_build_object(
+                    'type', TG_ARGV[i],
+                    'id', changed_row ->> TG_ARGV[i + 1],
+                    'op', CASE WHEN TG_ARGV[i + 1] = 'id' THEN operation ELSE 'update' END
+                )::text);
+                i := i + 2;
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table, arguments in TRIGGERS.items():
+        quoted = ", ".join(f"'{argument}'" for argument in arguments)
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_change AFTER INSERT OR UPDATE OR DELETE ON content.{table}
+            FOR EACH ROW EXECUTE FUNCTION content.notify_change({quoted});
+        """)
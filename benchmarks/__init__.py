@@ -0,0 +1 @@
+# Benchmark suites (not collected by pytest)
@@ -0,0 +1,83 @@
+"""Build time, memory and query latency of the person collaboration graph.
+
+A synthetic credit table is generated (films with a long-tailed cast size,
+persons drawn with a popularity skew) and loaded into the CSR snapshot used
+by ``/persons/{id}/collaborators/`` and ``/persons/{a}/path/{b}/``::
+
+    python -m benchmarks.collaboration_graph --films 200000 --persons 500000 --credits 12
+
+Memory is reported per million edges so results compare across sizes.
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks.common import save_results, summarize
+from main_app.core.graph import GraphSnapshot
+
+
+def synthetic_credits(films: int, persons: int, credits: int, seed: int):
+    random.seed(seed)
+    person_ids = [uuid.UUID(int=random.getrandbits(128)).bytes for _ in range(persons)]
+    film_ids = [uuid.UUID(int=random.getrandbits(128)).bytes for _ in range(films)]
+    person_column, film_column = [], []
+    for film in film_ids:
+        for _ in range(max(1, int(random.expovariate(1 / credits)))):
+            # Squaring the draw skews credits towards a small set of prolific persons
+            person_column.append(person_ids[int(random.random() ** 2 * persons)])
+            film_column.append(film)
+    return person_ids, person_column, film_column
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--films", type=int, default=100000)
+    parser.add_argument("--persons", type=int, default=250000)
+    parser.add_argument("--credits", type=int, default=12, help="Mean credits per film")
+    parser.add_argument("--queries", type=int, default=200, help="Collaborator and path queries to time")
+    parser.add_argument("--max-degrees", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Result file path (default: benchmarks/results/graph-<timestamp>.json)")
+    args = parser.parse_args()
+
+    person_ids, person_column, film_column = synthetic_credits(args.films, args.persons, args.credits, args.seed)
+    started = time.perf_counter()
+    snapshot = GraphSnapshot.build(person_column, film_column)
+    build_seconds = time.perf_counter() - started
+    per_million = snapshot.nbytes / snapshot.edges * 1e6
+    print(f"{len(person_column)} credits -> {snapshot.edges} edges, {len(snapshot.person_ids)} persons, "
+          f"{len(snapshot.film_ids)} films")
+    print(f"build {build_seconds:.2f}s, {snapshot.nbytes / 2**20:.1f} MiB, {per_million / 2**20:.1f} MiB per million edges")
+
+    sample = [uuid.UUID(bytes=random.choice(person_column)) for _ in range(args.queries * 2)]
+    collaborator_times, path_times, degrees = [], [], []
+    for person in sample[:args.queries]:
+        started = time.perf_counter()
+        snapshot.collaborators(person, 20)
+        collaborator_times.append(time.perf_counter() - started)
+    for source, target in zip(sample[::2], sample[1::2]):
+        started = time.perf_counter()
+        chain = snapshot.path(source, target, args.max_degrees)
+        path_times.append(time.perf_counter() - started)
+        degrees.append(None if chain is None else len(chain[1]))
+
+    collaborators, paths = summarize(collaborator_times), summarize(path_times)
+    found = [degree for degree in degrees if degree is not None]
+    print(f"collaborators p50={collaborators['p50_ms']}ms p95={collaborators['p95_ms']}ms")
+    print(f"path          p50={paths['p50_ms']}ms p95={paths['p95_ms']}ms, "
+          f"{len(found)}/{len(degrees)} connected, mean degrees {sum(found) / len(found) if found else 0:.2f}")
+
+    payload = {
+        "config": vars(args),
+        "graph": {"edges": snapshot.edges, "persons": len(snapshot.person_ids), "films": len(snapshot.film_ids),
+                  "bytes": snapshot.nbytes, "bytes_per_million_edges": round(per_million),
+                  "build_seconds": round(build_seconds, 3)},
+        "collaborators": collaborators,
+        "path": paths,
+    }
+    print(f"\nresults written to {save_results('graph', payload, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
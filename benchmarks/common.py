@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import math
+import os
+import subprocess
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: Iterable[float]) -> Dict[str, Optional[float]]:
+    """Latency summary in milliseconds"""
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(suite: str, payload: Dict[str, Any], output: Optional[str] = None) -> str:
+    """Write a JSON result file (benchmarks/results/<suite>-<timestamp>.json by default)"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = output or os.path.join(RESULTS_DIR, f"{suite}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {"suite": suite, "created": stamp, "revision": git_revision(), **payload}
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True, default=str)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def format_delta(current: Optional[float], baseline: Optional[float]) -> str:
+    if current is None or baseline is None or baseline == 0:
+        return "n/a"
+    return f"{(current - baseline) / baseline * 100:+.1f}%"
@@ -0,0 +1,142 @@
+"""Bandwidth and CPU cost of response compression on realistic payloads.
+
+Payloads mirror the API's own responses: a 100-film list page, the same
+page with ``expand=genres,persons``, a person detail with a large
+filmography and an NDJSON-style export. With ``--base-url`` the payloads are
+fetched from a running server instead (``--path`` may be repeated)::
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --base-url http://localhost:8000 \\
+        --path "/api/v1/films/?page_size=100" --path "/api/v1/films/?page_size=100&expand=genres,persons"
+
+For every payload, gzip levels and brotli qualities (when the brotli module
+is installed) report compressed size, ratio and compression time per
+response, which is the CPU a worker spends per request.
+"""
+from typing import Callable, Dict, List, Tuple
+import argparse
+import json
+import random
+import time
+import urllib.request
+import uuid
+import zlib
+
+from benchmarks.common import save_results, summarize
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WORDS = ("night", "city", "last", "return", "star", "dark", "love", "war", "house", "road", "king", "blue")
+ROLES = (("actors", 8), ("writers", 2), ("directors", 1))
+
+
+def _title() -> str:
+    return " ".join(random.choice(WORDS).capitalize() for _ in range(random.randint(1, 4)))
+
+
+def _film() -> Dict:
+    return {"uuid": str(uuid.uuid4()), "title": _title(), "imdb_rating": round(random.uniform(1, 10), 1)}
+
+
+def _person() -> Dict:
+    return {"uuid": str(uuid.uuid4()), "full_name": f"{_title()} {_title()}"}
+
+
+def synthetic_payloads() -> Dict[str, bytes]:
+    random.seed(42)
+    page = [_film() for _ in range(100)]
+    genres = [{"uuid": str(uuid.uuid4()), "name": name} for name in ("Drama", "Comedy", "Action", "Sci-Fi", "Horror")]
+    expanded = [
+        {**film, "genres": random.sample(genres, 2),
+         "persons": {group: [_person() for _ in range(count)] for group, count in ROLES}}
+        for film in page
+    ]
+    person = {**_person(), "films": [_film() for _ in range(100)],
+              "roles": {"actor": 80, "writer": 15, "director": 5}, "films_total": 100, "films_cursor": None}
+    export = b"\n".join(json.dumps(_film()).encode() for _ in range(5000))
+    return {
+        "film_list_100": json.dumps(page).encode(),
+        "film_list_100_expanded": json.dumps(expanded).encode(),
+        "person_detail_100_films": json.dumps(person).encode(),
+        "export_5000_ndjson": export,
+    }
+
+
+def fetch_payloads(base_url: str, paths: List[str]) -> Dict[str, bytes]:
+    payloads = {}
+    for path in paths:
+        request = urllib.request.Request(base_url.rstrip("/") + path, headers={"Accept-Encoding": "identity"})
+        with urllib.request.urlopen(request) as response:
+            payloads[path] = response.read()
+    return payloads
+
+
+def codecs(gzip_levels: List[int], brotli_qualities: List[int]) -> List[Tuple[str, Callable[[bytes], bytes]]]:
+    result = []
+    for level in gzip_levels:
+        result.append((f"gzip-{level}", lambda data, level=level: _gzip(data, level)))
+    if brotli is not None:
+        for quality in brotli_qualities:
+            result.append((f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)))
+    return result
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def measure(payload: bytes, compress: Callable[[bytes], bytes], repeat: int) -> Dict:
+    timings = []
+    compressed = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = compress(payload)
+        timings.append(time.perf_counter() - started)
+    stats = summarize(timings)
+    return {
+        "size": len(compressed),
+        "ratio": round(len(payload) / len(compressed), 2),
+        "p50_ms": stats["p50_ms"],
+        "p95_ms": stats["p95_ms"],
+        "mb_per_s": round(len(payload) / 1e6 / (stats["p50_ms"] / 1000), 1) if stats["p50_ms"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", help="Fetch payloads from a running server instead of generating them")
+    parser.add_argument("--path", action="append", default=[], help="API path to fetch (with --base-url)")
+    parser.add_argument("--gzip-levels", default="1,6,9")
+    parser.add_argument("--brotli-qualities", default="1,4,6,11")
+    parser.add_argument("--repeat", type=int, default=50, help="Compressions per payload and codec")
+    parser.add_argument("--output", help="Result file path (default: benchmarks/results/compression-<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        payloads = fetch_payloads(args.base_url, args.path or ["/api/v1/films/?page_size=100"])
+    else:
+        payloads = synthetic_payloads()
+    if brotli is None:
+        print("brotli module not installed: only gzip is measured")
+
+    selected = codecs([int(v) for v in args.gzip_levels.split(",")], [int(v) for v in args.brotli_qualities.split(",")])
+    results = {}
+    print(f"{'payload':32} {'codec':8} {'bytes':>9} {'ratio':>6} {'p50 ms':>8} {'MB/s':>7}")
+    for name, payload in payloads.items():
+        results[name] = {"size": len(payload), "codecs": {}}
+        print(f"{name[:32]:32} {'none':8} {len(payload):>9}")
+        for codec, compress in selected:
+            row = measure(payload, compress, args.repeat)
+            results[name]["codecs"][codec] = row
+            print(f"{'':32} {codec:8} {row['size']:>9} {row['ratio']:>6} {row['p50_ms']:>8.3f} {row['mb_per_s'] or 0:>7}")
+
+    payload = {"config": {"repeat": args.repeat, "brotli": brotli is not None}, "payloads": results}
+    print(f"\nresults written to {save_results('compression', payload, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
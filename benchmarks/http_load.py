@@ -0,0 +1,277 @@
+"""HTTP load test that replays the bundled Postman collection.
+
+Every request in ``FilmsAPI.postman_collection.json`` becomes a weighted
+operation. ``{{film_id}}``/``{{person_id}}``/``{{genre_id}}`` are filled with
+ids sampled from the database, so the workload hits real rows.
+
+Closed loop (N workers, each sends its next request after the previous one
+finishes)::
+
+    python -m benchmarks.http_load --concurrency 32 --duration 60
+
+Open loop (Poisson arrivals at a fixed rate; latency is measured from the
+scheduled start, so queueing delay is not hidden)::
+
+    python -m benchmarks.http_load --mode open --rate 400 --duration 60
+
+Results are written as JSON under ``benchmarks/results/``; pass
+``--compare <file>`` to print per-route deltas against an earlier run.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+import aiohttp
+
+from benchmarks.common import format_delta, load_results, save_results, summarize
+
+DEFAULT_COLLECTION = os.path.join(os.path.dirname(os.path.dirname(__file__)), "FilmsAPI.postman_collection.json")
+VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+WRITE_METHODS = {"POST", "PUT", "PATCH"}
+
+# Tables the id variables of the collection are sampled from
+ID_SOURCES = {
+    "film_id": "content.film_work",
+    "person_id": "content.person",
+    "genre_id": "content.genre",
+}
+
+
+class Operation:
+    """One request template of the collection"""
+
+    def __init__(self, name: str, method: str, url: str, body: Optional[str], weight: float):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.body = body
+        self.weight = weight
+
+    def render(self, variables: Dict[str, List[str]]):
+        def substitute(text):
+            return VARIABLE.sub(lambda match: random.choice(variables.get(match.group(1)) or [match.group(0)]), text)
+        return substitute(self.url), substitute(self.body) if self.body else None
+
+
+def load_operations(path: str, weights: Dict[str, float], include_writes: bool) -> List[Operation]:
+    """Flatten the collection into weighted operations (DELETE requests are never replayed)"""
+    with open(path) as fh:
+        collection = json.load(fh)
+
+    operations = []
+
+    def walk(items, prefix=""):
+        for item in items:
+            if "item" in item:
+                walk(item["item"], f"{prefix}{item['name']}/")
+                continue
+            request = item["request"]
+            method = request["method"].upper()
+            if method == "DELETE" or (method in WRITE_METHODS and not include_writes):
+                continue
+            name = f"{prefix}{item['name']}"
+            weight = weights.get(name, 1.0)
+            if weight <= 0:
+                continue
+            body = request.get("body", {}).get("raw")
+            operations.append(Operation(name, method, request["url"]["raw"], body, weight))
+
+    walk(collection["item"])
+    return operations
+
+
+def collection_variables(path: str) -> Dict[str, List[str]]:
+    with open(path) as fh:
+        collection = json.load(fh)
+    return {variable["key"]: [variable["value"]] for variable in collection.get("variable", [])}
+
+
+async def sample_ids(sample_size: int) -> Dict[str, List[str]]:
+    """Sample real ids for the collection variables from the configured database"""
+    from sqlalchemy import text
+    from database import AsyncSessionLocal
+
+    sampled = {}
+    async with AsyncSessionLocal() as session:
+        for variable, table in ID_SOURCES.items():
+            result = await session.execute(
+                text(f"SELECT id::text FROM {table} ORDER BY random() LIMIT :n"), {"n": sample_size}
+            )
+            ids = list(result.scalars().all())
+            if ids:
+                sampled[variable] = ids
+    return sampled
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.dropped = 0
+
+    def record(self, name: str, latency: float, error: Optional[str]):
+        if error is None:
+            self.latencies[name].append(latency)
+        else:
+            self.errors[name][error] += 1
+
+
+async def execute(session: aiohttp.ClientSession, operation: Operation, variables, recorder: Recorder,
+                  scheduled: Optional[float] = None):
+    url, body = operation.render(variables)
+    started = scheduled if scheduled is not None else time.perf_counter()
+    error = None
+    try:
+        async with session.request(operation.method, url, data=body,
+                                   headers={"Content-Type": "application/json"} if body else None) as response:
+            await response.read()
+            if response.status >= 400:
+                error = str(response.status)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        error = type(exc).__name__
+    recorder.record(operation.name, time.perf_counter() - started, error)
+
+
+async def closed_loop(session, operations, variables, recorder, concurrency: int, deadline: float):
+    weights = [operation.weight for operation in operations]
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            operation = random.choices(operations, weights)[0]
+            await execute(session, operation, variables, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(session, operations, variables, recorder, rate: float, max_in_flight: int, deadline: float):
+    weights = [operation.weight for operation in operations]
+    in_flight = set()
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1
+        else:
+            operation = random.choices(operations, weights)[0]
+            task = asyncio.ensure_future(execute(session, operation, variables, recorder, scheduled=next_arrival))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_arrival += random.expovariate(rate)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def run(args) -> Dict:
+    weights = {}
+    if args.weights:
+        with open(args.weights) as fh:
+            weights = json.load(fh)
+    operations = load_operations(args.collection, weights, args.include_writes)
+    if not operations:
+        raise SystemExit("No operations to replay")
+
+    variables = collection_variables(args.collection)
+    variables["base_url"] = [args.base_url.rstrip("/")]
+    if not args.no_sample:
+        variables.update(await sample_ids(args.sample_size))
+
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=max(args.concurrency, 1))
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        if args.warmup > 0:
+            await closed_loop(session, operations, variables, Recorder(), args.concurrency,
+                              time.perf_counter() + args.warmup)
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        if args.mode == "open":
+            await open_loop(session, operations, variables, recorder, args.rate, args.concurrency, deadline)
+        else:
+            await closed_loop(session, operations, variables, recorder, args.concurrency, deadline)
+        elapsed = time.perf_counter() - started
+
+    routes = {}
+    for operation in operations:
+        latencies = recorder.latencies.get(operation.name, [])
+        errors = dict(recorder.errors.get(operation.name, {}))
+        routes[operation.name] = {
+            **summarize(latencies),
+            "errors": errors,
+            "error_count": sum(errors.values()),
+            "rps": round(len(latencies) / elapsed, 2),
+        }
+    all_latencies = [latency for values in recorder.latencies.values() for latency in values]
+    error_count = sum(route["error_count"] for route in routes.values())
+    return {
+        "config": {
+            "mode": args.mode,
+            "concurrency": args.concurrency,
+            "rate": args.rate if args.mode == "open" else None,
+            "duration": args.duration,
+            "base_url": args.base_url,
+            "include_writes": args.include_writes,
+            "sampled_variables": sorted(key for key, values in variables.items() if len(values) > 1),
+        },
+        "total": {
+            **summarize(all_latencies),
+            "error_count": error_count,
+            "dropped": recorder.dropped,
+            "rps": round(len(all_latencies) / elapsed, 2),
+        },
+        "routes": routes,
+    }
+
+
+def print_report(results: Dict, baseline: Optional[Dict] = None):
+    header = f"{'route':55} {'n':>7} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    for name, route in sorted(results["routes"].items()):
+        line = (f"{name[:55]:55} {route['count']:>7} {route['error_count']:>5} "
+                f"{route['p50_ms'] or 0:>8.1f} {route['p95_ms'] or 0:>8.1f} {route['p99_ms'] or 0:>8.1f}")
+        if baseline:
+            previous = baseline.get("routes", {}).get(name, {})
+            line += f" {format_delta(route['p95_ms'], previous.get('p95_ms')):>12}"
+        print(line)
+    total = results["total"]
+    print(f"\ntotal: {total['rps']} req/s, p50={total['p50_ms']}ms p95={total['p95_ms']}ms "
+          f"p99={total['p99_ms']}ms, errors={total['error_count']}, dropped={total['dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default=os.environ.get("BENCH_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION)
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Workers (closed loop) or max requests in flight (open loop)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Arrivals per second in open-loop mode")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--weights", help="JSON file mapping 'Folder/Request name' to a weight (0 disables)")
+    parser.add_argument("--include-writes", action="store_true", help="Also replay POST/PUT requests")
+    parser.add_argument("--sample-size", type=int, default=500, help="Ids sampled per variable")
+    parser.add_argument("--no-sample", action="store_true", help="Use the collection's fixed variable values")
+    parser.add_argument("--output", help="Result file path (default: benchmarks/results/http-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = load_results(args.compare) if args.compare else None
+    print_report(results, baseline)
+    print(f"\nresults written to {save_results('http', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Repository query benchmark and plan regression suite.
+
+Times every ``FilmRepository``/``PersonRepository``/``GenreRepository`` read
+method against a local Postgres, records the statements each one issues and
+their ``EXPLAIN (ANALYZE, BUFFERS)`` plans, and compares the run with a
+stored baseline. The process exits with status 1 when a method got slower,
+touches more buffers, or issues more statements than in the baseline.
+
+Use a dedicated database (``BENCH_DATABASE_URL`` or ``ASYNC_DATABASE_URL``)
+with the schema migrated (``alembic upgrade head``)::
+
+    python -m benchmarks.repository_queries --seed --films 200000
+    python -m benchmarks.repository_queries --update-baseline
+    python -m benchmarks.repository_queries            # fails on regression
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks.common import format_delta, save_results, summarize
+from main_app.core.config import config_provider
+from main_app.core.repositories import FilmRepository, GenreRepository, PersonRepository
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "repository_queries.json")
+
+SEED_SQL = [
+    """
+    INSERT INTO content.genre (id, name, description, created, modified)
+    SELECT gen_random_uuid(), 'Genre ' || g, 'Synthetic genre ' || g, now(), now()
+    FROM generate_series(1, :genres) g
+    """,
+    """
+    INSERT INTO content.film_work (id, title, description, creation_date, rating, type, created, modified)
+    SELECT gen_random_uuid(),
+           (ARRAY['Star', 'Dark', 'Love', 'War', 'Night', 'Last', 'Lost', 'Blue'])[1 + f % 8] || ' ' ||
+           (ARRAY['Story', 'Empire', 'Road', 'Knight', 'City', 'River', 'Dream', 'Game'])[1 + (f / 8) % 8] || ' ' || f,
+           repeat('Synthetic description of a film. ', 30),
+           date '1920-01-01' + (f * 37 % 36500),
+           CASE WHEN f % 50 = 0 THEN NULL ELSE round((random() * 9 + 1)::numeric, 1) END,
+           CASE WHEN f % 5 = 0 THEN 'tv_show' ELSE 'movie' END,
+           now(), now()
+    FROM generate_series(1, :films) f
+    """,
+    """
+    INSERT INTO content.person (id, full_name, created, modified)
+    SELECT gen_random_uuid(),
+           (ARRAY['John', 'Mary', 'James', 'Anna', 'Robert', 'Linda', 'David', 'Susan'])[1 + p % 8] || ' ' ||
+           (ARRAY['Smith', 'Dunne', 'Brown', 'Miller', 'Davis', 'Wilson', 'Moore', 'Clark'])[1 + (p / 8) % 8] || ' ' || p,
+           now(), now()
+    FROM generate_series(1, :persons) p
+    """,
+    """
+    WITH genres AS (SELECT array_agg(id) AS ids, count(*) AS n FROM content.genre)
+    INSERT INTO content.genre_film_work (id, genre_id, film_work_id, created)
+    SELECT DISTINCT ON (f.id, genres.ids[1 + (abs(hashtext(f.id::text)) + slot * 7) % genres.n])
+           gen_random_uuid(), genres.ids[1 + (abs(hashtext(f.id::text)) + slot * 7) % genres.n], f.id, now()
+    FROM content.film_work f
+    CROSS JOIN generate_series(0, 2) slot
+    CROSS JOIN genres
+    WHERE slot <= abs(hashtext(f.id::text)) % 3
+    ON CONFLICT DO NOTHING
+    """,
+    # Skewed person choice (random()^2) gives a few very prolific people
+    """
+    WITH people AS (SELECT array_agg(id) AS ids, count(*) AS n FROM content.person)
+    INSERT INTO content.person_film_work (id, person_id, film_work_id, role, created)
+    SELECT gen_random_uuid(),
+           people.ids[1 + floor(power(random(), 2) * people.n)::int],
+           f.id,
+           (ARRAY['actor', 'actor', 'actor', 'actor', 'actor', 'actor', 'writer', 'writer', 'director'])[1 + slot % 9],
+           now()
+    FROM content.film_work f
+    CROSS JOIN generate_series(0, :per_film - 1) slot
+    CROSS JOIN people
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+# Rows used as arguments: a well-connected film, the most prolific person and the largest genre
+SAMPLE_SQL = {
+    "film_id": """SELECT film_work_id FROM content.person_film_work
+                  GROUP BY film_work_id ORDER BY count(*) DESC LIMIT 1""",
+    "person_id": """SELECT person_id FROM content.person_film_work
+                    GROUP BY person_id ORDER BY count(*) DESC LIMIT 1""",
+    "genre_id": """SELECT genre_id FROM content.genre_film_work
+                   GROUP BY genre_id ORDER BY count(*) DESC LIMIT 1""",
+}
+
+Case = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+CASES: List[Tuple[str, Case]] = [
+    ("film.get_by_id", lambda s, a: FilmRepository(s).get_by_id(a["film_id"], load_relationships=True)),
+    ("film.get_all.-rating", lambda s, a: FilmRepository(s).get_all(limit=50, sort_by="-rating")),
+    ("film.get_all.title", lambda s, a: FilmRepository(s).get_all(limit=50, sort_by="title")),
+    ("film.get_all.genre", lambda s, a: FilmRepository(s).get_all(limit=50, genre_id=a["genre_id"])),
+    ("film.get_all.deep_page", lambda s, a: FilmRepository(s).get_all(skip=5000, limit=50)),
+    ("film.search_by_title", lambda s, a: FilmRepository(s).search_by_title("star", limit=50)),
+    ("film.suggest_by_title", lambda s, a: FilmRepository(s).suggest_by_title("star", limit=10)),
+    ("film.get_persons_by_role", lambda s, a: FilmRepository(s).get_persons_by_role(a["film_id"], "actor")),
+    ("film.get_facets", lambda s, a: FilmRepository(s).get_facets(FilmRepository.FACETS, title_query="star")),
+    ("person.get_summary", lambda s, a: PersonRepository(s).get_summary(a["person_id"])),
+    ("person.search_by_name", lambda s, a: PersonRepository(s).search_by_name("dunne", limit=50)),
+    ("person.suggest_by_name", lambda s, a: PersonRepository(s).suggest_by_name("john", limit=10)),
+    ("person.get_films_by_person", lambda s, a: PersonRepository(s).get_films_by_person(a["person_id"], limit=50)),
+    ("person.get_role_counts", lambda s, a: PersonRepository(s).get_role_counts(a["person_id"])),
+    ("genre.get_all", lambda s, a: GenreRepository(s).get_all(limit=100)),
+    ("genre.count", lambda s, a: GenreRepository(s).count()),
+]
+
+
+class StatementCapture:
+    """Records statements sent through the engine while ``active``"""
+
+    def __init__(self, engine):
+        self.active = False
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements.append((statement, parameters))
+
+    def start(self):
+        self.statements = []
+        self.active = True
+
+    def stop(self) -> List[Tuple[str, Any]]:
+        self.active = False
+        return self.statements
+
+
+def plan_metrics(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Execution time, buffer totals and scan node types of an EXPLAIN (FORMAT JSON) plan"""
+    root = plan["Plan"]
+    scans = set()
+
+    def walk(node):
+        if "Scan" in node["Node Type"]:
+            scans.add(f"{node['Node Type']} on {node.get('Relation Name', '?')}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(root)
+    return {
+        "execution_ms": plan.get("Execution Time"),
+        "shared_hit": root.get("Shared Hit Blocks", 0),
+        "shared_read": root.get("Shared Read Blocks", 0),
+        "scans": sorted(scans),
+    }
+
+
+async def explain(engine, statements: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            )
+            raw = result.scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            plans.append({"statement": statement, **plan_metrics(plan), "plan": plan})
+        await conn.rollback()
+    return plans
+
+
+async def seed(engine, args):
+    async with engine.begin() as conn:
+        existing = (await conn.execute(text("SELECT count(*) FROM content.film_work"))).scalar()
+        if existing and not args.force:
+            raise SystemExit(f"content.film_work already has {existing} rows; use --force to add more")
+        params = {"genres": args.genres, "films": args.films, "persons": args.persons, "per_film": args.per_film}
+        for statement in SEED_SQL:
+            started = time.perf_counter()
+            await conn.execute(text(statement), params)
+            print(f"seeded in {time.perf_counter() - started:.1f}s: {statement.split('INSERT INTO')[1].split('(')[0].strip()}")
+        has_cards = (await conn.execute(text("SELECT to_regclass('content.film_card')"))).scalar()
+        if has_cards:
+            await conn.execute(text("REFRESH MATERIALIZED VIEW content.film_card"))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+async def run(args) -> Dict[str, Any]:
+    engine = create_async_engine(args.database_url, echo=False)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    capture = StatementCapture(engine)
+    try:
+        if args.seed:
+            await seed(engine, args)
+
+        async with engine.connect() as conn:
+            arguments = {name: (await conn.execute(text(sql))).scalar() for name, sql in SAMPLE_SQL.items()}
+            catalog = {
+                table: (await conn.execute(text(f"SELECT count(*) FROM content.{table}"))).scalar()
+                for table in ("film_work", "person", "genre", "genre_film_work", "person_film_work")
+            }
+        if not all(arguments.values()):
+            raise SystemExit("Database has no catalog rows; run with --seed first")
+
+        cases = {}
+        for name, case in CASES:
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            timings = []
+            statements: List[Tuple[str, Any]] = []
+            for iteration in range(args.warmup + args.repeat):
+                async with session_factory() as session:
+                    capture.start()
+                    started = time.perf_counter()
+                    await case(session, arguments)
+                    elapsed = time.perf_counter() - started
+                    captured = capture.stop()
+                if iteration >= args.warmup:
+                    timings.append(elapsed)
+                    statements = captured
+            plans = await explain(engine, statements) if not args.no_explain else []
+            cases[name] = {
+                **summarize(timings),
+                "statements": len(statements),
+                "buffers": sum(plan["shared_hit"] + plan["shared_read"] for plan in plans),
+                "plan_execution_ms": round(sum(plan["execution_ms"] or 0 for plan in plans), 3),
+                "scans": sorted({scan for plan in plans for scan in plan["scans"]}),
+                "plans": plans,
+            }
+            print(f"{name:32} p50={cases[name]['p50_ms']:9.3f}ms statements={len(statements):3} "
+                  f"buffers={cases[name]['buffers']}")
+        return {"catalog": catalog, "config": {"repeat": args.repeat}, "cases": cases}
+    finally:
+        await engine.dispose()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], latency_tolerance: float,
+            buffer_tolerance: float, latency_slack_ms: float) -> List[str]:
+    """Regressions of ``results`` against ``baseline``"""
+    if baseline.get("catalog") != results.get("catalog"):
+        print("warning: catalog size differs from the baseline, comparisons are approximate")
+
+    regressions = []
+    for name, case in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            print(f"{name:32} new case (no baseline)")
+            continue
+        print(f"{name:32} p50 {format_delta(case['p50_ms'], base['p50_ms']):>8}  "
+              f"buffers {format_delta(case['buffers'], base['buffers']):>8}  "
+              f"statements {base['statements']}->{case['statements']}")
+        if case["p50_ms"] > base["p50_ms"] * (1 + latency_tolerance) + latency_slack_ms:
+            regressions.append(f"{name}: p50 {base['p50_ms']}ms -> {case['p50_ms']}ms")
+        if base["buffers"] and case["buffers"] > base["buffers"] * (1 + buffer_tolerance):
+            regressions.append(f"{name}: buffers {base['buffers']} -> {case['buffers']}")
+        if case["statements"] > base["statements"]:
+            regressions.append(f"{name}: statements {base['statements']} -> {case['statements']}")
+        new_scans = set(case["scans"]) - set(base["scans"])
+        if new_scans:
+            print(f"  plan change: {', '.join(sorted(new_scans))}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL")
+                        or config_provider.get_async_database_url())
+    parser.add_argument("--seed", action="store_true", help="Insert a synthetic catalog before measuring")
+    parser.add_argument("--force", action="store_true", help="Seed even if the catalog is not empty")
+    parser.add_argument("--films", type=int, default=100_000)
+    parser.add_argument("--persons", type=int, default=50_000)
+    parser.add_argument("--genres", type=int, default=40)
+    parser.add_argument("--per-film", type=int, default=12, help="Person links per film")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Run only cases with these name prefixes")
+    parser.add_argument("--no-explain", action="store_true")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25, help="Allowed relative p50 growth")
+    parser.add_argument("--latency-slack-ms", type=float, default=1.0, help="Allowed absolute p50 growth")
+    parser.add_argument("--buffer-tolerance", type=float, default=0.10, help="Allowed relative buffer growth")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"results written to {save_results('repository', results)}")
+
+    if args.update_baseline:
+        print(f"baseline written to {save_results('repository', results, args.baseline)}")
+        return
+    if not os.path.exists(args.baseline):
+        print("no baseline stored yet; run with --update-baseline")
+        return
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    regressions = compare(results, baseline, args.latency_tolerance, args.buffer_tolerance, args.latency_slack_ms)
+    if regressions:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
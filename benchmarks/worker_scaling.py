@@ -0,0 +1,123 @@
+"""Throughput scaling with the number of server workers.
+
+For every worker count the API is started under gunicorn (the production
+serving mode, see ``gunicorn.conf.py``) with ``WEB_WORKERS`` set, so each
+worker sizes its connection pool from the shared budget. The Postman
+collection is then replayed by the closed-loop driver of
+``benchmarks.http_load``::
+
+    python -m benchmarks.worker_scaling --workers 1,2,4 --concurrency 64 --duration 30
+
+The report shows requests per second, p95 latency and the speed-up over
+the first worker count. Results are written under ``benchmarks/results/``.
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import http_load
+from benchmarks.common import save_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, run_dir: str) -> subprocess.Popen:
+    """Start gunicorn in ``run_dir`` so the app's ``app.log`` lands there, not in the checkout"""
+    env = {**os.environ, "WEB_WORKERS": str(workers),
+           "PYTHONPATH": os.pathsep.join(filter(None, (ROOT, os.environ.get("PYTHONPATH"))))}
+    # Settings read .env from the working directory
+    dotenv = os.path.join(ROOT, ".env")
+    if os.path.exists(dotenv) and not os.path.exists(os.path.join(run_dir, ".env")):
+        os.symlink(dotenv, os.path.join(run_dir, ".env"))
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+         "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+        cwd=run_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_ready(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} did not become ready in {timeout}s")
+
+
+def stop_server(process: subprocess.Popen, timeout: float):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def load_args(args, base_url: str) -> argparse.Namespace:
+    return argparse.Namespace(
+        base_url=base_url, collection=args.collection, mode="closed", concurrency=args.concurrency,
+        rate=None, duration=args.duration, warmup=args.warmup, timeout=args.timeout, weights=args.weights,
+        include_writes=False, sample_size=args.sample_size, no_sample=args.no_sample
+    )
+
+
+def print_report(worker_counts: List[int], runs: Dict[str, Dict]):
+    base_rps = runs[str(worker_counts[0])]["rps"] or None
+    print(f"\n{'workers':>7} {'req/s':>10} {'p95':>9} {'errors':>7} {'speed-up':>9}")
+    for workers in worker_counts:
+        total = runs[str(workers)]
+        speedup = f"{total['rps'] / base_rps:.2f}x" if base_rps else "n/a"
+        print(f"{workers:>7} {total['rps']:>10} {total['p95_ms'] or 0:>9.1f} {total['error_count']:>7} {speedup:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--collection", default=http_load.DEFAULT_COLLECTION)
+    parser.add_argument("--concurrency", type=int, default=64, help="Closed-loop client workers")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--weights", help="JSON file mapping 'Folder/Request name' to a weight (0 disables)")
+    parser.add_argument("--sample-size", type=int, default=500, help="Ids sampled per variable")
+    parser.add_argument("--no-sample", action="store_true", help="Use the collection's fixed variable values")
+    parser.add_argument("--output", help="Result file path (default: benchmarks/results/workers-<timestamp>.json)")
+    args = parser.parse_args()
+
+    worker_counts = [int(value) for value in args.workers.split(",")]
+    base_url = f"http://127.0.0.1:{args.port}"
+    runs: Dict[str, Dict] = {}
+    run_dir = tempfile.mkdtemp(prefix="worker_scaling-")
+    print(f"server log: {os.path.join(run_dir, 'app.log')}")
+    for workers in worker_counts:
+        process = start_server(workers, args.port, run_dir)
+        try:
+            wait_ready(base_url, args.startup_timeout)
+            results = asyncio.run(http_load.run(load_args(args, base_url)))
+        finally:
+            stop_server(process, args.startup_timeout)
+        runs[str(workers)] = results["total"]
+        print(f"workers={workers}: {results['total']['rps']} req/s, p95={results['total']['p95_ms']}ms, "
+              f"errors={results['total']['error_count']}")
+
+    print_report(worker_counts, runs)
+    payload = {"config": {"workers": worker_counts, "concurrency": args.concurrency, "duration": args.duration},
+               "runs": runs}
+    print(f"\nresults written to {save_results('workers', payload, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,88 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 
 from main_app.core.config import config_provider
+from main_app.core.query_stats import instrument_engine
 
 
-ASYNC_DATABASE_URL = config_provider.get_async_database_url()
-SYNC_DATABASE_URL = config_provider.get_sync_database_url()
+# Engines are created on first use: importing this module (models, alembic,
+# tests) must not build connection pools the process never uses.
+_async_engine: Optional[AsyncEngine] = None
+_sync_engine: Optional[Engine] = None
 
 
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+def get_async_engine() -> AsyncEngine:
+    """Create the async engine on first use"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            config_provider.get_async_database_url(), echo=False, **config_provider.get_pool_limits()
+        )
+        if config_provider.settings.query_stats_enabled:
+            instrument_engine(_async_engine)
+    return _async_engine
+
+
+def get_sync_engine() -> Engine:
+    """Create the sync (psycopg2) engine on first use"""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(config_provider.get_sync_database_url(), echo=False)
+    return _sync_engine
+
+
+async def dispose_engines():
+    """Close the pools of the engines created so far"""
+    global _async_engine, _sync_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _sync_engine is not None:
+        _sync_engine.dispose()
+        _sync_engine = None
+
 
+class LazySessionFactory:
+    """Session factory that binds to its engine on the first session"""
 
-sync_engine = create_engine(SYNC_DATABASE_URL, echo=False)
-SyncSessionLocal = sessionmaker(
-    bind=sync_engine,
-    autocommit=False,
-    autoflush=False
+    def __init__(self, factory: Callable[..., sessionmaker], engine_getter: Callable):
+        self._factory = factory
+        self._engine_getter = engine_getter
+        self._sessionmaker = None
+        self._engine = None
+
+    def __call__(self, **kwargs):
+        engine = self._engine_getter()
+        if self._sessionmaker is None or self._engine is not engine:
+            self._sessionmaker = self._factory(bind=engine)
+            self._engine = engine
+        return self._sessionmaker(**kwargs)
+
+
+AsyncSessionLocal = LazySessionFactory(
+    lambda bind: async_sessionmaker(bind=bind, class_=AsyncSession, expire_on_commit=False),
+    get_async_engine
 )
 
+SyncSessionLocal = LazySessionFactory(
+    lambda bind: sessionmaker(bind=bind, autocommit=False, autoflush=False),
+    get_sync_engine
+)
+
+
+def __getattr__(name):
+    # Backwards compatible ``from database import async_engine`` / ``sync_engine``
+    if name == "async_engine":
+        return get_async_engine()
+    if name == "sync_engine":
+        return get_sync_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 Base = declarative_base()
 
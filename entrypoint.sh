@@ -16,55 +16,68 @@ wait_for_db() {
 # Ждем готовности базы данных
 wait_for_db
 
-# Проверяем, существует ли схема content и таблицы
-SCHEMA_EXISTS=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT schema_name FROM information_schema.schemata WHERE schema_name = 'content';")
+# Ревизия Alembic, до которой должна быть обновлена база (без запуска Python)
+head_revision() {
+    local revisions downs
+    revisions=$(sed -n "s/^revision[^=]*= *['\"]\([0-9a-f]*\)['\"].*/\1/p" /app/alembic/versions/*.py)
+    downs=$(sed -n "s/^down_revision[^=]*= *['\"]\([0-9a-f]*\)['\"].*/\1/p" /app/alembic/versions/*.py)
+    for revision in $revisions; do
+        echo "$downs" | grep -qx "$revision" || echo "$revision"
+    done
+}
 
-# Проверяем, есть ли данные в таблицах
-if [ "$SCHEMA_EXISTS" = "content" ]; then
-    # Проверяем количество записей в основных таблицах
-    FILM_COUNT=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.film_work;" 2>/dev/null || echo "0")
-    GENRE_COUNT=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.genre;" 2>/dev/null || echo "0")
-    PERSON_COUNT=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.person;" 2>/dev/null || echo "0")
-    
-    TOTAL_RECORDS=$((FILM_COUNT + GENRE_COUNT + PERSON_COUNT))
-    
-    if [ "$TOTAL_RECORDS" -gt 0 ]; then
+# Состояние базы одним запросом: текущая ревизия Alembic и наличие хотя бы одного фильма.
+# EXISTS останавливается на первой строке, поэтому полного сканирования таблиц нет.
+# Если схемы или таблицы версий еще нет, запрос падает и мы считаем базу пустой.
+DB_STATE=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAF'|' -c \
+    "SELECT (SELECT version_num FROM alembic_version LIMIT 1), EXISTS (SELECT 1 FROM content.film_work);" 2>/dev/null || echo "")
+DB_REVISION=${DB_STATE%%|*}
+HAS_DATA=${DB_STATE##*|}
+HEAD_REVISION=$(head_revision)
+
+if [ -z "$DB_STATE" ]; then
+    echo "🆕 Первый запуск: схема content не существует. Применяем миграции и init.sql..."
+    NEEDS_MIGRATIONS=true
+    FIRST_RUN=true
+else
+    if [ "$DB_REVISION" = "$HEAD_REVISION" ]; then
+        NEEDS_MIGRATIONS=false
+    else
+        echo "🚀 Ревизия базы ${DB_REVISION:-нет} отличается от ${HEAD_REVISION:-?}"
+        NEEDS_MIGRATIONS=true
+    fi
+    if [ "$HAS_DATA" = "t" ]; then
         echo "🔄 База данных уже содержит данные. Пропускаем инициализацию."
         FIRST_RUN=false
     else
         echo "📊 Схема существует, но данных нет. Применяем init.sql..."
         FIRST_RUN=true
     fi
-else
-    echo "🆕 Первый запуск: схема content не существует. Применяем миграции и init.sql..."
-    FIRST_RUN=true
 fi
 
-if [ "$FIRST_RUN" = true ]; then
+if [ "$NEEDS_MIGRATIONS" = true ]; then
     echo "🚀 Применяем Alembic миграции..."
     alembic upgrade head
-    
+fi
+
+if [ "$FIRST_RUN" = true ]; then
     # Применяем init.sql, если он существует
     if [ -f /app/init.sql ]; then
         echo "📥 Применяем init.sql..."
         PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -f /app/init.sql
-        
-        # Проверяем, что данные были загружены
-        FILM_COUNT_AFTER=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.film_work;" 2>/dev/null || echo "0")
-        GENRE_COUNT_AFTER=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.genre;" 2>/dev/null || echo "0")
-        PERSON_COUNT_AFTER=$(PGPASSWORD=$POSTGRES_PASSWORD psql -h db -U $POSTGRES_USER -d $POSTGRES_DB -tAc "SELECT COUNT(*) FROM content.person;" 2>/dev/null || echo "0")
-        
-        echo "✅ Инициализация завершена:"
-        echo "   - Фильмы: $FILM_COUNT_AFTER"
-        echo "   - Жанры: $GENRE_COUNT_AFTER"
-        echo "   - Персоны: $PERSON_COUNT_AFTER"
+        echo "✅ Инициализация завершена"
     else
         echo "⚠️  Файл init.sql не найден"
     fi
 else
-    echo "✅ База данных уже инициализирована, пропускаем миграции и дамп"
+    echo "✅ База данных уже инициализирована, пропускаем дамп"
 fi
 
-# Запускаем приложение
+# Запускаем приложение: WEB_WORKERS > 1 включает gunicorn с несколькими воркерами uvicorn
+WEB_WORKERS=${WEB_WORKERS:-1}
+if [ "$WEB_WORKERS" -gt 1 ]; then
+    echo "▶ Запуск gunicorn ($WEB_WORKERS воркеров)..."
+    exec gunicorn main:app -c /app/gunicorn.conf.py
+fi
 echo "▶ Запуск uvicorn..."
 exec uvicorn main:app --proxy-headers --host 0.0.0.0 --port 8000
@@ -0,0 +1,18 @@
+"""Gunicorn settings for the multi-worker serving mode (see entrypoint.sh)."""
+from main_app.core.config import config_provider
+
+_settings = config_provider.settings
+
+bind = "0.0.0.0:8000"
+workers = _settings.web_workers
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with modules already loaded.
+# Engines are created lazily, so no connection is inherited across the fork.
+preload_app = True
+
+# SIGTERM lets in-flight requests finish; the lifespan shutdown then runs
+# ServiceContainer.cleanup(), which disposes the worker's connection pool.
+graceful_timeout = _settings.web_graceful_timeout
+timeout = 60
+forwarded_allow_ips = "*"
@@ -1,10 +1,17 @@
+import time
+_import_started = time.perf_counter()
+
 import sys
 import logging
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from main_app.api import api
+from main_app.core.admission import AdmissionRejected, classify_request, release_after_body
+from main_app.core.compression import CompressionMiddleware
+from main_app.core.query_stats import capture_queries, report_request
 from main_app.core.config import config_provider
 from main_app.core.dependencies import get_service_container
 
@@ -21,6 +28,8 @@ logger = logging.getLogger('films_api')
 # Get configuration
 config = config_provider.settings
 
+IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 1)
+
 app = FastAPI(
     title=config.project_name,
     description="""
@@ -31,6 +40,9 @@ app = FastAPI(
     * **Films**: Get popular films, search films, get film details, CRUD operations
     * **Persons**: Search persons, get person details, get films by person, CRUD operations
     * **Genres**: Get all genres, get genre details, CRUD operations
+    * **Sparse fieldsets**: read endpoints accept `fields=uuid,title` to return (and select) only those fields
+    * **Expansions**: film lists accept `expand=genres,persons` to inline relations with one extra query per page
+    * **Change feed**: incremental sync of created, updated and deleted entities with a resumable token
 
     ## Architecture
 
@@ -43,17 +55,22 @@ app = FastAPI(
     ## API Endpoints
 
     ### Films
-    * `GET /api/v1/films/` - Get list of films with filtering and sorting
+    * `GET /api/v1/films/` - Get list of films with filtering (genre, type) and sorting
     * `GET /api/v1/films/search/` - Search films by title
     * `GET /api/v1/films/{film_id}/` - Get detailed film information
+    * `GET /api/v1/films/{film_id}/similar/` - Precomputed similar films
     * `POST /api/v1/films/` - Create a new film
     * `PUT /api/v1/films/{film_id}/` - Update film information
+    * `POST /api/v1/films/composite/` - Create a film with its genres and persons in one transaction
+    * `PUT /api/v1/films/{film_id}/composite/` - Replace a film with its genres and persons in one transaction
     * `DELETE /api/v1/films/{film_id}/` - Delete a film
 
     ### Persons
     * `GET /api/v1/persons/search/` - Search persons by name
     * `GET /api/v1/persons/{person_id}/` - Get detailed person information
     * `GET /api/v1/persons/{person_id}/film/` - Get films by person
+    * `GET /api/v1/persons/{person_id}/collaborators/` - Persons ranked by shared films
+    * `GET /api/v1/persons/{person_id}/path/{other_id}/` - Degrees of separation through shared films
     * `POST /api/v1/persons/` - Create a new person
     * `PUT /api/v1/persons/{person_id}/` - Update person information
     * `DELETE /api/v1/persons/{person_id}/` - Delete a person
@@ -64,6 +81,23 @@ app = FastAPI(
     * `POST /api/v1/genres/` - Create a new genre
     * `PUT /api/v1/genres/{genre_id}/` - Update genre information
     * `DELETE /api/v1/genres/{genre_id}/` - Delete a genre
+
+    ### Suggest
+    * `GET /api/v1/suggest?q=` - Typeahead suggestions for film titles and person names
+
+    ### Links
+    * `POST /api/v1/links/genres/attach/` - Link many films to genres in one statement
+    * `POST /api/v1/links/genres/detach/` - Unlink many films from genres in one statement
+    * `POST /api/v1/links/persons/attach/` - Credit many persons on films in one statement
+    * `POST /api/v1/links/persons/detach/` - Remove many film credits in one statement
+
+    ### Changes
+    * `GET /api/v1/changes/?since=` - Films, persons and genres changed after a token
+
+    ### Admin
+    * `GET /api/v1/admin/stats/` - Runtime statistics (coalesced reads, caches)
+    * `GET /api/v1/admin/slow-queries/` - Recent slow statements with EXPLAIN plans
+    * `GET /api/v1/admin/film-columns/consistency/` - Compare the in-memory film columns with the database
     """,
     version=config.version
 )
@@ -78,6 +112,15 @@ app.add_middleware(
     allow_headers=cors_config["allow_headers"],
 )
 
+if config.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.compression_minimum_size,
+        gzip_level=config.compression_gzip_level,
+        brotli_quality=config.compression_brotli_quality,
+        brotli_enabled=config.compression_brotli_enabled,
+    )
+
 # Include API router with config prefix
 app.include_router(api.api_router, prefix=config_provider.get_api_prefix())
 
@@ -86,8 +129,12 @@ app.include_router(api.api_router, prefix=config_provider.get_api_prefix())
 async def startup_event():
     # Initialize the service container (async)
     container = get_service_container()
+    container.startup_timings["imports"] = IMPORT_MS
+    started = time.perf_counter()
     await container.initialize()
-    logger.info("Service container initialized.")
+    container.startup_timings["initialize"] = round((time.perf_counter() - started) * 1000, 1)
+    report = ", ".join(f"{step}={ms}ms" for step, ms in container.startup_timings.items())
+    logger.info(f"Service container initialized. Startup timings: {report}")
 
 
 @app.on_event("shutdown")
@@ -98,6 +145,49 @@ async def shutdown_event():
     logger.info("Service container cleaned up.")
 
 
+@app.middleware('http')
+async def admission_control(request: Request, call_next):
+    admission = get_service_container().get_admission_controller()
+    route_class = None
+    if admission is not None:
+        route_class = classify_request(
+            request.method, request.url.path, config.api_v1_prefix, config.admission_export_prefixes
+        )
+    if route_class is None:
+        return await call_next(request)
+    try:
+        await admission.acquire(route_class)
+    except AdmissionRejected as e:
+        logger.warning(f"Shed request: {request.method} {request.url.path} | class={e.route_class}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, retry later"},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        response = await call_next(request)
+    except BaseException:
+        admission.release(route_class)
+        raise
+    # The body is still to be streamed: keep the slot until it has been sent
+    return release_after_body(response, lambda: admission.release(route_class))
+
+
+@app.middleware('http')
+async def query_budget(request: Request, call_next):
+    if not config.query_stats_enabled:
+        return await call_next(request)
+    with capture_queries() as stats:
+        response = await call_next(request)
+    summary = report_request(
+        stats, request.method, request.url.path,
+        config.query_budget_per_request, config.query_repeat_threshold
+    )
+    response.headers["X-Query-Count"] = str(summary["count"])
+    response.headers["X-Query-Time-Ms"] = str(summary["time_ms"])
+    return response
+
+
 @app.middleware('http')
 async def log_requests(request: Request, call_next):
     user = request.headers.get('X-User', 'anonymous')
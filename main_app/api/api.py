@@ -1,8 +1,12 @@
 from fastapi import APIRouter
-from main_app.api.endpoints import films, persons, genres
+from main_app.api.endpoints import films, persons, genres, suggest, changes, links, admin
 
 api_router = APIRouter()
 
 api_router.include_router(films.router, prefix="/films", tags=["films"])
 api_router.include_router(persons.router, prefix="/persons", tags=["persons"])
-api_router.include_router(genres.router, prefix="/genres", tags=["genres"])
\ No newline at end of file
+api_router.include_router(genres.router, prefix="/genres", tags=["genres"])
+api_router.include_router(suggest.router, prefix="/suggest", tags=["suggest"])
+api_router.include_router(links.router, prefix="/links", tags=["links"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
\ No newline at end of file
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+import logging
+
+from main_app.core.columnar import ColumnarFilmIndex
+from main_app.core.dependencies import get_film_columns, get_health_status, get_slow_query_log, require_admin
+from main_app.core.slow_queries import SlowQueryLog
+
+logger = logging.getLogger('films_api')
+
+router = APIRouter()
+
+@router.get("/stats/", response_model=dict)
+async def get_stats(status: dict = Depends(get_health_status)):
+    """
+    Runtime statistics of the service container (e.g. coalesced reads).
+    """
+    return status
+
+@router.get("/slow-queries/", response_model=dict, dependencies=[Depends(require_admin)])
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Most recent entries to return"),
+    log: Optional[SlowQueryLog] = Depends(get_slow_query_log)
+):
+    """
+    Most recent slow statements with their calling repository method and EXPLAIN plan.
+    """
+    if log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled")
+    return log.snapshot(limit)
+
+@router.delete("/slow-queries/", status_code=204, dependencies=[Depends(require_admin)])
+async def clear_slow_queries(log: Optional[SlowQueryLog] = Depends(get_slow_query_log)):
+    """
+    Empty the slow query ring buffer and forget captured plans.
+    """
+    if log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled")
+    log.clear()
+
+@router.get("/film-columns/consistency/", response_model=dict, dependencies=[Depends(require_admin)])
+async def check_film_columns(index: Optional[ColumnarFilmIndex] = Depends(get_film_columns)):
+    """
+    Compare the in-memory film columns with Postgres: missing, extra and changed films and misordered sort keys.
+    """
+    if index is None:
+        raise HTTPException(status_code=404, detail="Film columns are disabled")
+    return await index.check()
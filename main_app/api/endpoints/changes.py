@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+import logging
+
+from main_app.core.config import config_provider
+from main_app.core.dependencies import get_change_service
+from main_app.core.pagination import InvalidCursorError
+from main_app.core.services import ChangeService
+
+logger = logging.getLogger('films_api')
+
+router = APIRouter()
+
+@router.get("/", response_model=dict)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Token returned as `next` by the previous call; omit for a full sync"),
+    limit: int = Query(config_provider.settings.changes_page_size, ge=1, le=5000, description="Maximum changes to return"),
+    change_service: ChangeService = Depends(get_change_service)
+):
+    """
+    Films, persons and genres created, updated or deleted after the `since` token.
+
+    Changes come oldest first as `upsert` (fetch the entity again) or `delete`.
+    Store `next` and pass it back as `since`; keep polling while `has_more` is true.
+    """
+    try:
+        feed = await change_service.get_changes(since, limit)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    logger.info(f"Served change feed: {len(feed['changes'])} changes, has_more={feed['has_more']}")
+    return feed
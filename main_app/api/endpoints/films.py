@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Sequence, Union
 import uuid
 import logging
 
 from main_app.core.dependencies import get_film_service
+from main_app.core.fields import FILM_CARD_FIELDS, FILM_DETAIL_FIELDS, Fields, columns_for, expand_query, fields_query, serialize
+from main_app.core.repositories import FilmRepository, InvalidLinkError
 from main_app.core.services import FilmService
 from main_app import schemas
 
@@ -12,79 +14,149 @@ logger = logging.getLogger('films_api')
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+FACETS_DESCRIPTION = f"Comma-separated facet counts to include: {','.join(FilmRepository.FACETS)}"
+
+
+def parse_facets(facets: Optional[str]) -> List[str]:
+    """Validate the comma-separated facets parameter"""
+    if not facets:
+        return []
+    requested = [facet.strip() for facet in facets.split(",") if facet.strip()]
+    unknown = [facet for facet in requested if facet not in FilmRepository.FACETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facets: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+def list_fields(film_service: FilmService, fields: Optional[Fields]) -> Sequence[str]:
+    """Fields of the list items; the card fields are only served from the film_card read model"""
+    unavailable = [field for field in fields or () if field not in film_service.list_fields]
+    if unavailable:
+        raise HTTPException(status_code=400, detail=f"Fields need the film card read model: {', '.join(unavailable)}")
+    return film_service.list_fields
+
+
+@router.get("/", response_model=Union[List[dict], dict])
 async def get_films(
     sort: str = Query("-rating", description="Sort field with prefix - for descending"),
     page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
     page_number: int = Query(1, ge=1, description="Page number"),
     genre: Optional[uuid.UUID] = Query(None, description="Filter by genre UUID"),
+    film_type: Optional[str] = Query(None, alias="type", description="Filter by film type, e.g. movie"),
+    facets: Optional[str] = Query(None, description=FACETS_DESCRIPTION),
+    fields: Optional[Fields] = Depends(fields_query(FILM_CARD_FIELDS)),
+    expand: Optional[Fields] = Depends(expand_query(FilmRepository.EXPANSIONS)),
     film_service: FilmService = Depends(get_film_service),
     request: Request = None
 ):
     """
     Get list of films with optional filtering and sorting.
+
+    With the film card read model, items also carry `genre_names` and `top_cast`.
+    With `facets`, the response becomes `{"items": [...], "facets": {...}}`.
+    With `expand=genres,persons`, genres and role-grouped persons are inlined in each item.
     """
     user = request.headers.get('X-User', 'anonymous') if request else 'anonymous'
-    logger.info(f"User {user} requested films list: sort={sort}, page={page_number}, size={page_size}, genre={genre}")
+    logger.info(f"User {user} requested films list: sort={sort}, page={page_number}, size={page_size}, genre={genre}, type={film_type}")
     skip = (page_number - 1) * page_size
+    requested_facets = parse_facets(facets)
+    allowed = list_fields(film_service, fields)
     
     films = await film_service.get_films(
         skip=skip,
         limit=page_size,
         sort_by=sort,
-        genre_id=genre
+        genre_id=genre,
+        columns=columns_for(fields) if fields else None,
+        film_type=film_type
     )
     
-    return [
-        {
-            "uuid": str(film.id),
-            "title": film.title,
-            "imdb_rating": film.rating
-        }
-        for film in films
-    ]
-
-@router.get("/search/", response_model=List[dict])
+    items = [serialize(film, fields, allowed) for film in films]
+    if expand:
+        expansions = await film_service.get_film_expansions([film.id for film in films], expand)
+        for item, film in zip(items, films):
+            item.update(expansions.get(film.id, {}))
+    if not requested_facets:
+        return items
+    return {
+        "items": items,
+        "facets": await film_service.get_film_facets(requested_facets, genre_id=genre, film_type=film_type)
+    }
+
+@router.get("/search/", response_model=Union[List[dict], dict])
 async def search_films(
     query: str = Query(..., description="Search query"),
     page_number: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
+    facets: Optional[str] = Query(None, description=FACETS_DESCRIPTION),
+    fields: Optional[Fields] = Depends(fields_query(FILM_CARD_FIELDS)),
+    expand: Optional[Fields] = Depends(expand_query(FilmRepository.EXPANSIONS)),
     film_service: FilmService = Depends(get_film_service)
 ):
     """
     Search films by title.
+
+    With the film card read model, items also carry `genre_names` and `top_cast`.
+    With `facets`, the response becomes `{"items": [...], "facets": {...}}`.
+    With `expand=genres,persons`, genres and role-grouped persons are inlined in each item.
     """
     skip = (page_number - 1) * page_size
+    requested_facets = parse_facets(facets)
+    allowed = list_fields(film_service, fields)
     
-    films = await film_service.search_films(query=query, skip=skip, limit=page_size)
+    films = await film_service.search_films(
+        query=query, skip=skip, limit=page_size, columns=columns_for(fields) if fields else None
+    )
     
-    return [
-        {
-            "uuid": str(film.id),
-            "title": film.title,
-            "imdb_rating": film.rating
-        }
-        for film in films
-    ]
+    items = [serialize(film, fields, allowed) for film in films]
+    if expand:
+        expansions = await film_service.get_film_expansions([film.id for film in films], expand)
+        for item, film in zip(items, films):
+            item.update(expansions.get(film.id, {}))
+    if not requested_facets:
+        return items
+    return {
+        "items": items,
+        "facets": await film_service.get_film_facets(requested_facets, query=query)
+    }
 
 
 @router.get("/{film_id}/", response_model=dict)
 async def get_film_detail(
     film_id: uuid.UUID, 
+    fields: Optional[Fields] = Depends(fields_query(FILM_DETAIL_FIELDS)),
     film_service: FilmService = Depends(get_film_service),
     request: Request = None
 ):
     """
     Get detailed information about a specific film.
+
+    With `fields`, only those fields are returned and genres/persons are only loaded when requested.
     """
     user = request.headers.get('X-User', 'anonymous') if request else 'anonymous'
-    film_detail = await film_service.get_film_detail(film_id)
+    film_detail = await film_service.get_film_detail(film_id, fields=fields)
     if not film_detail:
         logger.warning(f"User {user} requested missing film: {film_id}")
         raise HTTPException(status_code=404, detail="Film not found")
     logger.info(f"User {user} viewed film detail: {film_id}")
     return film_detail
 
+@router.get("/{film_id}/similar/", response_model=List[dict])
+async def get_similar_films(
+    film_id: uuid.UUID,
+    limit: int = Query(10, ge=1, le=50, description="Number of similar films to return"),
+    film_service: FilmService = Depends(get_film_service)
+):
+    """
+    Films sharing the most genres, directors, writers and lead actors with this film.
+
+    Served from the table written by `python -m main_app.core.similarity`.
+    """
+    similar = await film_service.get_similar_films(film_id, limit=limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Film not found")
+    return similar
+
 @router.post("/", response_model=schemas.FilmResponse)
 async def create_film(
     film: schemas.FilmCreate, 
@@ -98,6 +170,48 @@ async def create_film(
     logger.info(f"User {user} creating film: {film}")
     return await film_service.create_film(film)
 
+@router.post("/composite/", response_model=schemas.FilmWithLinksResponse)
+async def create_film_with_links(
+    film: schemas.FilmWithLinks,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Create a film together with its genres and role-tagged persons in one transaction.
+
+    Persons are billed in the order given.
+    """
+    user = request.headers.get('X-User', 'anonymous') if request else 'anonymous'
+    try:
+        created = await film_service.save_film_with_links(film)
+    except InvalidLinkError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    logger.info(f"User {user} created film {created['id']} with {len(film.genre_ids)} genres and {len(film.persons)} persons")
+    return created
+
+@router.put("/{film_id}/composite/", response_model=schemas.FilmWithLinksResponse)
+async def replace_film_with_links(
+    film_id: uuid.UUID,
+    film: schemas.FilmWithLinks,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Replace a film's fields, genres and persons in one transaction; links not listed are removed.
+
+    Persons that stay linked keep their billing; newly listed persons are billed after them.
+    """
+    user = request.headers.get('X-User', 'anonymous') if request else 'anonymous'
+    try:
+        replaced = await film_service.save_film_with_links(film, film_id=film_id)
+    except InvalidLinkError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if replaced is None:
+        logger.warning(f"User {user} tried to replace missing film: {film_id}")
+        raise HTTPException(status_code=404, detail="Film not found")
+    logger.info(f"User {user} replaced film {film_id} with {len(film.genre_ids)} genres and {len(film.persons)} persons")
+    return replaced
+
 @router.put("/{film_id}/", response_model=schemas.FilmResponse)
 async def update_film(
     film_id: uuid.UUID,
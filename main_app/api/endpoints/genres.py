@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 import logging
 
-from main_app.core.dependencies import get_genre_service
+from main_app.core.catalog import GenreCatalog
+from main_app.core.dependencies import get_genre_catalog, get_genre_service
+from main_app.core.fields import GENRE_FIELDS, Fields, columns_for, fields_query, project, serialize
 from main_app.core.services import GenreService
 from main_app import schemas
 
@@ -16,13 +19,27 @@ router = APIRouter()
 async def get_genres(
     page_size: int = Query(100, ge=1, le=200, description="Number of items per page"),
     page_number: int = Query(1, ge=1, description="Page number"),
-    genre_service: GenreService = Depends(get_genre_service)
+    fields: Optional[Fields] = Depends(fields_query(GENRE_FIELDS)),
+    genre_service: GenreService = Depends(get_genre_service),
+    catalog: GenreCatalog = Depends(get_genre_catalog)
 ):
     """
     Get list of all genres.
+
+    With `fields`, only those keys are returned.
     """
     logger.info(f"Requested genres list: page={page_number}, size={page_size}")
     skip = (page_number - 1) * page_size
+
+    snapshot = catalog.snapshot
+    if snapshot is not None:
+        if fields:
+            return JSONResponse([project(document, fields) for document in snapshot.documents[skip:skip + page_size]])
+        return Response(content=snapshot.page(skip, page_size), media_type="application/json")
+
+    if fields:
+        genres = await genre_service.get_genres(skip=skip, limit=page_size, columns=columns_for(fields))
+        return JSONResponse([serialize(genre, fields, GENRE_FIELDS) for genre in genres])
     
     genres = await genre_service.get_genres(skip=skip, limit=page_size)
     
@@ -38,16 +55,32 @@ async def get_genres(
 @router.get("/{genre_id}/", response_model=schemas.GenreResponse)
 async def get_genre_detail(
     genre_id: uuid.UUID, 
-    genre_service: GenreService = Depends(get_genre_service)
+    fields: Optional[Fields] = Depends(fields_query(GENRE_FIELDS)),
+    genre_service: GenreService = Depends(get_genre_service),
+    catalog: GenreCatalog = Depends(get_genre_catalog)
 ):
     """
     Get detailed information about a specific genre.
+
+    With `fields`, only those keys are returned.
     """
-    genre = await genre_service.get_genre(genre_id)
+    snapshot = catalog.snapshot
+    if snapshot is not None:
+        payload = snapshot.detail(genre_id)
+        if payload is None:
+            logger.warning(f"Requested missing genre: {genre_id}")
+            raise HTTPException(status_code=404, detail="Genre not found")
+        if fields:
+            return JSONResponse(project(snapshot.documents_by_id[genre_id], fields))
+        return Response(content=payload, media_type="application/json")
+
+    genre = await genre_service.get_genre(genre_id, columns=columns_for(fields) if fields else None)
     if not genre:
         logger.warning(f"Requested missing genre: {genre_id}")
         raise HTTPException(status_code=404, detail="Genre not found")
     logger.info(f"Viewed genre detail: {genre_id}")
+    if fields:
+        return JSONResponse(serialize(genre, fields, GENRE_FIELDS))
     
     return {
         "uuid": str(genre.id),
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+import logging
+
+from main_app.core.dependencies import get_film_service
+from main_app.core.repositories import InvalidLinkError
+from main_app.core.services import FilmService
+from main_app import schemas
+
+logger = logging.getLogger('films_api')
+
+router = APIRouter()
+
+
+async def _change_links(film_service: FilmService, kind: str, operation: str, links, request: Request):
+    user = request.headers.get('X-User', 'anonymous') if request else 'anonymous'
+    try:
+        result = await film_service.change_links(kind, operation, links)
+    except InvalidLinkError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    logger.info(f"User {user} {operation}ed {kind} links: {result}")
+    return result
+
+@router.post("/genres/attach/", response_model=schemas.LinkBatchResult)
+async def attach_genres(
+    batch: schemas.GenreLinkBatch,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Link many films to genres in one statement; pairs already linked are skipped.
+
+    The whole batch is rejected with 400 when a film or genre does not exist.
+    """
+    links = [(link.film_id, link.genre_id) for link in batch.links]
+    return await _change_links(film_service, "genres", "attach", links, request)
+
+@router.post("/genres/detach/", response_model=schemas.LinkBatchResult)
+async def detach_genres(
+    batch: schemas.GenreLinkBatch,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Unlink many films from genres in one statement; pairs not linked are skipped.
+    """
+    links = [(link.film_id, link.genre_id) for link in batch.links]
+    return await _change_links(film_service, "genres", "detach", links, request)
+
+@router.post("/persons/attach/", response_model=schemas.LinkBatchResult)
+async def attach_persons(
+    batch: schemas.PersonLinkBatch,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Credit many persons on films in one statement; new credits are billed in the order given.
+
+    The whole batch is rejected with 400 when a film or person does not exist.
+    """
+    links = [(link.film_id, link.person_id, link.role) for link in batch.links]
+    return await _change_links(film_service, "persons", "attach", links, request)
+
+@router.post("/persons/detach/", response_model=schemas.LinkBatchResult)
+async def detach_persons(
+    batch: schemas.PersonLinkBatch,
+    film_service: FilmService = Depends(get_film_service),
+    request: Request = None
+):
+    """
+    Remove many film credits in one statement; credits that do not exist are skipped.
+    """
+    links = [(link.film_id, link.person_id, link.role) for link in batch.links]
+    return await _change_links(film_service, "persons", "detach", links, request)
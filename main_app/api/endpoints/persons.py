@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 import logging
 
-from main_app.core.dependencies import get_person_service
-from main_app.core.services import PersonService
+from main_app.core.config import config_provider
+from main_app.core.dependencies import get_film_service, get_person_service
+from main_app.core.fields import (
+    FILM_FIELDS, PERSON_DETAIL_FIELDS, PERSON_FIELDS, Fields, columns_for, expand_query, fields_query, serialize
+)
+from main_app.core.graph import GraphUnavailableError
+from main_app.core.pagination import InvalidCursorError, encode_cursor
+from main_app.core.repositories import FilmRepository
+from main_app.core.services import FilmService, PersonService
 from main_app import schemas
 
 logger = logging.getLogger('films_api')
@@ -17,6 +24,7 @@ async def search_persons(
     query: str = Query(..., description="Search query"),
     page_number: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
+    fields: Optional[Fields] = Depends(fields_query(PERSON_FIELDS)),
     person_service: PersonService = Depends(get_person_service)
 ):
     """
@@ -25,65 +33,103 @@ async def search_persons(
     logger.info(f"Requested persons search: query={query}, page={page_number}, size={page_size}")
     skip = (page_number - 1) * page_size
     
-    persons = await person_service.search_persons(query=query, skip=skip, limit=page_size)
+    persons = await person_service.search_persons(
+        query=query, skip=skip, limit=page_size, columns=columns_for(fields) if fields else None
+    )
     
-    return [
-        {
-            "uuid": str(person.id),
-            "full_name": person.full_name
-        }
-        for person in persons
-    ]
+    return [serialize(person, fields, PERSON_FIELDS) for person in persons]
 
 @router.get("/{person_id}/", response_model=dict)
 async def get_person_detail(
-    person_id: uuid.UUID, 
+    person_id: uuid.UUID,
+    films_limit: int = Query(config_provider.settings.person_detail_films, ge=1, le=100,
+                             description="Number of top rated films to include"),
+    fields: Optional[Fields] = Depends(fields_query(PERSON_DETAIL_FIELDS)),
     person_service: PersonService = Depends(get_person_service)
 ):
     """
     Get detailed information about a specific person.
+
+    Includes the top rated films, film counts per role and a cursor
+    for `/persons/{person_id}/film/` to continue the filmography.
     """
-    person = await person_service.get_person(person_id)
-    if not person:
+    person_detail = await person_service.get_person_detail(person_id, films_limit=films_limit, fields=fields)
+    if not person_detail:
         logger.warning(f"Requested missing person: {person_id}")
         raise HTTPException(status_code=404, detail="Person not found")
     logger.info(f"Viewed person detail: {person_id}")
-    
-    return {
-        "uuid": str(person.id),
-        "full_name": person.full_name,
-        "films": [
-            {
-                "uuid": str(film.id),
-                "title": film.title,
-                "imdb_rating": film.rating
-            }
-            for film in person.films
-        ]
-    }
+    return person_detail
 
 @router.get("/{person_id}/film/", response_model=List[dict])
 async def get_person_films(
     person_id: uuid.UUID,
+    response: Response,
     page_number: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
-    person_service: PersonService = Depends(get_person_service)
+    cursor: Optional[str] = Query(None, description="Filmography cursor; overrides page_number"),
+    fields: Optional[Fields] = Depends(fields_query(FILM_FIELDS)),
+    expand: Optional[Fields] = Depends(expand_query(FilmRepository.EXPANSIONS)),
+    person_service: PersonService = Depends(get_person_service),
+    film_service: FilmService = Depends(get_film_service)
 ):
     """
     Get films by person.
+
+    The `X-Next-Cursor` response header holds the cursor for the next page when the page is full.
+    With `expand=genres,persons`, genres and role-grouped persons are inlined in each item.
     """
     skip = (page_number - 1) * page_size
-    
-    films = await person_service.get_person_films(person_id, skip=skip, limit=page_size)
-    
-    return [
-        {
-            "uuid": str(film.id),
-            "title": film.title,
-            "imdb_rating": film.rating
-        }
-        for film in films
-    ]
+
+    try:
+        films = await person_service.get_person_films(
+            person_id, skip=skip, limit=page_size, cursor=cursor, columns=columns_for(fields) if fields else None
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if len(films) == page_size:
+        response.headers["X-Next-Cursor"] = encode_cursor(films[-1].rating, films[-1].id)
+
+    items = [serialize(film, fields, FILM_FIELDS) for film in films]
+    if expand:
+        expansions = await film_service.get_film_expansions([film.id for film in films], expand)
+        for item, film in zip(items, films):
+            item.update(expansions.get(film.id, {}))
+    return items
+
+@router.get("/{person_id}/collaborators/", response_model=List[dict])
+async def get_person_collaborators(
+    person_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=100, description="Number of collaborators to return"),
+    person_service: PersonService = Depends(get_person_service)
+):
+    """
+    Persons who worked with this person, ranked by the number of shared films.
+    """
+    collaborators = await person_service.get_collaborators(person_id, limit=limit)
+    if collaborators is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    return collaborators
+
+@router.get("/{person_id}/path/{other_id}/", response_model=dict)
+async def get_person_path(
+    person_id: uuid.UUID,
+    other_id: uuid.UUID,
+    max_degrees: int = Query(6, ge=1, le=12, description="Give up beyond this many degrees of separation"),
+    person_service: PersonService = Depends(get_person_service)
+):
+    """
+    Shortest chain of shared films between two persons (degrees of separation).
+
+    `films[i]` is the film `persons[i]` and `persons[i + 1]` worked on together.
+    """
+    try:
+        connection = await person_service.get_connection(person_id, other_id, max_degrees=max_degrees)
+    except GraphUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if connection is None:
+        raise HTTPException(status_code=404, detail=f"No connection within {max_degrees} degrees")
+    return connection
 
 @router.post("/", response_model=schemas.PersonResponse)
 async def create_person(
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Dict, List
+import logging
+
+from main_app.core.dependencies import get_film_service, get_person_service, get_suggest_index
+from main_app.core.services import FilmService, PersonService
+from main_app.core.suggest import SuggestIndex
+
+logger = logging.getLogger('films_api')
+
+router = APIRouter()
+
+@router.get("", response_model=Dict[str, List[dict]])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum suggestions per type"),
+    index: SuggestIndex = Depends(get_suggest_index),
+    film_service: FilmService = Depends(get_film_service),
+    person_service: PersonService = Depends(get_person_service)
+):
+    """
+    Typeahead suggestions for film titles and person names.
+
+    Films are ranked by rating and persons by number of films. Served from the
+    in-memory prefix index; falls back to indexed prefix queries when it is not loaded.
+    """
+    if index.loaded:
+        return index.suggest(q, limit)
+
+    films = await film_service.suggest_films(q, limit)
+    persons = await person_service.suggest_persons(q, limit)
+    return {
+        "films": [
+            {"uuid": str(film.id), "title": film.title, "imdb_rating": film.rating}
+            for film in films
+        ],
+        "persons": [
+            {"uuid": str(person.id), "full_name": person.full_name, "films_count": person.films_count}
+            for person in persons
+        ]
+    }
@@ -0,0 +1,189 @@
+from bisect import insort
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+import asyncio
+import itertools
+import logging
+import math
+
+from starlette.background import BackgroundTask, BackgroundTasks
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted before its queue deadline"""
+
+    def __init__(self, route_class: str, retry_after: int):
+        super().__init__(f"{route_class} capacity exhausted")
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+class RouteClass:
+    """Concurrency budget of one class of routes"""
+
+    def __init__(self, name: str, concurrency: int, queue: int, timeout: float, priority: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.priority = priority
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.timeout))
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "route_class", "future")
+
+    def __init__(self, priority: int, seq: int, route_class: RouteClass, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.route_class = route_class
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Admission control in front of the database connection pool.
+
+    A global limit (sized to the pool) is shared by all route classes and
+    each class has its own concurrency cap, bounded wait queue and queue
+    deadline. Free slots go to the highest-priority waiter whose class is
+    under its cap, so cheap detail reads are not starved by searches.
+    Requests that cannot join a full queue, or whose deadline passes, are
+    rejected immediately so clients can back off instead of timing out.
+    """
+
+    def __init__(self, total: int, classes: Dict[str, dict]):
+        self.total = total
+        self.active = 0
+        self.classes = {
+            name: RouteClass(name, **limits)
+            for name, limits in classes.items()
+        }
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self.logger = logging.getLogger(__name__)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {"active": rc.active, "waiting": rc.waiting, "rejected": rc.rejected}
+            for name, rc in self.classes.items()
+        }
+
+    @asynccontextmanager
+    async def admit(self, route_class: str):
+        await self.acquire(route_class)
+        try:
+            yield
+        finally:
+            self.release(route_class)
+
+    async def acquire(self, route_class: str):
+        rc = self.classes[route_class]
+        if rc.waiting >= rc.queue:
+            rc.rejected += 1
+            raise AdmissionRejected(rc.name, rc.retry_after)
+
+        waiter = _Waiter(rc.priority, next(self._seq), rc, asyncio.get_running_loop().create_future())
+        insort(self._queue, waiter)
+        rc.waiting += 1
+        self._dispatch()
+        try:
+            if not waiter.future.done():
+                await asyncio.wait_for(waiter.future, rc.timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                return  # granted right at the deadline
+            rc.rejected += 1
+            self.logger.warning(f"Admission deadline passed for {rc.name} after {rc.timeout}s")
+            raise AdmissionRejected(rc.name, rc.retry_after)
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(route_class)
+            raise
+        finally:
+            rc.waiting -= 1
+            if not waiter.future.done() or waiter.future.cancelled():
+                self._discard(waiter)
+
+    def release(self, route_class: str):
+        rc = self.classes[route_class]
+        rc.active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter):
+        try:
+            self._queue.remove(waiter)
+        except ValueError:
+            pass
+
+    def _dispatch(self):
+        """Grant free slots to waiters in priority order, skipping classes at their cap"""
+        position = 0
+        while self.active < self.total and position < len(self._queue):
+            waiter = self._queue[position]
+            if waiter.future.done():
+                del self._queue[position]
+                continue
+            rc = waiter.route_class
+            if rc.active >= rc.concurrency:
+                position += 1
+                continue
+            del self._queue[position]
+            rc.active += 1
+            self.active += 1
+            waiter.future.set_result(None)
+
+
+def release_after_body(response, release: Callable[[], None]):
+    """Hold an admission slot until the response body has been sent.
+
+    Responses from ``call_next`` stream their body after the middleware
+    returns. The slot is released when the body iterator finishes or is
+    closed, or at the latest by the response's background task.
+    """
+    released = False
+
+    def release_once():
+        nonlocal released
+        if not released:
+            released = True
+            release()
+
+    body = response.body_iterator
+
+    async def stream():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            release_once()
+
+    response.body_iterator = stream()
+    background = BackgroundTask(release_once)
+    response.background = background if response.background is None else BackgroundTasks([background, response.background])
+    return response
+
+
+def classify_request(method: str, path: str, api_prefix: str, export_prefixes: Sequence[str]) -> Optional[str]:
+    """Map a request to its admission route class; None means not limited"""
+    if not path.startswith(api_prefix):
+        return None
+    path = path[len(api_prefix):]
+    if path.startswith("/admin"):
+        return None
+    if any(path.startswith(prefix) for prefix in export_prefixes):
+        return "export"
+    if method not in ("GET", "HEAD"):
+        return "writes"
+    if "/search" in path or path.startswith("/suggest"):
+        return "search"
+    return "reads"
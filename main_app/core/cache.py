@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+import uuid
+
+
+class TTLCache:
+    """Small in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: any write may change cached results"""
+        self.clear()
+
+    async def invalidate_all(self) -> None:
+        self.clear()
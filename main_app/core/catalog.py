@@ -0,0 +1,112 @@
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
+
+from .. import models, schemas
+
+
+class GenreSnapshot:
+    """Immutable, pre-serialized view of the genre table"""
+
+    __slots__ = ("items", "by_id", "documents", "documents_by_id")
+
+    def __init__(self, genres=()):
+        items = []
+        by_id = {}
+        documents = []
+        for genre in genres:
+            response = schemas.GenreResponse.model_validate(genre)
+            payload = response.model_dump_json(by_alias=True).encode()
+            items.append(payload)
+            by_id[genre.id] = payload
+            documents.append(response.model_dump(mode="json", by_alias=True))
+        self.items: Tuple[bytes, ...] = tuple(items)
+        self.by_id: Mapping[uuid.UUID, bytes] = MappingProxyType(by_id)
+        # Plain documents for responses projected to a sparse fieldset
+        self.documents: Tuple[dict, ...] = tuple(documents)
+        self.documents_by_id: Mapping[uuid.UUID, dict] = MappingProxyType(dict(zip(by_id, documents)))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def page(self, skip: int = 0, limit: int = 100) -> bytes:
+        """JSON array bytes for a page of genres"""
+        return b"[" + b",".join(self.items[skip:skip + limit]) + b"]"
+
+    def detail(self, genre_id: uuid.UUID) -> Optional[bytes]:
+        """JSON object bytes for a single genre"""
+        return self.by_id.get(genre_id)
+
+
+class GenreCatalog:
+    """In-memory genre catalog served without touching the database.
+
+    The snapshot is rebuilt from scratch and swapped in with a single
+    reference assignment, so readers never observe a partial catalog.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._snapshot: Optional[GenreSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[GenreSnapshot]:
+        return self._snapshot
+
+    async def reload(self, session: AsyncSession) -> GenreSnapshot:
+        """Rebuild the snapshot from the genre table"""
+        async with self._lock:
+            query = select(models.Genre).options(noload('*')).order_by(models.Genre.name, models.Genre.id)
+            result = await session.execute(query)
+            snapshot = GenreSnapshot(result.scalars().all())
+            self._snapshot = snapshot
+        self.logger.info(f"Genre catalog loaded: {len(snapshot)} genres")
+        return snapshot
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: reload after a genre write made by another worker or in SQL"""
+        if entity_type == "Genre":
+            await self.invalidate_all()
+
+    async def invalidate_all(self) -> None:
+        if self.loaded and self.session_factory is not None:
+            async with self.session_factory() as session:
+                await self.reload(session)
+
+    def start_refresh(self, session_factory, interval: float):
+        """Periodically reload the catalog to pick up changes made outside the API"""
+        if interval <= 0 or self._refresh_task is not None:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(session_factory, interval))
+
+    async def _refresh_loop(self, session_factory, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.reload(session)
+            except Exception as e:
+                self.logger.warning(f"Genre catalog refresh failed, keeping previous snapshot: {e}")
+
+    async def stop(self):
+        """Stop the periodic refresh"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
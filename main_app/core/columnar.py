@@ -0,0 +1,502 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import datetime
+import logging
+import time
+import uuid
+
+from sqlalchemy import select, func, LargeBinary
+
+from .. import models
+from .leaderboards import FilmRow
+
+# NumPy is imported inside the functions that need it so that importing the
+# application (tests, alembic, gunicorn preload) does not pay for it.
+
+
+def _to_uuid(raw: bytes) -> uuid.UUID:
+    # Fixed-width bytes drop trailing NUL bytes when read back
+    return uuid.UUID(bytes=bytes(raw).ljust(16, b"\0"))
+
+
+class FilmColumns:
+    """The film catalog as NumPy column arrays for list queries.
+
+    Rows are positions in the column arrays. Each sort field has a permutation
+    of the live rows in SQL ``ORDER BY field ASC, id ASC`` order (NULL last);
+    read backwards it is exactly ``ORDER BY field DESC, id DESC`` (NULL first),
+    so one array serves both directions. Genre membership is one packed bitset
+    per genre. Deleted rows stay in the columns and only leave the permutations.
+
+    Titles sort by their rank in Postgres' own ``ORDER BY title, id`` so the
+    database collation decides, not Python string comparison. A written title
+    has no known rank: title sorts are refused (``title_stale``) until the next
+    rebuild.
+    """
+
+    def __init__(self, ids, titles, ratings, dates, types, type_names, title_ranks, genres):
+        import numpy as np
+
+        self.ids = ids
+        self.titles = titles
+        self.ratings = ratings
+        self.dates = dates
+        self.types = types
+        self.type_names: List[str] = list(type_names)
+        self.title_ranks = title_ranks
+        self.genres: Dict[uuid.UUID, Any] = genres
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.title_stale = False
+        self._type_codes = {name: code for code, name in enumerate(self.type_names)}
+        # Sorted ids with their row for lookups by id
+        self._lookup_rows = np.argsort(ids, kind="stable")
+        self._lookup_ids = ids[self._lookup_rows]
+        id_rank = np.empty(len(ids), dtype=np.int64)
+        id_rank[self._lookup_rows] = np.arange(len(ids))
+        self.orders = {
+            "rating": np.lexsort((id_rank, np.nan_to_num(ratings), np.isnan(ratings))),
+            "creation_date": np.lexsort((id_rank, dates.view(np.int64), np.isnat(dates))),
+            "title": np.argsort(title_ranks, kind="stable"),
+        }
+
+    @classmethod
+    def build(cls, films: Iterable[Tuple], links: Iterable[Tuple[bytes, uuid.UUID]]) -> "FilmColumns":
+        """Build from ``(id bytes, title, rating, creation_date, type, title rank)`` rows and genre links"""
+        import numpy as np
+
+        films = list(films)
+        ids = np.array([film[0] for film in films], dtype="S16")
+        titles = np.array([film[1] for film in films], dtype=object)
+        ratings = np.array([np.nan if film[2] is None else film[2] for film in films], dtype=np.float64)
+        dates = np.array([film[3] for film in films], dtype="datetime64[D]")
+        type_names, types = np.unique(np.array([film[4] for film in films], dtype=object), return_inverse=True) \
+            if films else (np.array([], dtype=object), np.array([], dtype=np.int64))
+        title_ranks = np.array([film[5] for film in films], dtype=np.int64)
+        columns = cls(ids, titles, ratings, dates, types.astype(np.int16).ravel(), type_names.tolist(),
+                      title_ranks, {})
+
+        by_genre: Dict[uuid.UUID, List[bytes]] = {}
+        for film_id, genre_id in links:
+            by_genre.setdefault(genre_id, []).append(film_id)
+        for genre_id, film_ids in by_genre.items():
+            rows = columns._rows(np.array(film_ids, dtype="S16"))
+            mask = np.zeros(len(ids), dtype=bool)
+            mask[rows[rows >= 0]] = True
+            columns.genres[genre_id] = np.packbits(mask, bitorder="little")
+        return columns
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.ids, self.ratings, self.dates, self.types, self.title_ranks, self.alive,
+                  self._lookup_ids, self._lookup_rows, *self.orders.values(), *self.genres.values()]
+        # Title strings are Python objects; count their pointers only
+        return sum(array.nbytes for array in arrays) + self.titles.nbytes
+
+    def _rows(self, keys):
+        """Row of each id in ``keys`` (an S16 array), -1 when unknown"""
+        import numpy as np
+
+        if len(self._lookup_ids) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._lookup_ids, keys), len(self._lookup_ids) - 1)
+        found = self._lookup_ids[positions] == keys
+        return np.where(found, self._lookup_rows[positions], -1)
+
+    def _find(self, film_id: uuid.UUID) -> Optional[int]:
+        import numpy as np
+
+        row = int(self._rows(np.array([film_id.bytes], dtype="S16"))[0])
+        return row if row >= 0 else None
+
+    def row(self, film_id: uuid.UUID) -> Optional[int]:
+        row = self._find(film_id)
+        return row if row is not None and self.alive[row] else None
+
+    def film(self, row: int) -> FilmRow:
+        rating = float(self.ratings[row])
+        return FilmRow(_to_uuid(self.ids[row]), self.titles[row], None if rating != rating else rating)
+
+    def page(self, sort_by: str, skip: int, limit: int, genre_id: Optional[uuid.UUID] = None,
+             film_type: Optional[str] = None) -> Optional[List[FilmRow]]:
+        """A page of ``GET /films/``, or None for sorts this engine cannot order like SQL"""
+        descending = sort_by.startswith("-")
+        field = sort_by[1:] if descending else sort_by
+        if field not in self.orders or (field == "title" and self.title_stale):
+            return None
+        order = self.orders[field][::-1] if descending else self.orders[field]
+
+        bits, code = None, None
+        if genre_id is not None:
+            bits = self.genres.get(genre_id)
+            if bits is None:
+                return []
+        if film_type is not None:
+            code = self._type_codes.get(film_type)
+            if code is None:
+                return []
+        if bits is None and code is None:
+            rows = order[skip:skip + limit]
+        else:
+            rows = self._scan(order, skip + limit, bits, code)[skip:]
+        return [self.film(int(row)) for row in rows]
+
+    def _scan(self, order, wanted: int, bits, code):
+        """First ``wanted`` rows of ``order`` passing the filters, scanning in growing blocks"""
+        import numpy as np
+
+        matched, found, start = [], 0, 0
+        block = max(4096, 4 * wanted)
+        while found < wanted and start < len(order):
+            rows = order[start:start + block]
+            keep = np.ones(len(rows), dtype=bool)
+            if bits is not None:
+                keep &= ((bits[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1).astype(bool)
+            if code is not None:
+                keep &= self.types[rows] == code
+            rows = rows[keep]
+            matched.append(rows)
+            found += len(rows)
+            start += block
+            block *= 4
+        return np.concatenate(matched)[:wanted] if matched else np.empty(0, dtype=np.int64)
+
+    def _key(self, field: str, row: int) -> Tuple:
+        """Ascending sort key of ``row``, matching the permutation of ``field``"""
+        film_id = bytes(self.ids[row])
+        if field == "rating":
+            rating = float(self.ratings[row])
+            return (rating != rating, 0.0 if rating != rating else rating, film_id)
+        if field == "creation_date":
+            date = self.dates[row]
+            return (bool(date != date), 0 if date != date else int(date.astype("int64")), film_id)
+        return (int(self.title_ranks[row]),)
+
+    def _unlink(self, row: int):
+        import numpy as np
+
+        for field, order in self.orders.items():
+            self.orders[field] = np.delete(order, np.flatnonzero(order == row))
+
+    def _link(self, row: int):
+        import numpy as np
+
+        for field, order in self.orders.items():
+            if field == "title" and self.title_ranks[row] < 0:
+                continue
+            position = bisect_left(order, self._key(field, row), key=lambda other: self._key(field, int(other)))
+            self.orders[field] = np.insert(order, position, row)
+
+    def _set_genres(self, row: int, genre_ids: Set[uuid.UUID]):
+        import numpy as np
+
+        size = (len(self.ids) + 7) // 8
+        for genre_id in set(self.genres) | genre_ids:
+            bits = self.genres.get(genre_id)
+            if bits is None:
+                bits = np.zeros(size, dtype=np.uint8)
+            elif len(bits) < size:
+                bits = np.concatenate([bits, np.zeros(size - len(bits), dtype=np.uint8)])
+            if genre_id in genre_ids:
+                bits[row >> 3] |= np.uint8(1 << (row & 7))
+            else:
+                bits[row >> 3] &= np.uint8(~(1 << (row & 7)) & 0xFF)
+            self.genres[genre_id] = bits
+
+    def upsert(self, film_id: uuid.UUID, title: str, rating: Optional[float], creation_date: Optional[datetime.date],
+               film_type: str, genre_ids: Set[uuid.UUID]):
+        """Apply a created or updated film"""
+        import numpy as np
+
+        row = self._find(film_id)
+        if row is None:
+            row = self._append(film_id)
+        elif self.alive[row]:
+            self._unlink(row)
+        self.alive[row] = True
+        if self.title_ranks[row] < 0 or self.titles[row] != title:
+            self.title_ranks[row] = -1
+            self.title_stale = True
+        self.titles[row] = title
+        self.ratings[row] = np.nan if rating is None else rating
+        self.dates[row] = np.datetime64("NaT") if creation_date is None else np.datetime64(creation_date, "D")
+        if film_type not in self._type_codes:
+            self._type_codes[film_type] = len(self.type_names)
+            self.type_names.append(film_type)
+        self.types[row] = self._type_codes[film_type]
+        self._set_genres(row, genre_ids)
+        self._link(row)
+
+    def _append(self, film_id: uuid.UUID) -> int:
+        import numpy as np
+
+        row = len(self.ids)
+        key = np.array([film_id.bytes], dtype="S16")
+        self.ids = np.concatenate([self.ids, key])
+        self.titles = np.concatenate([self.titles, np.array([""], dtype=object)])
+        self.ratings = np.append(self.ratings, np.nan)
+        self.dates = np.append(self.dates, np.datetime64("NaT", "D"))
+        self.types = np.append(self.types, np.int16(0))
+        self.title_ranks = np.append(self.title_ranks, np.int64(-1))
+        self.alive = np.append(self.alive, True)
+        position = int(np.searchsorted(self._lookup_ids, key)[0])
+        self._lookup_ids = np.insert(self._lookup_ids, position, key)
+        self._lookup_rows = np.insert(self._lookup_rows, position, row)
+        return row
+
+    def remove(self, film_id: uuid.UUID):
+        """Apply a deleted film"""
+        row = self.row(film_id)
+        if row is not None:
+            self._unlink(row)
+            self._set_genres(row, set())
+            self.alive[row] = False
+
+    def drop_genre(self, genre_id: uuid.UUID):
+        self.genres.pop(genre_id, None)
+
+    def _members(self, genre_id: uuid.UUID):
+        """Boolean membership of every row in a genre"""
+        import numpy as np
+
+        bits = self.genres.get(genre_id)
+        if bits is None:
+            return np.zeros(len(self.ids), dtype=bool)
+        members = np.unpackbits(bits, bitorder="little", count=min(len(bits) * 8, len(self.ids))).astype(bool)
+        return np.concatenate([members, np.zeros(len(self.ids) - len(members), dtype=bool)])
+
+    def compare(self, fresh: "FilmColumns", skip_ids: Set[uuid.UUID] = frozenset()) -> Dict[str, Any]:
+        """Differences from ``fresh`` (read from the database); films in ``skip_ids`` are not compared"""
+        import numpy as np
+
+        skip = np.array([film_id.bytes for film_id in skip_ids], dtype="S16")
+        current_live = self.alive & ~np.isin(self.ids, skip)
+        fresh_live = fresh.alive & ~np.isin(fresh.ids, skip)
+
+        rows = self._rows(fresh.ids)
+        found = fresh_live & (rows >= 0)
+        found[found] = self.alive[rows[found]]
+        missing = fresh_live & ~found
+        extra = current_live & (fresh._rows(self.ids) < 0)
+
+        ours, theirs = rows[found], np.flatnonzero(found)
+        changed = ~(
+            ((self.ratings[ours] == fresh.ratings[theirs]) | (np.isnan(self.ratings[ours]) & np.isnan(fresh.ratings[theirs])))
+            & (self.dates[ours].view(np.int64) == fresh.dates[theirs].view(np.int64))
+            & (np.array(self.type_names, dtype=object)[self.types[ours]]
+               == np.array(fresh.type_names, dtype=object)[fresh.types[theirs]])
+            & (self.titles[ours] == fresh.titles[theirs])
+        )
+        for genre_id in set(self.genres) | set(fresh.genres):
+            changed |= self._members(genre_id)[ours] != fresh._members(genre_id)[theirs]
+
+        misordered = []
+        for field, order in self.orders.items():
+            if field == "title" and self.title_stale:
+                continue
+            ids = self.ids[order][current_live[order]]
+            fresh_ids = fresh.ids[fresh.orders[field]][fresh_live[fresh.orders[field]]]
+            if len(ids) != len(fresh_ids) or not np.array_equal(ids, fresh_ids):
+                misordered.append(field)
+
+        examples = list(fresh.ids[missing][:5]) + list(self.ids[extra][:5]) + list(fresh.ids[theirs[changed]][:5])
+        return {
+            "films": int(fresh_live.sum()),
+            "missing": int(missing.sum()),
+            "extra": int(extra.sum()),
+            "changed": int(changed.sum()),
+            "misordered": misordered,
+            "consistent": not (missing.any() or extra.any() or changed.any() or misordered),
+            "examples": [str(_to_uuid(film_id)) for film_id in examples],
+        }
+
+
+class ColumnarFilmIndex:
+    """Optional in-memory engine answering ``GET /films/`` filters and sorts with array operations.
+
+    Loaded at startup, kept current by the change listener hooks and rebuilt
+    in the background (debounced) when a title write left the title order
+    stale. ``check`` compares it against Postgres; the periodic check swaps in
+    the database state when they disagree.
+    """
+
+    def __init__(self, session_factory, rebuild_debounce: float = 30, check_interval: float = 600):
+        self.session_factory = session_factory
+        self.rebuild_debounce = rebuild_debounce
+        self.check_interval = check_interval
+        self._columns: Optional[FilmColumns] = None
+        self._dirty = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # Films written while a build reads the database; replayed after the swap
+        self._written_during_build: Optional[Set[uuid.UUID]] = None
+        self.hits = 0
+        self.misses = 0
+        self.deltas = 0
+        self.rebuilds = 0
+        self.build_seconds: Optional[float] = None
+        self.last_check: Optional[Dict[str, Any]] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def loaded(self) -> bool:
+        return self._columns is not None
+
+    def page(self, sort_by: str, skip: int, limit: int, genre_id: Optional[uuid.UUID] = None,
+             film_type: Optional[str] = None) -> Optional[List[FilmRow]]:
+        """A page of the film list, or None when it must be read from SQL"""
+        columns = self._columns
+        result = columns.page(sort_by, skip, limit, genre_id, film_type) if columns is not None else None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def _read(self) -> FilmColumns:
+        film, gfw = models.FilmWork, models.genre_film_work
+        title_rank = func.row_number().over(order_by=(film.title, film.id)).label('title_rank')
+        # Raw 16-byte ids avoid creating a UUID object per row
+        films_query = select(
+            func.uuid_send(film.id, type_=LargeBinary), film.title, film.rating, film.creation_date, film.type,
+            title_rank
+        )
+        links_query = select(func.uuid_send(gfw.c.film_work_id, type_=LargeBinary), gfw.c.genre_id)
+        async with self.session_factory() as session:
+            films = (await session.execute(films_query)).all()
+            links = (await session.execute(links_query)).all()
+        return await asyncio.to_thread(FilmColumns.build, films, links)
+
+    async def load(self):
+        """Build the columns from the database and swap them in"""
+        started = time.perf_counter()
+        self._written_during_build = set()
+        try:
+            columns = await self._read()
+            written = self._written_during_build
+        finally:
+            self._written_during_build = None
+        self._columns = columns
+        for film_id in written:
+            await self._apply(film_id)
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        self.logger.info(
+            f"Film columns built in {self.build_seconds}s: {len(columns)} films, "
+            f"{len(columns.genres)} genres, {columns.nbytes / 2**20:.1f} MiB"
+        )
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._rebuild_loop())]
+            if self.check_interval > 0:
+                self._tasks.append(asyncio.create_task(self._check_loop()))
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: apply a written film as a delta"""
+        if self._columns is None:
+            return
+        if entity_type == "Genre" and operation == "delete":
+            self._columns.drop_genre(entity_id)
+        elif entity_type == "FilmWork":
+            if self._written_during_build is not None:
+                self._written_during_build.add(entity_id)
+            await self._apply(entity_id, deleted=operation == "delete")
+
+    async def _apply(self, film_id: uuid.UUID, deleted: bool = False):
+        film, gfw = models.FilmWork, models.genre_film_work
+        row, genre_ids = None, set()
+        if not deleted:
+            async with self.session_factory() as session:
+                row = (await session.execute(
+                    select(film.title, film.rating, film.creation_date, film.type).where(film.id == film_id)
+                )).first()
+                if row is not None:
+                    genre_ids = set((await session.execute(
+                        select(gfw.c.genre_id).where(gfw.c.film_work_id == film_id)
+                    )).scalars().all())
+        columns = self._columns
+        if row is None:
+            columns.remove(film_id)
+        else:
+            columns.upsert(film_id, *row, genre_ids)
+        self.deltas += 1
+        if columns.title_stale:
+            self._dirty.set()
+
+    async def invalidate_all(self) -> None:
+        """Rebuild when changes may have been missed"""
+        if self._columns is not None:
+            await self.load()
+
+    async def check(self, repair: bool = False) -> Dict[str, Any]:
+        """Compare the columns with Postgres; ``repair`` swaps in the database state on a mismatch"""
+        if self._columns is None:
+            return {"loaded": False}
+        self._written_during_build = set()
+        try:
+            fresh = await self._read()
+            written = self._written_during_build
+        finally:
+            self._written_during_build = None
+        # Films written while reading may legitimately differ; they are compared on the next check
+        report = self._columns.compare(fresh, written)
+        report["skipped"] = len(written)
+        self.last_check = report
+        if not report["consistent"]:
+            self.logger.warning(f"Film columns disagree with the database: {report}")
+            if repair:
+                self._columns = fresh
+                for film_id in written:
+                    await self._apply(film_id)
+                self.rebuilds += 1
+        return report
+
+    async def _rebuild_loop(self):
+        while True:
+            await self._dirty.wait()
+            # Let a burst of writes settle into a single rebuild
+            await asyncio.sleep(self.rebuild_debounce)
+            self._dirty.clear()
+            try:
+                await self.load()
+                self.rebuilds += 1
+            except Exception as e:
+                self.logger.warning(f"Rebuilding the film columns failed, keeping previous state: {e}")
+
+    async def _check_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check(repair=True)
+            except Exception as e:
+                self.logger.warning(f"Film columns consistency check failed: {e}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        columns = self._columns
+        if columns is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "films": len(columns),
+            "genres": len(columns.genres),
+            "bytes": columns.nbytes,
+            "title_stale": columns.title_stale,
+            "hits": self.hits,
+            "misses": self.misses,
+            "deltas": self.deltas,
+            "rebuilds": self.rebuilds,
+            "build_seconds": self.build_seconds,
+            "last_check": self.last_check,
+        }
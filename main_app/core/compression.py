@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Media types worth compressing; images, archives etc. are already compressed
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding of an ``Accept-Encoding`` header to its q-value"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header: str, available: Sequence[str]) -> Optional[str]:
+    """Pick the best available coding the client accepts; ``available`` is in server preference order"""
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type or "+xml" in content_type
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush so each streamed chunk reaches the client without waiting for the next one
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli (when installed) or gzip.
+
+    Complete bodies smaller than ``minimum_size`` are sent as-is. Streaming
+    responses (``more_body``) are compressed chunk by chunk with a flush
+    after each chunk, so exports keep flowing instead of being buffered.
+    Responses that already carry a ``Content-Encoding`` or have a media
+    type that does not compress well pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, brotli_enabled: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli_enabled and brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept, self.encodings) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+
+class _CompressingSend:
+    """``send`` wrapper deciding on the first body message whether to compress"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = self.start_message["headers"]
+            compressible = self._should_compress(headers)
+            if not compressible or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                if compressible:
+                    self.start_message["headers"] = self._with_vary(headers)
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers = [(name, value) for name, value in headers if name != b"content-length"]
+            headers.append((b"content-encoding", self.encoding.encode()))
+            headers = self._with_vary(headers)
+            if not more_body:
+                body = self.encoder.finish(body)
+                headers.append((b"content-length", str(len(body)).encode()))
+                self.start_message["headers"] = headers
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            self.start_message["headers"] = headers
+            await self.send(self.start_message)
+
+        body = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _should_compress(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        if self._has_header(headers, b"content-encoding") or self.start_message.get("status", 200) in (204, 304):
+            return False
+        for name, value in headers:
+            if name == b"content-type":
+                return is_compressible(value.decode("latin-1"))
+        return False
+
+    @staticmethod
+    def _has_header(headers, header: bytes) -> bool:
+        return any(name == header for name, _ in headers)
+
+    @staticmethod
+    def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+        """Add ``Accept-Encoding`` to ``Vary`` so caches keep one copy per coding"""
+        headers = list(headers)
+        for index, (name, value) in enumerate(headers):
+            if name == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[index] = (name, value + b", Accept-Encoding")
+                return headers
+        headers.append((b"vary", b"Accept-Encoding"))
+        return headers
@@ -22,10 +22,104 @@ class Settings(BaseSettings):
     cors_methods: list[str] = ["*"]
     cors_headers: list[str] = ["*"]
 
+    # Serving: more than one worker runs gunicorn with preloaded uvicorn workers
+    web_workers: int = 1
+    web_graceful_timeout: int = 30
+
+    # Connection budget shared by all workers: each worker gets
+    # (db_max_connections - db_reserved_connections) / web_workers connections,
+    # capped at db_pool_max_per_worker; a third is kept open, the rest is overflow
+    db_max_connections: int = 100
+    db_reserved_connections: int = 10
+    db_pool_max_per_worker: int = 15
+
     # Pagination defaults
     default_page_size: int = 50
     max_page_size: int = 100
 
+    # Person detail: number of top rated films embedded in the response
+    person_detail_films: int = 10
+
+    # In-memory genre catalog; refresh interval of 0 disables the periodic reload
+    genre_catalog_enabled: bool = True
+    genre_catalog_refresh_seconds: int = 300
+
+    # Materialized film_card read model for list and search endpoints
+    film_card_read_model: bool = False
+    film_card_refresh_seconds: int = 600
+    film_card_refresh_debounce_seconds: float = 5.0
+
+    # Cache for facet counts of popular list/search queries
+    facet_cache_size: int = 256
+    facet_cache_ttl_seconds: int = 60
+
+    # In-memory typeahead index for /suggest
+    suggest_index_enabled: bool = True
+
+    # In-memory top films per genre for genre-filtered, rating-sorted lists
+    genre_leaderboards_enabled: bool = True
+    genre_leaderboard_depth: int = 500
+
+    # NumPy column arrays answering GET /films/ filters and sorts in memory; the periodic
+    # consistency check against Postgres (0 disables it) swaps in the database state on a mismatch
+    film_columns_enabled: bool = False
+    film_columns_rebuild_debounce_seconds: float = 30.0
+    film_columns_check_seconds: int = 600
+
+    # NumPy CSR graph of person-film credits for collaborators and degrees of separation
+    collaboration_graph_enabled: bool = True
+    collaboration_graph_rebuild_debounce_seconds: float = 30.0
+
+    # Coalesce identical concurrent film reads into one query set
+    single_flight_enabled: bool = True
+
+    # Admission control: the total matches the default pool (pool_size 5 + max_overflow 10)
+    # and is capped at the per-worker pool when several workers share the connection budget.
+    # Lower priority numbers are served first when a slot frees up.
+    admission_control_enabled: bool = True
+    admission_total_concurrency: int = 15
+    admission_classes: dict[str, dict] = {
+        "reads": {"concurrency": 12, "queue": 200, "timeout": 2.0, "priority": 0},
+        "writes": {"concurrency": 5, "queue": 50, "timeout": 5.0, "priority": 1},
+        "search": {"concurrency": 6, "queue": 50, "timeout": 1.0, "priority": 2},
+        "export": {"concurrency": 2, "queue": 10, "timeout": 5.0, "priority": 3},
+    }
+    # Route prefixes (below the API prefix) admitted as "export": bulk change feed syncs
+    admission_export_prefixes: list[str] = ["/changes"]
+
+    # Per-request SQL statement counting with X-Query-Count headers; off in production, enable it
+    # in development and staging (QUERY_STATS_ENABLED=true). A budget of 0 disables the warning
+    query_stats_enabled: bool = False
+    query_budget_per_request: int = 20
+    query_repeat_threshold: int = 5
+
+    # Shared secret for /admin endpoints exposing SQL and full scans, sent as X-Admin-Token;
+    # unset keeps them disabled
+    admin_token: Optional[str] = None
+
+    # Opt-in slow query log; the first statement of each shape is EXPLAINed in the background
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_log_size: int = 200
+    slow_query_explain: bool = True
+
+    # LISTEN/NOTIFY invalidation of per-worker caches; a lost connection flushes everything
+    change_notifications_enabled: bool = True
+    change_notifications_reconnect_seconds: float = 1.0
+    change_notifications_keepalive_seconds: float = 30.0
+
+    # Change feed: rows younger than the settle window wait for the next poll so
+    # transactions that commit late are not skipped by an already issued token
+    changes_page_size: int = 500
+    changes_settle_seconds: float = 5.0
+
+    # Response compression; brotli is used when the optional brotli module is installed
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_enabled: bool = True
+    compression_brotli_quality: int = 4
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -50,6 +144,14 @@ class ConfigProvider:
     def get_sync_database_url(self) -> str:
         return self._settings.sync_database_url
     
+    def get_pool_limits(self) -> dict:
+        """Per-worker pool_size/max_overflow keeping all workers under the server's connection limit"""
+        settings = self._settings
+        budget = max(settings.db_max_connections - settings.db_reserved_connections, 1)
+        per_worker = max(min(budget // max(settings.web_workers, 1), settings.db_pool_max_per_worker), 1)
+        pool_size = max(per_worker // 3, 1)
+        return {"pool_size": pool_size, "max_overflow": per_worker - pool_size}
+
     def get_api_prefix(self) -> str:
         return self._settings.api_v1_prefix
     
@@ -1,9 +1,26 @@
-from typing import Optional
-from fastapi import Depends
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import logging
+import secrets
+import time
+
+from fastapi import Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_async_db
-from main_app.core.services import FilmService, GenreService, PersonService
+from database import dispose_engines, get_async_db, get_async_engine, AsyncSessionLocal
+from main_app.core.admission import AdmissionController
+from main_app.core.cache import TTLCache
+from main_app.core.catalog import GenreCatalog
+from main_app.core.columnar import ColumnarFilmIndex
+from main_app.core.config import config_provider
+from main_app.core.graph import CollaborationGraph
+from main_app.core.leaderboards import GenreLeaderboards
+from main_app.core.notifications import ChangeNotificationListener, listen_dsn
+from main_app.core.read_models import FilmCardRefresher
+from main_app.core.singleflight import SingleFlight
+from main_app.core.slow_queries import SlowQueryLog
+from main_app.core.suggest import SuggestIndex
+from main_app.core.services import ChangeListener, ChangeService, FilmService, GenreService, PersonService
 from main_app.core.repositories import FilmRepository, GenreRepository, PersonRepository
 
 
@@ -13,6 +30,40 @@ class ServiceContainer:
     def __init__(self):
         self._initialized = False
         self._search_service = None
+        self.startup_timings: Dict[str, float] = {}
+        self._genre_catalog = GenreCatalog(AsyncSessionLocal)
+        self._film_card_refresher: Optional[FilmCardRefresher] = None
+        self._suggest_index = SuggestIndex(AsyncSessionLocal)
+        self._collaboration_graph = CollaborationGraph(
+            AsyncSessionLocal, debounce=config_provider.settings.collaboration_graph_rebuild_debounce_seconds
+        )
+        self._leaderboards = GenreLeaderboards(AsyncSessionLocal, config_provider.settings.genre_leaderboard_depth)
+        self._film_columns = ColumnarFilmIndex(
+            AsyncSessionLocal,
+            rebuild_debounce=config_provider.settings.film_columns_rebuild_debounce_seconds,
+            check_interval=config_provider.settings.film_columns_check_seconds
+        )
+        self._single_flight = SingleFlight() if config_provider.settings.single_flight_enabled else None
+        self._admission = None
+        if config_provider.settings.admission_control_enabled:
+            pool = config_provider.get_pool_limits()
+            self._admission = AdmissionController(
+                min(config_provider.settings.admission_total_concurrency, pool["pool_size"] + pool["max_overflow"]),
+                config_provider.settings.admission_classes
+            )
+        self._facet_cache = TTLCache(
+            maxsize=config_provider.settings.facet_cache_size,
+            ttl=config_provider.settings.facet_cache_ttl_seconds
+        )
+        self._change_listeners: List[ChangeListener] = [self._facet_cache]
+        self._notifications: Optional[ChangeNotificationListener] = None
+        self._slow_query_log = None
+        if config_provider.settings.slow_query_log_enabled:
+            self._slow_query_log = SlowQueryLog(
+                config_provider.settings.slow_query_threshold_ms,
+                config_provider.settings.slow_query_log_size,
+                explain=config_provider.settings.slow_query_explain
+            )
     
     async def initialize(self):
         """Initialize the service container"""
@@ -20,16 +71,172 @@ class ServiceContainer:
             return
         # Semantic search initialization removed for now
         self._search_service = None
+
+        settings = config_provider.settings
+        if self._slow_query_log is not None:
+            self._slow_query_log.instrument(get_async_engine())
+
+        if settings.change_notifications_enabled:
+            # Listen before the caches below are loaded so no write falls in between
+            self._notifications = ChangeNotificationListener(
+                listen_dsn(config_provider.get_async_database_url()),
+                self._notification_targets,
+                reconnect_delay=settings.change_notifications_reconnect_seconds,
+                keepalive=settings.change_notifications_keepalive_seconds
+            )
+            # Writes of this worker reach its listeners through the services already
+            self._notifications.ignore_engine(get_async_engine())
+            with self._timed("change_notifications"):
+                await self._notifications.start()
+
+        if settings.genre_catalog_enabled:
+            with self._timed("genre_catalog"):
+                try:
+                    async with AsyncSessionLocal() as session:
+                        await self._genre_catalog.reload(session)
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Genre catalog preload failed, serving from database: {e}")
+            self._genre_catalog.start_refresh(AsyncSessionLocal, settings.genre_catalog_refresh_seconds)
+
+        if settings.film_card_read_model:
+            refresher = FilmCardRefresher(
+                AsyncSessionLocal,
+                interval=settings.film_card_refresh_seconds,
+                debounce=settings.film_card_refresh_debounce_seconds
+            )
+            with self._timed("film_card_read_model"):
+                try:
+                    await refresher.start()
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Film card read model unavailable: {e}")
+            if refresher.available:
+                self._film_card_refresher = refresher
+                self._change_listeners.append(refresher)
+
+        if settings.suggest_index_enabled:
+            with self._timed("suggest_index"):
+                try:
+                    await self._suggest_index.load()
+                    self._change_listeners.append(self._suggest_index)
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Suggest index build failed, serving from database: {e}")
+
+        if settings.genre_leaderboards_enabled:
+            with self._timed("genre_leaderboards"):
+                try:
+                    await self._leaderboards.load()
+                    self._change_listeners.append(self._leaderboards)
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Genre leaderboards build failed, serving from database: {e}")
+
+        if settings.film_columns_enabled:
+            with self._timed("film_columns"):
+                try:
+                    await self._film_columns.load()
+                    self._change_listeners.append(self._film_columns)
+                    self._film_columns.start()
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Film columns build failed, serving from database: {e}")
+
+        if settings.collaboration_graph_enabled:
+            with self._timed("collaboration_graph"):
+                try:
+                    await self._collaboration_graph.load()
+                    self._change_listeners.append(self._collaboration_graph)
+                    self._collaboration_graph.start()
+                except Exception as e:
+                    logging.getLogger('films_api').warning(f"Collaboration graph build failed, path queries disabled: {e}")
         self._initialized = True
     
+    def _notification_targets(self) -> List[ChangeListener]:
+        """Local state invalidated by writes committed anywhere"""
+        targets = list(self._change_listeners)
+        if self._genre_catalog.loaded:
+            targets.append(self._genre_catalog)
+        return targets
+
+    @contextmanager
+    def _timed(self, step: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[step] = round((time.perf_counter() - started) * 1000, 1)
+
     async def cleanup(self):
         """Cleanup resources"""
         self._search_service = None
+        if self._notifications is not None:
+            await self._notifications.stop()
+            self._notifications = None
+        await self._genre_catalog.stop()
+        if self._film_card_refresher is not None:
+            await self._film_card_refresher.stop()
+            self._change_listeners.remove(self._film_card_refresher)
+            self._film_card_refresher = None
+        await self._collaboration_graph.stop()
+        await self._film_columns.stop()
+        await self._leaderboards.stop()
+        for listener in (self._suggest_index, self._leaderboards, self._film_columns, self._collaboration_graph):
+            if listener in self._change_listeners:
+                self._change_listeners.remove(listener)
+        self._facet_cache.clear()
+        if self._slow_query_log is not None:
+            await self._slow_query_log.stop()
+        await dispose_engines()
     
     def get_search_service(self):
         """Get search service instance"""
         return self._search_service
 
+    def get_genre_catalog(self) -> GenreCatalog:
+        """Get the in-memory genre catalog"""
+        return self._genre_catalog
+
+    def get_suggest_index(self) -> SuggestIndex:
+        """Get the typeahead index"""
+        return self._suggest_index
+
+    def get_genre_leaderboards(self) -> Optional[GenreLeaderboards]:
+        """Get the per-genre rating leaderboards, once built"""
+        return self._leaderboards if self._leaderboards.loaded else None
+
+    def get_film_columns(self) -> Optional[ColumnarFilmIndex]:
+        """Get the in-memory columnar film list engine, once built"""
+        return self._film_columns if self._film_columns.loaded else None
+
+    def get_collaboration_graph(self) -> Optional[CollaborationGraph]:
+        """Get the person collaboration graph, once built"""
+        return self._collaboration_graph if self._collaboration_graph.loaded else None
+
+    def get_single_flight(self) -> Optional[SingleFlight]:
+        """Get the coalescer for identical concurrent reads"""
+        return self._single_flight
+
+    def get_admission_controller(self) -> Optional[AdmissionController]:
+        """Get the admission controller guarding database-bound routes"""
+        return self._admission
+
+    def get_slow_query_log(self) -> Optional[SlowQueryLog]:
+        """Get the slow query log, if enabled"""
+        return self._slow_query_log
+
+    def get_change_notifications(self) -> Optional[ChangeNotificationListener]:
+        """Get the cross-worker invalidation listener, if running"""
+        return self._notifications
+
+    def get_facet_cache(self) -> TTLCache:
+        """Get the cache for film facet counts"""
+        return self._facet_cache
+
+    def get_change_listeners(self) -> List[ChangeListener]:
+        """Get listeners notified after service-layer writes"""
+        return self._change_listeners
+
+    def film_cards_available(self) -> bool:
+        """Whether film lists can be read from the film_card read model"""
+        return self._film_card_refresher is not None
+
 
 # Global service container instance
 _service_container: Optional[ServiceContainer] = None
@@ -61,23 +268,79 @@ def get_film_service(
 ) -> FilmService:
     """Get film service instance with optional search service"""
     search_service = container.get_search_service()
-    return FilmService(db, search_service)
+    return FilmService(
+        db, search_service,
+        listeners=container.get_change_listeners(),
+        use_film_cards=container.film_cards_available(),
+        facet_cache=container.get_facet_cache(),
+        single_flight=container.get_single_flight(),
+        leaderboards=container.get_genre_leaderboards(),
+        film_columns=container.get_film_columns(),
+        session_factory=AsyncSessionLocal
+    )
+
+def get_genre_catalog(container: ServiceContainer = Depends(get_service_container)) -> GenreCatalog:
+    """Get the in-memory genre catalog"""
+    return container.get_genre_catalog()
+
+def get_suggest_index(container: ServiceContainer = Depends(get_service_container)) -> SuggestIndex:
+    """Get the typeahead index"""
+    return container.get_suggest_index()
 
-def get_genre_service(db: AsyncSession = Depends(get_async_db)) -> GenreService:
-    """Get genre service instance"""
-    return GenreService(db)
+def get_film_columns(container: ServiceContainer = Depends(get_service_container)) -> Optional[ColumnarFilmIndex]:
+    """Get the columnar film list engine (None when disabled or not built)"""
+    return container.get_film_columns()
 
-def get_person_service(db: AsyncSession = Depends(get_async_db)) -> PersonService:
+def get_slow_query_log(container: ServiceContainer = Depends(get_service_container)) -> Optional[SlowQueryLog]:
+    """Get the slow query log (None when disabled)"""
+    return container.get_slow_query_log()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject admin requests without the configured X-Admin-Token (all of them when none is configured)"""
+    expected = config_provider.settings.admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def get_genre_service(
+    db: AsyncSession = Depends(get_async_db),
+    container: ServiceContainer = Depends(get_service_container)
+) -> GenreService:
+    """Get genre service instance backed by the in-memory catalog"""
+    return GenreService(db, container.get_genre_catalog(), listeners=container.get_change_listeners())
+
+def get_person_service(
+    db: AsyncSession = Depends(get_async_db),
+    container: ServiceContainer = Depends(get_service_container)
+) -> PersonService:
     """Get person service instance"""
-    return PersonService(db)
+    return PersonService(db, listeners=container.get_change_listeners(), graph=container.get_collaboration_graph())
+
+def get_change_service(db: AsyncSession = Depends(get_async_db)) -> ChangeService:
+    """Get change feed service instance"""
+    return ChangeService(db, settle_seconds=config_provider.settings.changes_settle_seconds)
 
 # Health check dependencies
 def get_health_status(
     container: ServiceContainer = Depends(get_service_container)
 ) -> dict:
     """Get application health status"""
+    single_flight = container.get_single_flight()
+    admission = container.get_admission_controller()
+    notifications = container.get_change_notifications()
+    leaderboards = container.get_genre_leaderboards()
+    graph = container.get_collaboration_graph()
+    film_columns = container.get_film_columns()
     return {
         "services_initialized": container._initialized,
         "search_service_available": container.get_search_service() is not None,
-        "database_connected": True  # If we get here, DB is connected
+        "database_connected": True,  # If we get here, DB is connected
+        "single_flight": single_flight.stats() if single_flight is not None else None,
+        "admission": admission.stats() if admission is not None else None,
+        "genre_leaderboards": leaderboards.stats() if leaderboards is not None else None,
+        "film_columns": film_columns.stats() if film_columns is not None else None,
+        "collaboration_graph": graph.stats() if graph is not None else None,
+        "change_notifications": notifications.stats() if notifications is not None else None,
+        "startup_ms": container.startup_timings
     }
\ No newline at end of file
@@ -0,0 +1,99 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+import uuid
+
+from fastapi import HTTPException, Query
+
+# Whitelists of the public fields each endpoint can return, in response order
+FILM_FIELDS = ("uuid", "title", "imdb_rating")
+# List fields when films are read from the film_card read model: genre names and first actors too
+FILM_CARD_FIELDS = FILM_FIELDS + ("genre_names", "top_cast")
+FILM_DETAIL_FIELDS = FILM_FIELDS + ("description", "genre", "actors", "writers", "directors")
+PERSON_FIELDS = ("uuid", "full_name")
+PERSON_DETAIL_FIELDS = PERSON_FIELDS + ("films", "roles", "films_total", "films_cursor")
+# Genre responses are serialized by alias, so their id key is "id"
+GENRE_FIELDS = ("id", "name", "description")
+
+# Public names that differ from the column they are read from
+_COLUMN_NAMES = {"uuid": "id", "imdb_rating": "rating", "genre_names": "genres"}
+
+# Fields that are aggregated from other tables rather than read from a column
+_COMPUTED = {"genre", "actors", "writers", "directors", "films", "roles", "films_total", "films_cursor"}
+
+Fields = Tuple[str, ...]
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a sparse fieldset names a field outside the whitelist"""
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str], kind: str = "fields") -> Optional[Fields]:
+    """Validate a comma-separated ``fields`` (or ``expand``) value; None means the default"""
+    if not value:
+        return None
+    requested = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown {kind}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    # Keep the whitelist's order so responses look the same whatever order was requested
+    return tuple(field for field in allowed if field in requested) or None
+
+
+def fields_query(allowed: Sequence[str]) -> Callable[..., Optional[Fields]]:
+    """FastAPI dependency parsing the ``fields`` query parameter against a whitelist"""
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated fields to return: {','.join(allowed)}")
+    ) -> Optional[Fields]:
+        try:
+            return parse_fields(fields, allowed)
+        except InvalidFieldsError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    return dependency
+
+
+def expand_query(allowed: Sequence[str]) -> Callable[..., Optional[Fields]]:
+    """FastAPI dependency parsing the ``expand`` query parameter against the supported expansions"""
+
+    def dependency(
+        expand: Optional[str] = Query(None, description=f"Comma-separated relations to inline: {','.join(allowed)}")
+    ) -> Optional[Fields]:
+        try:
+            return parse_fields(expand, allowed, kind="expansions")
+        except InvalidFieldsError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    return dependency
+
+
+def columns_for(fields: Iterable[str]) -> Fields:
+    """Columns to select for the requested fields; the id is always selected"""
+    columns = ["id"]
+    for field in fields:
+        if field in _COMPUTED:
+            continue
+        column = _COLUMN_NAMES.get(field, field)
+        if column not in columns:
+            columns.append(column)
+    return tuple(columns)
+
+
+def wants(fields: Optional[Fields], *names: str) -> bool:
+    """Whether any of ``names`` is requested (everything is requested when fields is None)"""
+    return fields is None or any(name in fields for name in names)
+
+
+def project(document: Dict[str, Any], fields: Optional[Fields]) -> Dict[str, Any]:
+    """Subset of an already built document"""
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+def serialize(row: Any, fields: Optional[Fields], allowed: Sequence[str]) -> Dict[str, Any]:
+    """Build the response item for a row, reading only the requested column fields"""
+    item = {}
+    for field in fields or allowed:
+        value = getattr(row, _COLUMN_NAMES.get(field, field))
+        item[field] = str(value) if isinstance(value, uuid.UUID) else value
+    return item
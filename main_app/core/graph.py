@@ -0,0 +1,285 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import select, func, LargeBinary
+
+from .. import models
+
+
+class GraphUnavailableError(RuntimeError):
+    """Raised when a query needs the collaboration graph and it is not built"""
+
+
+# NumPy is imported inside the functions that need it so that importing the
+# application (tests, alembic, gunicorn preload) does not pay for it.
+
+
+def _ranges(indptr, nodes):
+    """Concatenated ``indices`` positions of the CSR rows of ``nodes`` plus each position's row"""
+    import numpy as np
+
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=nodes.dtype)
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.arange(total, dtype=np.int64) + np.repeat(starts - offsets, lengths)
+    return positions, np.repeat(nodes, lengths)
+
+
+def _csr(rows, columns, size: int):
+    """CSR ``(indptr, indices)`` of the edges ``rows -> columns`` over ``size`` rows"""
+    import numpy as np
+
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, columns[order].astype(np.int32)
+
+
+class GraphSnapshot:
+    """Immutable bipartite person-film graph in compressed sparse row form.
+
+    Persons and films are remapped to dense integers: the position of their
+    16-byte id in a sorted array, so an id is found by binary search and no
+    per-node Python objects are kept.
+    """
+
+    def __init__(self, person_ids, film_ids, person_films, film_persons):
+        self.person_ids = person_ids
+        self.film_ids = film_ids
+        self.person_indptr, self.person_films = person_films
+        self.film_indptr, self.film_persons = film_persons
+
+    @classmethod
+    def build(cls, person_bytes: List[bytes], film_bytes: List[bytes]) -> "GraphSnapshot":
+        """Build from parallel lists of raw 16-byte person and film ids (one per link row)"""
+        import numpy as np
+
+        person_ids, persons = np.unique(np.array(person_bytes, dtype="S16"), return_inverse=True)
+        film_ids, films = np.unique(np.array(film_bytes, dtype="S16"), return_inverse=True)
+        persons, films = persons.astype(np.int64).ravel(), films.astype(np.int64).ravel()
+        # A person credited in several roles of one film is a single edge
+        edges = np.unique(persons * max(len(film_ids), 1) + films)
+        persons, films = edges // max(len(film_ids), 1), edges % max(len(film_ids), 1)
+        return cls(
+            person_ids, film_ids,
+            _csr(persons, films, len(person_ids)),
+            _csr(films, persons, len(film_ids))
+        )
+
+    @property
+    def edges(self) -> int:
+        return len(self.person_films)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (
+            self.person_ids, self.film_ids, self.person_indptr, self.person_films, self.film_indptr, self.film_persons
+        ))
+
+    @staticmethod
+    def _find(ids, entity_id: uuid.UUID) -> Optional[int]:
+        import numpy as np
+
+        key = np.array([entity_id.bytes], dtype="S16")
+        position = int(np.searchsorted(ids, key)[0])
+        if position < len(ids) and ids[position] == key[0]:
+            return position
+        return None
+
+    @staticmethod
+    def _uuid(ids, index: int) -> uuid.UUID:
+        # Fixed-width bytes drop trailing NUL bytes when read back
+        return uuid.UUID(bytes=bytes(ids[index]).ljust(16, b"\0"))
+
+    def person_index(self, person_id: uuid.UUID) -> Optional[int]:
+        return self._find(self.person_ids, person_id)
+
+    def collaborators(self, person_id: uuid.UUID, limit: int = 20) -> List[Tuple[uuid.UUID, int]]:
+        """Persons sharing films with ``person_id``, most shared films first"""
+        import numpy as np
+
+        person = self.person_index(person_id)
+        if person is None:
+            return []
+        films = self.person_films[self.person_indptr[person]:self.person_indptr[person + 1]]
+        positions, _ = _ranges(self.film_indptr, films.astype(np.int64))
+        co_workers = self.film_persons[positions]
+        co_workers = co_workers[co_workers != person]
+        if len(co_workers) == 0:
+            return []
+        candidates, shared = np.unique(co_workers, return_counts=True)
+        # Most shared films first, ties by id for a stable order
+        ranked = np.lexsort((candidates, -shared))[:limit]
+        return [(self._uuid(self.person_ids, int(candidates[i])), int(shared[i])) for i in ranked]
+
+    def path(self, source_id: uuid.UUID, target_id: uuid.UUID,
+             max_degrees: int = 6) -> Optional[Tuple[List[uuid.UUID], List[uuid.UUID]]]:
+        """Shortest chain ``(persons, films)`` linking two persons; ``films[i]`` joins ``persons[i]`` and ``persons[i + 1]``.
+
+        Bidirectional breadth-first search: each step expands the smaller
+        frontier by one degree (person -> films -> persons) with array ops.
+        """
+        import numpy as np
+
+        source, target = self.person_index(source_id), self.person_index(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [source_id], []
+
+        n_persons, n_films = len(self.person_ids), len(self.film_ids)
+        # Per side: the film each person was reached through and the person each film was reached from
+        person_via = [np.full(n_persons, -1, dtype=np.int32), np.full(n_persons, -1, dtype=np.int32)]
+        film_via = [np.full(n_films, -1, dtype=np.int32), np.full(n_films, -1, dtype=np.int32)]
+        seen = [np.zeros(n_persons, dtype=bool), np.zeros(n_persons, dtype=bool)]
+        frontiers = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+        seen[0][source] = seen[1][target] = True
+
+        for _ in range(max_degrees):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            reached = self._expand(frontiers[side], person_via[side], film_via[side], seen[side])
+            if len(reached) == 0:
+                return None
+            meeting = reached[seen[1 - side][reached]]
+            if len(meeting):
+                return self._join(int(meeting[0]), person_via, film_via)
+            frontiers[side] = reached
+        return None
+
+    def _expand(self, frontier, person_via, film_via, seen):
+        """One degree out of ``frontier``; returns the newly reached persons"""
+        import numpy as np
+
+        positions, sources = _ranges(self.person_indptr, frontier)
+        films = self.person_films[positions]
+        new_films = film_via[films] < 0
+        films, sources = films[new_films], sources[new_films]
+        films, first = np.unique(films, return_index=True)
+        film_via[films] = sources[first]
+
+        positions, sources = _ranges(self.film_indptr, films.astype(np.int64))
+        persons = self.film_persons[positions]
+        new_persons = ~seen[persons]
+        persons, sources = persons[new_persons], sources[new_persons]
+        persons, first = np.unique(persons, return_index=True)
+        person_via[persons] = sources[first]
+        seen[persons] = True
+        return persons.astype(np.int64)
+
+    def _join(self, meeting: int, person_via, film_via):
+        """Walk back from the meeting person to the source (side 0) and the target (side 1)"""
+        chains = []
+        for side in (0, 1):
+            persons, films = [meeting], []
+            while person_via[side][persons[-1]] >= 0:
+                film = int(person_via[side][persons[-1]])
+                films.append(film)
+                persons.append(int(film_via[side][film]))
+            chains.append((persons, films))
+        (left_persons, left_films), (right_persons, right_films) = chains
+        persons = left_persons[::-1] + right_persons[1:]
+        films = left_films[::-1] + right_films
+        return (
+            [self._uuid(self.person_ids, person) for person in persons],
+            [self._uuid(self.film_ids, film) for film in films]
+        )
+
+
+class CollaborationGraph:
+    """Person collaboration graph for "worked with" and degrees-of-separation queries.
+
+    The snapshot is built in a worker thread and swapped in with a single
+    reference assignment. Writes only mark it dirty; a background task
+    coalesces them into one rebuild at most every ``debounce`` seconds.
+    """
+
+    def __init__(self, session_factory, debounce: float = 30):
+        self.session_factory = session_factory
+        self.debounce = debounce
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.build_seconds: Optional[float] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[GraphSnapshot]:
+        return self._snapshot
+
+    async def load(self):
+        """Build the graph from ``person_film_work``"""
+        started = time.perf_counter()
+        pfw = models.person_film_work
+        # Raw 16-byte ids avoid creating a UUID object per row
+        query = select(
+            func.uuid_send(pfw.c.person_id, type_=LargeBinary),
+            func.uuid_send(pfw.c.film_work_id, type_=LargeBinary)
+        )
+        async with self.session_factory() as session:
+            rows = (await session.execute(query)).all()
+        persons = [row[0] for row in rows]
+        films = [row[1] for row in rows]
+        del rows
+        snapshot = await asyncio.to_thread(GraphSnapshot.build, persons, films)
+        self._snapshot = snapshot
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        self.logger.info(
+            f"Collaboration graph built in {self.build_seconds}s: {len(snapshot.person_ids)} persons, "
+            f"{len(snapshot.film_ids)} films, {snapshot.edges} edges, {snapshot.nbytes / 2**20:.1f} MiB"
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: credits change with film and person writes"""
+        if entity_type in ("FilmWork", "Person"):
+            self._dirty.set()
+
+    async def invalidate_all(self) -> None:
+        self._dirty.set()
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            # Let a burst of writes settle into a single rebuild
+            await asyncio.sleep(self.debounce)
+            self._dirty.clear()
+            try:
+                await self.load()
+            except Exception as e:
+                self.logger.warning(f"Rebuilding the collaboration graph failed, keeping previous snapshot: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "persons": len(snapshot.person_ids),
+            "films": len(snapshot.film_ids),
+            "edges": snapshot.edges,
+            "bytes": snapshot.nbytes,
+            "bytes_per_million_edges": round(snapshot.nbytes / snapshot.edges * 1e6) if snapshot.edges else None,
+            "build_seconds": self.build_seconds,
+        }
@@ -0,0 +1,298 @@
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import select, func
+
+from .. import models
+
+# Row served in place of a film_work row; has the attributes the list endpoint serializes
+FilmRow = namedtuple("FilmRow", ("id", "title", "rating"))
+
+
+def rank_key(rating: Optional[float], film_id: uuid.UUID) -> Tuple:
+    """Sort key matching SQL ``ORDER BY rating DESC, id DESC`` (Postgres puts NULL first in DESC)"""
+    return (rating is not None, -(rating or 0.0), -film_id.int)
+
+
+class Leaderboard:
+    """Best rated films of one genre, exactly the true top ``len(self)`` at all times.
+
+    ``complete`` means every film of the genre is held, so any page can be
+    answered. Otherwise entries that drop out of the top cannot be replaced
+    from memory and the servable depth shrinks until the next refill.
+    """
+
+    __slots__ = ("entries", "complete")
+
+    def __init__(self, entries: Iterable[Tuple] = (), complete: bool = False):
+        self.entries: List[Tuple] = sorted(entries)
+        self.complete = complete
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, key: Tuple, film_id: uuid.UUID, depth: int) -> Tuple[bool, Optional[uuid.UUID]]:
+        """Insert a film; returns whether it is held and which film fell off past ``depth``"""
+        if not self.complete and (not self.entries or key > self.entries[-1][:3]):
+            # Ranks below films that are not held: its position is unknown
+            return False, None
+        insort(self.entries, key + (film_id,))
+        if len(self.entries) <= depth:
+            return True, None
+        evicted = self.entries.pop()[3]
+        self.complete = False
+        return (False, None) if evicted == film_id else (True, evicted)
+
+    def remove(self, key: Tuple, film_id: uuid.UUID):
+        position = bisect_left(self.entries, key + (film_id,))
+        if position < len(self.entries) and self.entries[position][3] == film_id:
+            del self.entries[position]
+
+
+class GenreLeaderboards:
+    """Per-genre top-N films by rating for ``GET /films/?genre=X&sort=-rating``.
+
+    Built with one windowed query at startup and kept current by the change
+    listener hooks, so the first pages of the most frequent list query are
+    answered without the database. Pages beyond the held depth return None
+    and are read from SQL.
+
+    A film's changes are applied one at a time (writes are seen inline and
+    again from other workers' notifications), so the last database read
+    wins. Genres that ran shallow are refilled by a background task.
+    """
+
+    def __init__(self, session_factory, depth: int = 500):
+        self.session_factory = session_factory
+        self.depth = depth
+        self.loaded = False
+        self._boards: Dict[uuid.UUID, Leaderboard] = {}
+        self._films: Dict[uuid.UUID, FilmRow] = {}
+        self._film_genres: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+        self._film_locks: Dict[uuid.UUID, asyncio.Lock] = {}
+        self._lock_users: Counter = Counter()
+        # Bumped by every applied film change; a refill read before a change is retried
+        self._generation = 0
+        self._refill_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.logger = logging.getLogger(__name__)
+
+    def _ranked_query(self, genre_id: Optional[uuid.UUID] = None):
+        """Top ``depth + 1`` films of every genre; the extra row tells whether a genre is complete"""
+        gfw, film = models.genre_film_work, models.FilmWork
+        rank = func.row_number().over(
+            partition_by=gfw.c.genre_id, order_by=(film.rating.desc(), film.id.desc())
+        ).label('rank')
+        ranked = select(gfw.c.genre_id, film.id, film.title, film.rating, rank).join(
+            film, film.id == gfw.c.film_work_id
+        )
+        if genre_id is not None:
+            ranked = ranked.where(gfw.c.genre_id == genre_id)
+        ranked = ranked.subquery()
+        return select(ranked.c.genre_id, ranked.c.id, ranked.c.title, ranked.c.rating).where(
+            ranked.c.rank <= self.depth + 1
+        )
+
+    def _build(self, rows) -> Tuple[Dict[uuid.UUID, Leaderboard], Dict[uuid.UUID, FilmRow]]:
+        grouped: Dict[uuid.UUID, List[Tuple]] = {}
+        films = {}
+        for genre_id, film_id, title, rating in rows:
+            films[film_id] = FilmRow(film_id, title, rating)
+            grouped.setdefault(genre_id, []).append(rank_key(rating, film_id) + (film_id,))
+        boards = {}
+        for genre_id, entries in grouped.items():
+            board = Leaderboard(entries, complete=len(entries) <= self.depth)
+            del board.entries[self.depth:]
+            boards[genre_id] = board
+        return boards, films
+
+    async def load(self):
+        """Build every leaderboard from the database"""
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            rows = (await session.execute(self._ranked_query())).all()
+        boards, films = self._build(rows)
+        self._boards, self._films = boards, films
+        self._film_genres = self._index_genres(boards)
+        self.loaded = True
+        self.logger.info(
+            f"Genre leaderboards built in {time.perf_counter() - started:.3f}s: "
+            f"{len(boards)} genres, {len(films)} films"
+        )
+
+    @staticmethod
+    def _index_genres(boards: Dict[uuid.UUID, Leaderboard]) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+        film_genres: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+        for genre_id, board in boards.items():
+            for entry in board.entries:
+                film_genres.setdefault(entry[3], set()).add(genre_id)
+        return film_genres
+
+    def page(self, genre_id: uuid.UUID, skip: int, limit: int) -> Optional[List[FilmRow]]:
+        """A page of the genre's films by rating, or None when it must be read from SQL"""
+        board = self._boards.get(genre_id) if self.loaded else None
+        if board is None or (not board.complete and skip + limit > len(board)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [self._films[entry[3]] for entry in board.entries[skip:skip + limit]]
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: re-rank a written film in every genre it belongs to"""
+        if not self.loaded:
+            return
+        if entity_type == "Genre":
+            if operation == "delete":
+                self._drop_genre(entity_id)
+            return
+        if entity_type != "FilmWork":
+            return
+
+        async with self._film_lock(entity_id):
+            row, genre_ids = None, set()
+            if operation != "delete":
+                async with self.session_factory() as session:
+                    row = (await session.execute(
+                        select(models.FilmWork.id, models.FilmWork.title, models.FilmWork.rating).where(
+                            models.FilmWork.id == entity_id
+                        )
+                    )).first()
+                    if row is not None:
+                        genre_ids = set((await session.execute(
+                            select(models.genre_film_work.c.genre_id).where(
+                                models.genre_film_work.c.film_work_id == entity_id
+                            )
+                        )).scalars().all())
+
+            self._remove_film(entity_id)
+            if row is not None:
+                self._add_film(FilmRow(*row), genre_ids)
+            self._generation += 1
+        self._schedule_refill()
+
+    @asynccontextmanager
+    async def _film_lock(self, film_id: uuid.UUID):
+        """Serialize read-and-apply per film; the lock is dropped once nobody waits on it"""
+        lock = self._film_locks.setdefault(film_id, asyncio.Lock())
+        self._lock_users[film_id] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[film_id] -= 1
+            if not self._lock_users[film_id]:
+                del self._lock_users[film_id]
+                del self._film_locks[film_id]
+
+    def _remove_film(self, film_id: uuid.UUID):
+        film = self._films.pop(film_id, None)
+        for genre_id in self._film_genres.pop(film_id, ()):
+            board = self._boards.get(genre_id)
+            if board is not None and film is not None:
+                board.remove(rank_key(film.rating, film_id), film_id)
+
+    def _add_film(self, film: FilmRow, genre_ids: Set[uuid.UUID]):
+        key = rank_key(film.rating, film.id)
+        held = set()
+        for genre_id in genre_ids:
+            # A genre without a board had no films when the boards were built, so it is complete
+            board = self._boards.setdefault(genre_id, Leaderboard(complete=True))
+            added, evicted = board.add(key, film.id, self.depth)
+            if added:
+                held.add(genre_id)
+            if evicted is not None:
+                self._forget(evicted, genre_id)
+        if held:
+            self._films[film.id] = film
+            self._film_genres[film.id] = held
+
+    def _forget(self, film_id: uuid.UUID, genre_id: uuid.UUID):
+        genres = self._film_genres.get(film_id)
+        if genres is None:
+            return
+        genres.discard(genre_id)
+        if not genres:
+            del self._film_genres[film_id]
+            self._films.pop(film_id, None)
+
+    def _drop_genre(self, genre_id: uuid.UUID):
+        board = self._boards.pop(genre_id, None)
+        if board is not None:
+            for entry in board.entries:
+                self._forget(entry[3], genre_id)
+
+    def _shallow_genres(self) -> List[uuid.UUID]:
+        return [genre_id for genre_id, board in self._boards.items()
+                if not board.complete and len(board) < self.depth // 2]
+
+    def _schedule_refill(self):
+        if self._shallow_genres() and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill_shallow())
+
+    async def _refill_shallow(self):
+        """Reload genres whose servable depth fell below half the target, off the write path"""
+        attempted = set()
+        try:
+            while True:
+                shallow = [genre_id for genre_id in self._shallow_genres() if genre_id not in attempted]
+                if not shallow:
+                    return
+                for genre_id in shallow:
+                    attempted.add(genre_id)
+                    await self._refill(genre_id)
+        except Exception as e:
+            self.logger.warning(f"Refilling genre leaderboards failed: {e}")
+
+    async def _refill(self, genre_id: uuid.UUID, attempts: int = 3):
+        for _ in range(attempts):
+            generation = self._generation
+            async with self.session_factory() as session:
+                rows = (await session.execute(self._ranked_query(genre_id))).all()
+            # A film change applied meanwhile may be missing from the rows: read again
+            if generation == self._generation:
+                break
+        else:
+            # Left shallow; the next change schedules another refill
+            return
+        if genre_id not in self._boards:
+            # Deleted while it was read
+            return
+        boards, films = self._build(rows)
+        self._drop_genre(genre_id)
+        board = boards.get(genre_id, Leaderboard(complete=True))
+        self._boards[genre_id] = board
+        for entry in board.entries:
+            self._films[entry[3]] = films[entry[3]]
+            self._film_genres.setdefault(entry[3], set()).add(genre_id)
+        self.refills += 1
+
+    async def invalidate_all(self) -> None:
+        """Rebuild every leaderboard when changes may have been missed"""
+        if self.loaded:
+            await self.load()
+
+    async def stop(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "genres": len(self._boards),
+            "films": len(self._films),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refills": self.refills,
+        }
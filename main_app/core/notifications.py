@@ -0,0 +1,212 @@
+from typing import Any, Callable, Dict, Optional, Sequence, Set
+import asyncio
+import json
+import logging
+import uuid
+
+import asyncpg
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Channel the content.notify_changes() statement triggers publish on
+CHANNEL = "content_changes"
+# Operation of a notification standing for more entities than the trigger announces one by one
+FLUSH = "flush"
+
+
+def listen_dsn(database_url: str) -> str:
+    """Plain libpq DSN for asyncpg from a SQLAlchemy ``postgresql+asyncpg://`` URL"""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class ChangeNotificationListener:
+    """Forwards ``NOTIFY content_changes`` messages to this worker's change listeners.
+
+    The table triggers publish every committed write, whichever worker (or
+    psql session) made it. NOTIFY is not queued for a disconnected listener,
+    so after a reconnect nothing that was cached can be trusted: every
+    listener is flushed with ``invalidate_all`` instead.
+
+    Writes made through an engine passed to ``ignore_engine`` were already
+    applied by the service layer, so notifications sent by its backends are
+    dropped. A payload already waiting for dispatch is not queued twice.
+    """
+
+    def __init__(self, dsn: str, listeners: Callable[[], Sequence[Any]], reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0, keepalive: float = 30.0, connect_timeout: float = 10.0,
+                 connect=asyncpg.connect):
+        self.dsn = dsn
+        self.listeners = listeners
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self._connect = connect
+        self._connection = None
+        self._lost = asyncio.Event()
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._pending: Set[str] = set()
+        self._tasks = []
+        self._engines = []
+        self.own_pids: Set[int] = set()
+        self.received = 0
+        self.skipped = 0
+        self.flushes = 0
+        self.reconnects = 0
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self):
+        """LISTEN before the caches are loaded, then keep the connection up in the background.
+
+        A failed first attempt is retried by the background task like any later disconnect.
+        """
+        try:
+            await self._listen()
+        except Exception as e:
+            self.logger.warning(f"Change notifications unavailable, retrying in the background: {e}")
+            await self._close()
+        self._tasks = [asyncio.create_task(self._supervise()), asyncio.create_task(self._dispatch_loop())]
+
+    async def _listen(self):
+        self._lost.clear()
+        self._connection = await self._connect(self.dsn, timeout=self.connect_timeout)
+        self._connection.add_termination_listener(self._on_termination)
+        await self._connection.add_listener(CHANNEL, self._on_notification)
+
+    async def _supervise(self):
+        delay = self.reconnect_delay
+        while True:
+            if self.connected:
+                try:
+                    await asyncio.wait_for(self._lost.wait(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    try:
+                        await asyncio.wait_for(self._connection.execute("SELECT 1"), timeout=self.keepalive)
+                        continue
+                    except Exception as e:
+                        self.logger.warning(f"Change notification connection failed keepalive: {e}")
+                await self._close()
+
+            await asyncio.sleep(delay)
+            try:
+                await self._listen()
+            except Exception as e:
+                self.logger.warning(f"Reconnecting change notifications failed: {e}")
+                await self._close()
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            delay = self.reconnect_delay
+            self.reconnects += 1
+            # Writes made while disconnected were never delivered
+            await self._queue.put(None)
+
+    def ignore_engine(self, engine):
+        """Drop notifications of writes made on this (async) engine's pooled connections"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "connect", self._track_pid)
+        event.listen(sync_engine, "close", self._forget_pid)
+        event.listen(sync_engine, "detach", self._forget_pid)
+        self._engines.append(sync_engine)
+
+    def _track_pid(self, dbapi_connection, connection_record):
+        driver_connection = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+        pid = driver_connection.get_server_pid()
+        connection_record.info["backend_pid"] = pid
+        self.own_pids.add(pid)
+
+    def _forget_pid(self, dbapi_connection, connection_record):
+        self.own_pids.discard(connection_record.info.pop("backend_pid", None))
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        self.received += 1
+        if pid in self.own_pids:
+            self.skipped += 1
+            return
+        if payload in self._pending:
+            return
+        self._pending.add(payload)
+        self._queue.put_nowait(payload)
+
+    def _on_termination(self, connection):
+        self._lost.set()
+
+    async def _dispatch_loop(self):
+        while True:
+            payload = await self._queue.get()
+            self._pending.discard(payload)
+            if payload is None:
+                await self.invalidate_all()
+            else:
+                await self.dispatch(payload)
+
+    async def dispatch(self, payload: str):
+        """Hand one notification to every local listener; listener errors are logged only"""
+        change = self.parse(payload)
+        if change is None:
+            self.logger.warning(f"Ignoring malformed change notification: {payload}")
+            return
+        if change[2] == FLUSH:
+            await self.invalidate_all()
+            return
+        for listener in self.listeners():
+            try:
+                await listener.entity_changed(*change)
+            except Exception as e:
+                self.logger.warning(f"Change listener {type(listener).__name__} failed for {payload}: {e}")
+
+    async def invalidate_all(self):
+        """Full flush of every local listener"""
+        self.flushes += 1
+        for listener in self.listeners():
+            try:
+                await listener.invalidate_all()
+            except Exception as e:
+                self.logger.warning(f"Flushing {type(listener).__name__} failed: {e}")
+
+    @staticmethod
+    def parse(payload: str) -> Optional[tuple]:
+        """``(entity_type, entity_id, operation)`` of a trigger payload (no id for a flush), None when malformed"""
+        try:
+            message = json.loads(payload)
+            if message["op"] == FLUSH:
+                return message["type"], None, FLUSH
+            return message["type"], uuid.UUID(message["id"]), message["op"]
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    async def _close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "connect", self._track_pid)
+            event.remove(sync_engine, "close", self._forget_pid)
+            event.remove(sync_engine, "detach", self._forget_pid)
+        self._engines = []
+        await self._close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "skipped_own": self.skipped,
+            "reconnects": self.reconnects,
+            "flushes": self.flushes,
+        }
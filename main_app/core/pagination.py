@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque URL-safe cursor"""
+    payload = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Decode an opaque cursor back into its keyset values"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursorError(f"Malformed cursor: {cursor}") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError(f"Malformed cursor: {cursor}")
+    return values
@@ -0,0 +1,92 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Tuple
+import logging
+import re
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger('films_api')
+
+_PARAMS = re.compile(r"(\$\d+|%\(\w+\)s|%s|\?|:\w+)")
+_PARAM_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions that differ only in parameters compare equal"""
+    shape = _PARAMS.sub("?", statement)
+    shape = _LITERALS.sub("?", shape)
+    shape = _PARAM_LISTS.sub("(?...)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed within one request (or one ``capture_queries`` block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times (likely N+1 patterns)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Collectors active in the current context; a statement is recorded in all of them
+_collectors: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_stats_collectors", default=())
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Count and time the statements executed by the current task while the block runs"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    started = conn.info.get("query_started")
+    duration = time.perf_counter() - started.pop() if started else 0.0
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine):
+    """Attach per-context statement counting to an (async) engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report_request(stats: QueryStats, method: str, path: str, budget: int, repeat_threshold: int) -> Dict[str, object]:
+    """Log budget overruns and repeated statement shapes of a finished request"""
+    if budget and stats.count > budget:
+        logger.warning(
+            f"Query budget exceeded: {method} {path} ran {stats.count} statements "
+            f"(budget {budget}) in {stats.total_time * 1000:.1f}ms"
+        )
+    for shape, count in stats.repeated(repeat_threshold):
+        logger.warning(f"Possible N+1: {method} {path} ran {count}x: {shape[:200]}")
+    return {"count": stats.count, "time_ms": round(stats.total_time * 1000, 3)}
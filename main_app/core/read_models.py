@@ -0,0 +1,81 @@
+from typing import Optional
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import text
+
+
+class FilmCardRefresher:
+    """Keeps the ``content.film_card`` materialized view fresh.
+
+    Writes only mark the view dirty; a single background task coalesces
+    them into one ``REFRESH MATERIALIZED VIEW CONCURRENTLY`` at most every
+    ``debounce`` seconds, and also refreshes every ``interval`` seconds to
+    pick up changes made outside the API.
+    """
+
+    VIEW_NAME = "content.film_card"
+
+    def __init__(self, session_factory, interval: float = 600, debounce: float = 5):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.debounce = debounce
+        self.available = False
+        self.last_refreshed: Optional[float] = None
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """Check that the view exists and start the refresh loop"""
+        async with self.session_factory() as session:
+            result = await session.execute(text("SELECT to_regclass(:name)"), {"name": self.VIEW_NAME})
+            self.available = result.scalar() is not None
+        if not self.available:
+            self.logger.warning(f"{self.VIEW_NAME} not found, film cards are read from base tables")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: every film, genre or person write can change a card"""
+        self.mark_dirty()
+
+    async def invalidate_all(self) -> None:
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    async def refresh(self):
+        """Refresh the view without blocking concurrent readers"""
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self.VIEW_NAME}"))
+            await session.commit()
+        self.last_refreshed = time.time()
+        self.logger.info(f"Refreshed {self.VIEW_NAME} in {time.perf_counter() - started:.3f}s")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.interval)
+                # Let a burst of writes settle into a single refresh
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.logger.warning(f"Refreshing {self.VIEW_NAME} failed: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,16 +1,59 @@
 from abc import ABC
-from typing import List, Optional, TypeVar, Generic, Dict, Any, Type
+from typing import List, Optional, Sequence, Tuple, TypeVar, Generic, Dict, Any, Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, asc, delete as sql_delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, asc, func, and_, or_, tuple_, cast, literal, null, union_all, inspect, Text, Integer
+from sqlalchemy import any_, bindparam, text, BigInteger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, UUID, aggregate_order_by
+from sqlalchemy import delete as sql_delete, update as sql_update
+from sqlalchemy.orm import selectinload, noload
+from datetime import datetime, timedelta
 import uuid
 import logging
+import re
 
 from .. import models, schemas
 
 T = TypeVar('T', bound=models.Base)
 
 
+class InvalidLinkError(ValueError):
+    """Raised when a write links an entity to a genre, person or film that does not exist"""
+
+
+# Postgres SQLSTATE of a foreign key violation
+FOREIGN_KEY_VIOLATION = "23503"
+
+# Link table foreign keys (Postgres default names) -> entity a violation reports as unknown
+LINK_FOREIGN_KEYS = {
+    "genre_film_work_genre_id_fkey": "genre",
+    "genre_film_work_film_work_id_fkey": "film",
+    "person_film_work_person_id_fkey": "person",
+    "person_film_work_film_work_id_fkey": "film",
+}
+
+
+def word_prefix_match(column, prefix: str):
+    """``column`` (case-insensitively) starts with ``prefix`` as a whole or at a word start, like the suggest index.
+
+    The whole-text prefix uses the ``text_pattern_ops`` index, word starts the trigram index.
+    """
+    prefix = prefix.lower()
+    lowered = func.lower(column)
+    return or_(lowered.startswith(prefix, autoescape=True), lowered.regexp_match(r"\m" + re.escape(prefix)))
+
+
+def unknown_link_error(error: IntegrityError) -> Optional[InvalidLinkError]:
+    """InvalidLinkError for a violated link foreign key; None for any other integrity error"""
+    orig = error.orig
+    if getattr(orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+        return None
+    # The asyncpg adapter keeps the driver error, which names the constraint, as the cause
+    constraint = getattr(orig.__cause__, "constraint_name", None) or getattr(orig, "constraint_name", None)
+    entity = LINK_FOREIGN_KEYS.get(constraint)
+    return InvalidLinkError(f"Unknown {entity} id") if entity else None
+
+
 class BaseRepository(ABC, Generic[T]):
     """Abstract base repository for all entities"""
 
@@ -29,9 +72,23 @@ class BaseRepository(ABC, Generic[T]):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 50, **filters) -> List[T]:
+    async def get_columns(self, entity_id: uuid.UUID, columns: Sequence[str]) -> Optional[Any]:
+        """Get only the named columns of an entity (no relationship loading)"""
+        result = await self.session.execute(self._select(columns).where(self.model.id == entity_id))
+        return result.one_or_none()
+
+    async def get_many_columns(self, entity_ids: Sequence[uuid.UUID], columns: Sequence[str]) -> Dict[uuid.UUID, Any]:
+        """Named columns of several entities by id in one ``= ANY(:ids)`` statement"""
+        if not entity_ids:
+            return {}
+        ids = bindparam("entity_ids", list(entity_ids), type_=ARRAY(UUID(as_uuid=True)))
+        result = await self.session.execute(self._select(columns).where(self.model.id == any_(ids)))
+        return {row.id: row for row in result.all()}
+
+    async def get_all(self, skip: int = 0, limit: int = 50, columns: Optional[Sequence[str]] = None,
+                      **filters) -> List[T]:
         """Get all entities with pagination and optional filtering"""
-        query = select(self.model)
+        query = self._select(columns)
 
         # Apply filters
         for field, value in filters.items():
@@ -44,8 +101,19 @@ class BaseRepository(ABC, Generic[T]):
             query = query.order_by(desc(sort_field))
 
         query = query.offset(skip).limit(limit)
+        return await self._fetch_all(query, columns)
+
+    def _select(self, columns: Optional[Sequence[str]] = None, source=None):
+        """SELECT of whole entities, or of the named columns only when a sparse fieldset is requested"""
+        if columns is None:
+            return select(self.model if source is None else source)
+        source = self.model if source is None else source.c
+        return select(*(getattr(source, column) for column in columns))
+
+    async def _fetch_all(self, query, columns: Optional[Sequence[str]] = None) -> List[Any]:
+        """Entities for a whole-entity SELECT, rows for a column SELECT"""
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.scalars().all() if columns is None else result.all()
 
     async def create(self, entity_data: Dict[str, Any]) -> T:
         """Create new entity"""
@@ -59,40 +127,99 @@ class BaseRepository(ABC, Generic[T]):
         return db_entity
 
     async def update(self, entity_id: uuid.UUID, entity_data: Dict[str, Any]) -> Optional[T]:
-        """Update entity"""
-        db_entity = await self.get_by_id(entity_id)
+        """Update entity with a single ``UPDATE ... RETURNING`` statement"""
+        cleaned_data = self._clean_entity_data(entity_data)
+        if not cleaned_data:
+            return await self.get_by_id(entity_id)
+
+        query = sql_update(self.model).where(self.model.id == entity_id).values(**cleaned_data).returning(
+            self.model
+        ).options(noload('*')).execution_options(synchronize_session=False)
+        result = await self.session.execute(query)
+        db_entity = result.scalar_one_or_none()
         if not db_entity:
             self.logger.warning(f"Update failed: {self.model.__name__} with id {entity_id} not found.")
             return None
 
-        cleaned_data = self._clean_entity_data(entity_data)
-
-        for field, value in cleaned_data.items():
-            if hasattr(db_entity, field):
-                setattr(db_entity, field, value)
-
         await self.session.commit()
-        await self.session.refresh(db_entity)
         return db_entity
 
     async def delete(self, entity_id: uuid.UUID) -> bool:
-        """Delete entity"""
-        db_entity = await self.get_by_id(entity_id)
-        if not db_entity:
+        """Delete entity and its association rows with a single ``DELETE ... RETURNING`` statement"""
+        return await self.delete_unlinking(entity_id) is not None
+
+    async def delete_unlinking(self, entity_id: uuid.UUID) -> Optional[Dict[str, List[uuid.UUID]]]:
+        """Delete entity and its association rows; None when it does not exist.
+
+        Returns the ids of the entities it was linked to by model name, whose
+        own data (e.g. a person's films) changed with the removed links.
+        """
+        deleted, unlinked = await self._delete(self.model.id == entity_id)
+        if not deleted:
             self.logger.warning(f"Delete failed: {self.model.__name__} with id {entity_id} not found.")
-            return False
+            return None
 
-        await self.session.delete(db_entity)
         await self.session.commit()
-        return True
+        return unlinked
 
     async def bulk_delete(self, entity_ids: List[uuid.UUID]) -> int:
-        """Delete multiple entities by IDs"""
-        query = sql_delete(self.model).where(self.model.id.in_(entity_ids))
-        result = await self.session.execute(query)
+        """Delete multiple entities by IDs, with their many-to-many link rows.
+
+        Like ``delete``, this removes the genre/person links of the deleted
+        entities instead of failing on their foreign keys.
+        """
+        deleted, _ = await self.bulk_delete_unlinking(entity_ids)
+        return deleted
+
+    async def bulk_delete_unlinking(self, entity_ids: List[uuid.UUID]) -> Tuple[int, Dict[str, List[uuid.UUID]]]:
+        """``bulk_delete`` that also returns the ids of the unlinked entities by model name"""
+        deleted, unlinked = await self._delete(self.model.id.in_(entity_ids))
         await self.session.commit()
-        self.logger.info(f"Bulk delete: {result.rowcount} {self.model.__name__} entities deleted.")
-        return result.rowcount
+        self.logger.info(f"Bulk delete: {len(deleted)} {self.model.__name__} entities deleted.")
+        return len(deleted), unlinked
+
+    async def _delete(self, criterion) -> Tuple[List[uuid.UUID], Dict[str, List[uuid.UUID]]]:
+        """Run the delete; returns the deleted ids and the unlinked entity ids by model name"""
+        query, unlinked_columns = self._delete_with_associations(criterion)
+        result = await self.session.execute(query.returning(self.model.id, *unlinked_columns))
+        rows = result.all()
+        # Every returned row carries the same aggregates over the whole statement
+        unlinked = {
+            column.name: list(dict.fromkeys(rows[0][position] or [])) if rows else []
+            for position, column in enumerate(unlinked_columns, start=1)
+        }
+        return [row[0] for row in rows], unlinked
+
+    def _delete_with_associations(self, criterion):
+        """DELETE of matching entities with their many-to-many link rows removed in data-modifying CTEs.
+
+        Foreign keys are checked at the end of the statement, so the link rows
+        and the entity go in one round trip, as ``session.delete`` did in several.
+        Also returns, per link table, a column aggregating the ids on the other
+        side of the removed links, labeled with the linked model's name.
+        """
+        ids = select(self.model.id).where(criterion)
+        query = sql_delete(self.model).where(criterion)
+        unlinked_columns = []
+        cleaned_tables = set()
+        for relationship in inspect(self.model).relationships:
+            secondary = relationship.secondary
+            if secondary is None or secondary.name in cleaned_tables:
+                continue
+            cleaned_tables.add(secondary.name)
+            link_columns = [link_column for _, link_column in relationship.synchronize_pairs]
+            other_columns = [other_column for _, other_column in relationship.secondary_synchronize_pairs]
+            deleted_links = sql_delete(secondary).where(
+                *(link_column.in_(ids) for link_column in link_columns)
+            ).returning(*other_columns).cte(f"deleted_{secondary.name}")
+            query = query.add_cte(deleted_links)
+            for other_column in other_columns:
+                unlinked_columns.append(
+                    select(func.array_agg(deleted_links.c[other_column.name])).scalar_subquery().label(
+                        relationship.mapper.class_.__name__
+                    )
+                )
+        return query.execution_options(synchronize_session=False), unlinked_columns
 
     async def count(self, **filters) -> int:
         """Count entities with optional filtering"""
@@ -126,23 +253,27 @@ class BaseRepository(ABC, Generic[T]):
         return query
 
     async def search_by_field(self, field_name: str, search_term: str,
-                              skip: int = 0, limit: int = 50) -> List[T]:
+                              skip: int = 0, limit: int = 50, columns: Optional[Sequence[str]] = None) -> List[T]:
         """Generic search by field using ILIKE"""
         if not hasattr(self.model, field_name):
             return []
 
         field = getattr(self.model, field_name)
-        query = select(self.model).where(
+        query = self._select(columns).where(
             field.ilike(f"%{search_term}%")
         ).offset(skip).limit(limit)
 
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        return await self._fetch_all(query, columns)
 
 
 class FilmRepository(BaseRepository[models.FilmWork]):
     """Repository for Film operations"""
 
+    FACETS = ("genre", "type", "decade", "rating_bucket")
+    EXPANSIONS = ("genres", "persons")
+    # person_film_work.role -> key of the role group in expanded persons
+    ROLE_GROUPS = {"actor": "actors", "writer": "writers", "director": "directors"}
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, models.FilmWork)
         self._default_sort_field = 'rating'
@@ -154,55 +285,378 @@ class FilmRepository(BaseRepository[models.FilmWork]):
             selectinload(models.FilmWork.persons)
         )
 
-    async def get_all(self, skip: int = 0, limit: int = 50,
-                      sort_by: str = "-rating", genre_id: Optional[uuid.UUID] = None) -> List[models.FilmWork]:
+    async def get_all(self, skip: int = 0, limit: int = 50, sort_by: str = "-rating",
+                      genre_id: Optional[uuid.UUID] = None, columns: Optional[Sequence[str]] = None,
+                      film_type: Optional[str] = None) -> List[models.FilmWork]:
         """Get all films with advanced sorting and filtering"""
-        query = select(self.model)
+        query = self._select(columns)
+        if columns is None:
+            # List items never read genres/persons; the selectin relationships would cascade through them
+            query = query.options(noload('*'))
 
         # Genre filtering
         if genre_id:
             query = query.join(models.genre_film_work).where(
                 models.genre_film_work.c.genre_id == genre_id
             )
+        if film_type:
+            query = query.where(models.FilmWork.type == film_type)
 
         # Dynamic sorting
         query = self._apply_sorting(query, sort_by)
 
         query = query.offset(skip).limit(limit)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        return await self._fetch_all(query, columns)
 
-    def _apply_sorting(self, query, sort_by: str):
+    def _apply_sorting(self, query, sort_by: str, columns=None):
         """Apply dynamic sorting to query"""
+        columns = columns if columns is not None else models.FilmWork
         sort_mapping = {
-            'rating': models.FilmWork.rating,
-            'creation_date': models.FilmWork.creation_date,
-            'title': models.FilmWork.title
+            'rating': columns.rating,
+            'creation_date': columns.creation_date,
+            'title': columns.title
         }
 
+        # The id tie-break keeps OFFSET pages stable and matches the in-memory genre leaderboards
         if sort_by.startswith("-"):
             field_name = sort_by[1:]
             if field_name in sort_mapping:
-                query = query.order_by(desc(sort_mapping[field_name]))
+                query = query.order_by(desc(sort_mapping[field_name]), desc(columns.id))
         else:
             if sort_by in sort_mapping:
-                query = query.order_by(asc(sort_mapping[sort_by]))
+                query = query.order_by(asc(sort_mapping[sort_by]), asc(columns.id))
 
         return query
 
-    async def search_by_title(self, query: str, skip: int = 0, limit: int = 50) -> List[models.FilmWork]:
+    async def search_by_title(self, query: str, skip: int = 0, limit: int = 50,
+                              columns: Optional[Sequence[str]] = None) -> List[models.FilmWork]:
         """Search films by title"""
-        return await self.search_by_field('title', query, skip, limit)
+        return await self.search_by_field('title', query, skip, limit, columns)
+
+    async def suggest_by_title(self, prefix: str, limit: int = 10) -> List[Any]:
+        """Films whose title, or a word in it, starts with ``prefix``"""
+        film = models.FilmWork
+        query = select(film.id, film.title, film.rating).where(
+            word_prefix_match(film.title, prefix)
+        ).order_by(desc(film.rating).nulls_last(), film.title).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_cards(self, skip: int = 0, limit: int = 50, sort_by: str = "-rating",
+                        genre_id: Optional[uuid.UUID] = None, columns: Optional[Sequence[str]] = None,
+                        film_type: Optional[str] = None) -> List[Any]:
+        """Get film cards from the materialized ``film_card`` read model"""
+        card = models.film_card.c
+        query = self._select(columns, models.film_card)
+
+        if genre_id:
+            query = query.where(card.genre_ids.contains([genre_id]))
+        if film_type:
+            query = query.where(card.type == film_type)
+
+        query = self._apply_sorting(query, sort_by, card).offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def search_cards(self, query: str, skip: int = 0, limit: int = 50,
+                           columns: Optional[Sequence[str]] = None) -> List[Any]:
+        """Search film cards by title in the ``film_card`` read model"""
+        card = models.film_card.c
+        statement = self._select(columns, models.film_card).where(card.title.ilike(f"%{query}%")).offset(skip).limit(limit)
+        result = await self.session.execute(statement)
+        return result.all()
+
+    def _filtered_films(self, genre_id: Optional[uuid.UUID] = None, title_query: Optional[str] = None,
+                        film_type: Optional[str] = None):
+        """CTE of the films matching the list/search filters with their facet keys"""
+        film = models.FilmWork
+        query = select(
+            film.id,
+            film.type,
+            cast(func.floor(func.extract('year', film.creation_date) / 10) * 10, Integer).label('decade'),
+            cast(func.floor(film.rating), Integer).label('rating_bucket')
+        )
+        if genre_id:
+            query = query.where(film.id.in_(
+                select(models.genre_film_work.c.film_work_id).where(models.genre_film_work.c.genre_id == genre_id)
+            ))
+        if title_query:
+            query = query.where(film.title.ilike(f"%{title_query}%"))
+        if film_type:
+            query = query.where(film.type == film_type)
+        return query.cte('filtered_films')
+
+    async def get_facets(self, facets, genre_id: Optional[uuid.UUID] = None,
+                         title_query: Optional[str] = None,
+                         film_type: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Count films per facet value over the filtered set in a single statement"""
+        filtered = self._filtered_films(genre_id, title_query, film_type)
+        parts = []
+
+        for facet in ("type", "decade", "rating_bucket"):
+            if facet in facets:
+                column = filtered.c[facet]
+                parts.append(
+                    select(
+                        literal(facet, Text).label('facet'),
+                        cast(column, Text).label('value'),
+                        cast(null(), Text).label('label'),
+                        func.count().label('count')
+                    ).group_by(column)
+                )
+
+        if "genre" in facets:
+            gfw = models.genre_film_work
+            parts.append(
+                select(
+                    literal("genre", Text).label('facet'),
+                    cast(models.Genre.id, Text).label('value'),
+                    models.Genre.name.label('label'),
+                    func.count(filtered.c.id.distinct()).label('count')
+                ).select_from(
+                    filtered.join(gfw, gfw.c.film_work_id == filtered.c.id)
+                    .join(models.Genre, models.Genre.id == gfw.c.genre_id)
+                ).group_by(models.Genre.id, models.Genre.name)
+            )
+
+        result_facets: Dict[str, List[Dict[str, Any]]] = {facet: [] for facet in facets}
+        if not parts:
+            return result_facets
+
+        result = await self.session.execute(union_all(*parts))
+        for facet, value, label, count in result.all():
+            if value is not None and facet in ("decade", "rating_bucket"):
+                value = int(value)
+            bucket = {"value": value, "count": count}
+            if facet == "genre":
+                bucket["label"] = label
+            result_facets[facet].append(bucket)
+
+        for buckets in result_facets.values():
+            buckets.sort(key=lambda bucket: bucket["count"], reverse=True)
+        return result_facets
+
+    async def get_expansions(self, film_ids: Sequence[uuid.UUID], expand: Sequence[str]) -> Dict[uuid.UUID, Dict[str, Any]]:
+        """Genres and role-grouped persons of a page of films in one ``= ANY(:film_ids)`` aggregate statement"""
+        expansions = {film_id: self._empty_expansion(expand) for film_id in film_ids}
+        ids = bindparam("film_ids", list(expansions), type_=ARRAY(UUID(as_uuid=True)))
+        parts = []
+
+        if "genres" in expand:
+            gfw, genre = models.genre_film_work, models.Genre
+            parts.append(
+                select(
+                    gfw.c.film_work_id.label('film_id'),
+                    literal("genres", Text).label('kind'),
+                    func.json_agg(aggregate_order_by(
+                        func.json_build_object('uuid', genre.id, 'name', genre.name), genre.name
+                    ), type_=JSON).label('items')
+                ).select_from(gfw.join(genre, genre.id == gfw.c.genre_id)).where(
+                    gfw.c.film_work_id == any_(ids)
+                ).group_by(gfw.c.film_work_id)
+            )
+
+        if "persons" in expand:
+            pfw, person = models.person_film_work, models.Person
+            parts.append(
+                select(
+                    pfw.c.film_work_id.label('film_id'),
+                    pfw.c.role.label('kind'),
+                    func.json_agg(aggregate_order_by(
+                        func.json_build_object('uuid', person.id, 'full_name', person.full_name), person.full_name
+                    ), type_=JSON).label('items')
+                ).select_from(pfw.join(person, person.id == pfw.c.person_id)).where(
+                    pfw.c.film_work_id == any_(ids)
+                ).group_by(pfw.c.film_work_id, pfw.c.role)
+            )
+
+        if not parts or not expansions:
+            return expansions
+
+        result = await self.session.execute(union_all(*parts))
+        for film_id, kind, items in result.all():
+            if kind == "genres":
+                expansions[film_id]["genres"] = items
+            elif kind in self.ROLE_GROUPS:
+                expansions[film_id]["persons"][self.ROLE_GROUPS[kind]] = items
+        return expansions
+
+    def _empty_expansion(self, expand: Sequence[str]) -> Dict[str, Any]:
+        expansion: Dict[str, Any] = {}
+        if "genres" in expand:
+            expansion["genres"] = []
+        if "persons" in expand:
+            expansion["persons"] = {group: [] for group in self.ROLE_GROUPS.values()}
+        return expansion
+
+    async def get_genres(self, film_id: uuid.UUID) -> List[Any]:
+        """Get ``(id, name)`` of the film's genres without loading genre relationships"""
+        query = select(models.Genre.id, models.Genre.name).join(models.genre_film_work).where(
+            models.genre_film_work.c.film_work_id == film_id
+        ).order_by(models.Genre.name)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_similar(self, film_id: uuid.UUID, limit: int = 10) -> List[Any]:
+        """Precomputed similar films, best first, in one lookup on ``film_similarity(film_id, score)``"""
+        similarity, film = models.film_similarity, models.FilmWork
+        query = select(film.id, film.title, film.rating, similarity.c.score).join(
+            similarity, similarity.c.similar_film_id == film.id
+        ).where(similarity.c.film_id == film_id).order_by(desc(similarity.c.score)).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
 
     async def get_persons_by_role(self, film_id: uuid.UUID, role: str) -> List[models.Person]:
         """Get persons associated with film by role"""
-        query = select(models.Person).join(models.person_film_work).where(
+        query = select(models.Person).options(noload('*')).join(models.person_film_work).where(
             models.person_film_work.c.film_work_id == film_id,
             models.person_film_work.c.role == role
         )
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def save_with_links(self, film_data: Dict[str, Any], genre_ids: Sequence[uuid.UUID],
+                              persons: Sequence[Tuple[uuid.UUID, str]],
+                              film_id: Optional[uuid.UUID] = None) -> Optional[Any]:
+        """Insert a film, or replace the one with ``film_id``, together with its genre and person links.
+
+        One statement: the film write and the ``unnest`` link inserts/deletes are
+        data-modifying CTEs chained on the written row, so a missing film writes
+        nothing. Persons are billed in list order. Replacing keeps unchanged link
+        rows with their original billing and bills new ones after them, so it
+        does not reorder persons that stay linked. The returned film row also
+        carries ``changed_person_ids``, the persons linked or unlinked. The caller commits.
+        """
+        replace = film_id is not None
+        if replace:
+            film = """
+                UPDATE content.film_work SET title = :title, description = :description,
+                    creation_date = :creation_date, rating = :rating, type = :type, modified = :now
+                WHERE id = :film_id RETURNING *"""
+        else:
+            film = """
+                INSERT INTO content.film_work (id, title, description, creation_date, rating, type, created, modified)
+                VALUES (:film_id, :title, :description, :creation_date, :rating, :type, :now, :now) RETURNING *"""
+        genre_links = """
+            INSERT INTO content.genre_film_work (id, genre_id, film_work_id, created)
+            SELECT gen_random_uuid(), link.genre_id, film.id, :now
+            FROM film, unnest(CAST(:genre_ids AS uuid[])) AS link(genre_id)"""
+        person_links = """
+            INSERT INTO content.person_film_work (id, person_id, film_work_id, role, created)
+            SELECT gen_random_uuid(), link.person_id, film.id, link.role,
+                CAST(:now AS timestamp) + link.billing * interval '1 microsecond'
+            FROM film, unnest(CAST(:person_ids AS uuid[]), CAST(:roles AS text[])) WITH ORDINALITY
+                AS link(person_id, role, billing)"""
+        changed_persons = "SELECT person_id FROM person_links"
+        ctes = [f"film AS ({film})"]
+        if replace:
+            # Every CTE sees the links as they were before the statement
+            genre_links += """
+            WHERE NOT EXISTS (SELECT 1 FROM content.genre_film_work existing
+                              WHERE existing.film_work_id = film.id AND existing.genre_id = link.genre_id)"""
+            person_links += """
+            WHERE NOT EXISTS (SELECT 1 FROM content.person_film_work existing
+                              WHERE existing.film_work_id = film.id AND existing.person_id = link.person_id
+                                AND existing.role = link.role)"""
+            ctes += [
+                """stale_genre_links AS (
+                DELETE FROM content.genre_film_work existing USING film
+                WHERE existing.film_work_id = film.id AND existing.genre_id <> ALL(CAST(:genre_ids AS uuid[])))""",
+                """stale_person_links AS (
+                DELETE FROM content.person_film_work existing USING film
+                WHERE existing.film_work_id = film.id AND (existing.person_id, existing.role) NOT IN (
+                    SELECT * FROM unnest(CAST(:person_ids AS uuid[]), CAST(:roles AS text[])))
+                RETURNING existing.person_id)""",
+            ]
+            changed_persons += " UNION SELECT person_id FROM stale_person_links"
+        ctes += [f"genre_links AS ({genre_links})", f"person_links AS ({person_links} RETURNING person_id)"]
+        statement = text(
+            "WITH " + ",\n".join(ctes) + f"\nSELECT film.*, ARRAY({changed_persons}) AS changed_person_ids FROM film"
+        )
+
+        try:
+            result = await self.session.execute(statement, {
+                "film_id": film_id or uuid.uuid4(),
+                "title": film_data.get("title"),
+                "description": film_data.get("description"),
+                "creation_date": film_data.get("creation_date"),
+                "rating": film_data.get("rating"),
+                "type": film_data.get("type"),
+                "now": datetime.utcnow(),
+                "genre_ids": list(genre_ids),
+                "person_ids": [person_id for person_id, _ in persons],
+                "roles": [role for _, role in persons],
+            })
+        except IntegrityError as e:
+            invalid = unknown_link_error(e)
+            if invalid is None:
+                raise
+            raise invalid from e
+        return result.one_or_none()
+
+    async def attach_genres(self, links: Sequence[Tuple[uuid.UUID, uuid.UUID]]) -> Tuple[int, List[uuid.UUID]]:
+        """Link ``(film_id, genre_id)`` pairs; pairs already linked are skipped"""
+        return await self._write_links("""
+            INSERT INTO content.genre_film_work (id, genre_id, film_work_id, created)
+            SELECT gen_random_uuid(), link.genre_id, link.film_work_id, :now
+            FROM unnest(CAST(:film_ids AS uuid[]), CAST(:genre_ids AS uuid[])) AS link(film_work_id, genre_id)
+            ON CONFLICT (film_work_id, genre_id) DO NOTHING
+            RETURNING film_work_id""", links, ("film_ids", "genre_ids"))
+
+    async def detach_genres(self, links: Sequence[Tuple[uuid.UUID, uuid.UUID]]) -> Tuple[int, List[uuid.UUID]]:
+        """Unlink ``(film_id, genre_id)`` pairs; pairs not linked are skipped"""
+        return await self._write_links("""
+            DELETE FROM content.genre_film_work existing
+            USING unnest(CAST(:film_ids AS uuid[]), CAST(:genre_ids AS uuid[])) AS link(film_work_id, genre_id)
+            WHERE existing.film_work_id = link.film_work_id AND existing.genre_id = link.genre_id
+            RETURNING existing.film_work_id""", links, ("film_ids", "genre_ids"))
+
+    async def attach_persons(self, links: Sequence[Tuple[uuid.UUID, uuid.UUID, str]]) -> Tuple[int, List[uuid.UUID]]:
+        """Link ``(film_id, person_id, role)`` triples, billed in list order; triples already linked are skipped"""
+        return await self._write_links("""
+            INSERT INTO content.person_film_work (id, person_id, film_work_id, role, created)
+            SELECT gen_random_uuid(), link.person_id, link.film_work_id, link.role,
+                CAST(:now AS timestamp) + link.billing * interval '1 microsecond'
+            FROM unnest(CAST(:film_ids AS uuid[]), CAST(:person_ids AS uuid[]), CAST(:roles AS text[]))
+                WITH ORDINALITY AS link(film_work_id, person_id, role, billing)
+            ON CONFLICT (film_work_id, person_id, role) DO NOTHING
+            RETURNING film_work_id""", links, ("film_ids", "person_ids", "roles"))
+
+    async def detach_persons(self, links: Sequence[Tuple[uuid.UUID, uuid.UUID, str]]) -> Tuple[int, List[uuid.UUID]]:
+        """Unlink ``(film_id, person_id, role)`` triples; triples not linked are skipped"""
+        return await self._write_links("""
+            DELETE FROM content.person_film_work existing
+            USING unnest(CAST(:film_ids AS uuid[]), CAST(:person_ids AS uuid[]), CAST(:roles AS text[]))
+                AS link(film_work_id, person_id, role)
+            WHERE existing.film_work_id = link.film_work_id AND existing.person_id = link.person_id
+                AND existing.role = link.role
+            RETURNING existing.film_work_id""", links, ("film_ids", "person_ids", "roles"))
+
+    async def _write_links(self, write: str, links: Sequence[Tuple], names: Sequence[str]) -> Tuple[int, List[uuid.UUID]]:
+        """Run a set-based link write; returns the rows changed and the films touched.
+
+        The touched films get a new ``modified`` in the same statement so the
+        change feed and the film_card refresh see link changes. The caller commits.
+        """
+        statement = text(f"""
+            WITH changed AS ({write}),
+            touched AS (
+                UPDATE content.film_work SET modified = :now
+                WHERE id IN (SELECT film_work_id FROM changed) RETURNING id
+            )
+            SELECT (SELECT count(*) FROM changed) AS changed, ARRAY(SELECT id FROM touched) AS films
+        """).columns(changed=BigInteger, films=ARRAY(UUID(as_uuid=True)))
+        params = {name: [link[position] for link in links] for position, name in enumerate(names)}
+        try:
+            result = await self.session.execute(statement, {**params, "now": datetime.utcnow()})
+        except IntegrityError as e:
+            invalid = unknown_link_error(e)
+            if invalid is None:
+                raise
+            raise invalid from e
+        row = result.one()
+        return row.changed, list(row.films)
+
 
 class GenreRepository(BaseRepository[models.Genre]):
     """Repository for Genre operations"""
@@ -221,15 +675,150 @@ class PersonRepository(BaseRepository[models.Person]):
         """Add person-specific relationship loading"""
         return query.options(selectinload(models.Person.films))
 
-    async def search_by_name(self, query: str, skip: int = 0, limit: int = 50) -> List[models.Person]:
+    async def search_by_name(self, query: str, skip: int = 0, limit: int = 50,
+                             columns: Optional[Sequence[str]] = None) -> List[models.Person]:
         """Search persons by name"""
-        return await self.search_by_field('full_name', query, skip, limit)
+        return await self.search_by_field('full_name', query, skip, limit, columns)
+
+    async def suggest_by_name(self, prefix: str, limit: int = 10) -> List[Any]:
+        """Persons whose name, or a word in it, starts with ``prefix``, most prolific first"""
+        pfw = models.person_film_work
+        films_count = func.count(pfw.c.film_work_id.distinct()).label('films_count')
+        query = select(models.Person.id, models.Person.full_name, films_count).outerjoin(
+            pfw, pfw.c.person_id == models.Person.id
+        ).where(
+            word_prefix_match(models.Person.full_name, prefix)
+        ).group_by(models.Person.id, models.Person.full_name).order_by(
+            desc(films_count), models.Person.full_name
+        ).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def get_collaborators(self, person_id: uuid.UUID, limit: int = 20) -> List[Tuple[uuid.UUID, int]]:
+        """Persons sharing films with ``person_id`` ranked by shared films (fallback when the graph is not built)"""
+        own, other = models.person_film_work.alias('own'), models.person_film_work.alias('other')
+        shared = func.count(other.c.film_work_id.distinct()).label('shared_films')
+        query = select(other.c.person_id, shared).select_from(
+            own.join(other, other.c.film_work_id == own.c.film_work_id)
+        ).where(
+            own.c.person_id == person_id, other.c.person_id != person_id
+        ).group_by(other.c.person_id).order_by(desc(shared), other.c.person_id).limit(limit)
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result.all()]
 
-    async def get_films_by_person(self, person_id: uuid.UUID, skip: int = 0, limit: int = 50) -> List[models.FilmWork]:
-        """Get films associated with person"""
-        query = select(models.FilmWork).join(models.person_film_work).where(
+    async def get_summary(self, person_id: uuid.UUID) -> Optional[models.Person]:
+        """Get person by ID without loading the filmography"""
+        query = select(models.Person).where(models.Person.id == person_id).options(noload(models.Person.films))
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    def _person_film_ids(self, person_id: uuid.UUID):
+        """Subquery of distinct film ids the person participated in"""
+        return select(models.person_film_work.c.film_work_id).where(
             models.person_film_work.c.person_id == person_id
-        ).order_by(desc(models.FilmWork.rating)).offset(skip).limit(limit)
+        )
+
+    async def get_films_by_person(self, person_id: uuid.UUID, skip: int = 0, limit: int = 50,
+                                  after: Optional[List[Any]] = None,
+                                  columns: Optional[Sequence[str]] = None) -> List[models.FilmWork]:
+        """Get films associated with person ordered by rating.
+
+        ``after`` is a decoded ``(rating, id)`` keyset cursor; when given, ``skip`` is ignored.
+        With ``columns``, rows of those columns are returned (the keyset needs ``id`` and ``rating``).
+        """
+        film = self._film_columns(columns)
+        query = film.where(
+            models.FilmWork.id.in_(self._person_film_ids(person_id))
+        ).order_by(
+            desc(models.FilmWork.rating).nulls_last(), desc(models.FilmWork.id)
+        )
+
+        if after is not None:
+            query = query.where(self._after_rating_keyset(after))
+        else:
+            query = query.offset(skip)
+
+        return await self._fetch_all(query.limit(limit), columns)
+
+    @staticmethod
+    def _film_columns(columns: Optional[Sequence[str]] = None):
+        if columns is None:
+            return select(models.FilmWork).options(noload('*'))
+        return select(*(getattr(models.FilmWork, column) for column in columns))
+
+    @staticmethod
+    def _after_rating_keyset(after: List[Any]):
+        """Build the keyset predicate for ``rating DESC NULLS LAST, id DESC`` ordering"""
+        rating, film_id = after
+        if rating is None:
+            return and_(models.FilmWork.rating.is_(None), models.FilmWork.id < film_id)
+        return or_(
+            models.FilmWork.rating < rating,
+            and_(models.FilmWork.rating == rating, models.FilmWork.id < film_id),
+            models.FilmWork.rating.is_(None)
+        )
+
+    async def get_role_counts(self, person_id: uuid.UUID) -> Dict[str, int]:
+        """Count distinct films per role plus the overall total in one grouped query"""
+        pfw = models.person_film_work
+        query = select(
+            pfw.c.role, func.count(pfw.c.film_work_id.distinct())
+        ).where(pfw.c.person_id == person_id).group_by(func.grouping_sets(pfw.c.role, tuple_()))
 
         result = await self.session.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        counts = {"total": 0}
+        for role, count in result.all():
+            counts["total" if role is None else role] = count
+        return counts
+
+
+class ChangeRepository(BaseRepository[models.Tombstone]):
+    """Repository for the change feed: ``(modified, id)`` keyset scans plus tombstones"""
+
+    # Feed entity name -> model; tombstones are the "deleted" source
+    SOURCES = {"film": models.FilmWork, "person": models.Person, "genre": models.Genre}
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, models.Tombstone)
+
+    async def get_changes(self, positions: Dict[str, Optional[List[Any]]], limit: int,
+                          settle_seconds: float = 0.0) -> List[Any]:
+        """Up to ``limit`` changes per source after its position, in one UNION ALL statement.
+
+        Each branch is an index range scan on ``(modified, id)`` (``(deleted_at, id)``
+        for tombstones). Rows newer than ``now() - settle_seconds`` are left for a
+        later call, so a transaction committing late cannot slip behind a cursor.
+        """
+        horizon = func.timezone('utc', func.now()) - literal(timedelta(seconds=settle_seconds))
+        parts = []
+        for source, model in self.SOURCES.items():
+            parts.append(self._scan(
+                select(
+                    literal(source, Text).label('source'),
+                    literal(source, Text).label('entity_type'),
+                    model.id.label('entity_id'),
+                    model.modified.label('at'),
+                    cast(null(), BigInteger).label('seq')
+                ), model.modified, model.id, positions.get(source), horizon, limit
+            ))
+        tombstone = models.Tombstone
+        parts.append(self._scan(
+            select(
+                literal("deleted", Text).label('source'),
+                tombstone.entity_type,
+                tombstone.entity_id,
+                tombstone.deleted_at.label('at'),
+                tombstone.id.label('seq')
+            ), tombstone.deleted_at, tombstone.id, positions.get("deleted"), horizon, limit
+        ))
+
+        result = await self.session.execute(union_all(*(select(part) for part in parts)))
+        return result.all()
+
+    @staticmethod
+    def _scan(query, at_column, key_column, after: Optional[List[Any]], horizon, limit: int):
+        """Keyset page of one source as a subquery (each UNION ALL branch keeps its own ORDER BY/LIMIT)"""
+        query = query.where(at_column < horizon)
+        if after is not None:
+            query = query.where(tuple_(at_column, key_column) > tuple_(*after))
+        return query.order_by(at_column, key_column).limit(limit).subquery()
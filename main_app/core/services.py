@@ -1,10 +1,19 @@
 from abc import ABC
-from typing import List, Optional, Tuple, Protocol, Dict, Any, TypeVar, Generic
+from typing import List, Optional, Tuple, Protocol, Dict, Any, TypeVar, Generic, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 import uuid
 import logging
 
-from .repositories import BaseRepository, FilmRepository, GenreRepository, PersonRepository
+from .repositories import BaseRepository, ChangeRepository, FilmRepository, GenreRepository, PersonRepository
+from .cache import TTLCache
+from .catalog import GenreCatalog
+from .columnar import ColumnarFilmIndex
+from .graph import CollaborationGraph, GraphUnavailableError
+from .leaderboards import GenreLeaderboards
+from .singleflight import SingleFlight
+from .pagination import InvalidCursorError, encode_cursor, decode_cursor
+from .fields import FILM_CARD_FIELDS, FILM_DETAIL_FIELDS, FILM_FIELDS, PERSON_DETAIL_FIELDS, Fields, columns_for, wants
 from .. import models, schemas
 
 T = TypeVar('T', bound=models.Base)
@@ -25,14 +34,59 @@ class SearchService(Protocol):
         ...
 
 
+class ChangeListener(Protocol):
+    """Protocol for components that react to committed entity writes"""
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Called after a create, update or delete has been committed"""
+        ...
+
+    async def invalidate_all(self) -> None:
+        """Called when changes may have been missed (e.g. a lost notification connection)"""
+        ...
+
+
 class BaseService(ABC, Generic[T]):
     """Abstract base service for business logic"""
 
-    def __init__(self, session: AsyncSession, repository: BaseRepository[T]):
+    # Above this many written entities listeners are flushed instead of told one by one
+    BULK_NOTIFY_LIMIT = 100
+
+    def __init__(self, session: AsyncSession, repository: BaseRepository[T],
+                 listeners: Sequence[ChangeListener] = (), single_flight: Optional[SingleFlight] = None,
+                 session_factory=None):
         self.session = session
         self.repository = repository
+        self.listeners = listeners
+        self.single_flight = single_flight
+        self.session_factory = session_factory
         self.logger = logging.getLogger('films_api')
 
+    async def _coalesce(self, key, load):
+        """Share one in-flight read between identical concurrent callers.
+
+        ``load`` gets the repository to read from. A shared read outlives the
+        request that started it, so it runs on its own session from
+        ``session_factory`` and must return plain rows or dicts, never ORM instances.
+        """
+        if self.single_flight is None or self.session_factory is None:
+            return await load(self.repository)
+
+        async def shared():
+            async with self.session_factory() as session:
+                return await load(type(self.repository)(session))
+
+        return await self.single_flight.do(key, shared)
+
+    async def _notify(self, entity_id: uuid.UUID, operation: str, entity_type: Optional[str] = None):
+        """Tell registered listeners about a committed write; listener errors never fail the write"""
+        entity_type = entity_type or self.repository.model.__name__
+        for listener in self.listeners:
+            try:
+                await listener.entity_changed(entity_type, entity_id, operation)
+            except Exception as e:
+                self.logger.warning(f"Change listener {type(listener).__name__} failed for {entity_type} {entity_id}: {e}")
+
     async def get_all(self, skip: int = 0, limit: int = 50, **filters) -> List[T]:
         """Get all entities with pagination and filtering"""
         return await self.repository.get_all(skip=skip, limit=limit, **filters)
@@ -45,6 +99,7 @@ class BaseService(ABC, Generic[T]):
         """Create new entity"""
         entity = await self.repository.create(entity_data)
         self.logger.info(f"User {user} created {self.repository.model.__name__}: {entity}")
+        await self._notify(entity.id, "create")
         return entity
 
     async def update(self, entity_id: uuid.UUID, entity_data: Dict[str, Any], user: str = 'anonymous') -> Optional[T]:
@@ -52,22 +107,51 @@ class BaseService(ABC, Generic[T]):
         entity = await self.repository.update(entity_id, entity_data)
         if entity:
             self.logger.info(f"User {user} updated {self.repository.model.__name__} {entity_id}")
+            await self._notify(entity_id, "update")
         else:
             self.logger.warning(f"User {user} tried to update missing {self.repository.model.__name__} {entity_id}")
         return entity
 
     async def delete(self, entity_id: uuid.UUID, user: str = 'anonymous') -> bool:
         """Delete entity"""
-        result = await self.repository.delete(entity_id)
-        if result:
-            self.logger.info(f"User {user} deleted {self.repository.model.__name__} {entity_id}")
-        else:
+        unlinked = await self.repository.delete_unlinking(entity_id)
+        if unlinked is None:
             self.logger.warning(f"User {user} tried to delete missing {self.repository.model.__name__} {entity_id}")
-        return result
+            return False
+        self.logger.info(f"User {user} deleted {self.repository.model.__name__} {entity_id}")
+        await self._notify(entity_id, "delete")
+        await self._notify_unlinked(unlinked)
+        return True
+
+    async def _notify_unlinked(self, unlinked: Dict[str, List[uuid.UUID]]):
+        """Update notifications for the entities whose links a delete removed.
+
+        The database triggers announce them too, but listeners skip this
+        worker's own notifications (e.g. a person's films_count in suggest).
+        """
+        for entity_type, entity_ids in unlinked.items():
+            await self._notify_many(entity_ids, "update", entity_type)
+
+    async def _notify_many(self, entity_ids: Sequence[uuid.UUID], operation: str, entity_type: Optional[str] = None):
+        """Per-entity notifications for small batches; larger ones flush the listeners once"""
+        if len(entity_ids) <= self.BULK_NOTIFY_LIMIT:
+            for entity_id in entity_ids:
+                await self._notify(entity_id, operation, entity_type)
+            return
+        for listener in self.listeners:
+            try:
+                await listener.invalidate_all()
+            except Exception as e:
+                self.logger.warning(f"Flushing {type(listener).__name__} after {len(entity_ids)} writes failed: {e}")
 
     async def bulk_delete(self, entity_ids: List[uuid.UUID]) -> int:
         """Delete multiple entities"""
-        return await self.repository.bulk_delete(entity_ids)
+        deleted, unlinked = await self.repository.bulk_delete_unlinking(entity_ids)
+        if deleted:
+            for entity_id in entity_ids:
+                await self._notify(entity_id, "delete")
+            await self._notify_unlinked(unlinked)
+        return deleted
 
     async def count(self, **filters) -> int:
         """Count entities with optional filtering"""
@@ -83,20 +167,63 @@ class BaseService(ABC, Generic[T]):
 class FilmService(BaseService[models.FilmWork]):
     """Service for Film business logic"""
 
-    def __init__(self, session: AsyncSession, search_service: Optional[SearchService] = None):
+    # (kind, operation) of a bulk link write -> the FilmRepository method running it
+    LINK_WRITES = {
+        ("genres", "attach"): FilmRepository.attach_genres,
+        ("genres", "detach"): FilmRepository.detach_genres,
+        ("persons", "attach"): FilmRepository.attach_persons,
+        ("persons", "detach"): FilmRepository.detach_persons,
+    }
+
+    def __init__(self, session: AsyncSession, search_service: Optional[SearchService] = None,
+                 listeners: Sequence[ChangeListener] = (), use_film_cards: bool = False,
+                 facet_cache: Optional[TTLCache] = None, single_flight: Optional[SingleFlight] = None,
+                 leaderboards: Optional[GenreLeaderboards] = None,
+                 film_columns: Optional[ColumnarFilmIndex] = None, session_factory=None):
         repository = FilmRepository(session)
-        super().__init__(session, repository)
+        super().__init__(session, repository, listeners, single_flight, session_factory)
         self.search_service = search_service
+        self.use_film_cards = use_film_cards
+        # Fields of list and search items; cards add genre names and top cast
+        self.list_fields = FILM_CARD_FIELDS if use_film_cards else FILM_FIELDS
+        self.facet_cache = facet_cache
+        self.leaderboards = leaderboards
+        self.film_columns = film_columns
 
     async def get_films(
             self,
             skip: int = 0,
             limit: int = 50,
             sort_by: str = "-rating",
-            genre_id: Optional[uuid.UUID] = None
+            genre_id: Optional[uuid.UUID] = None,
+            columns: Optional[Sequence[str]] = None,
+            film_type: Optional[str] = None
     ) -> List[models.FilmWork]:
-        """Get films with filtering and sorting"""
-        return await self.repository.get_all(skip=skip, limit=limit, sort_by=sort_by, genre_id=genre_id)
+        """Get films with filtering and sorting as rows of ``columns`` (the list fields by default)"""
+        columns = tuple(columns) if columns is not None else columns_for(self.list_fields)
+        # The in-memory engines only keep the id, title and rating of each film
+        if set(columns) <= set(columns_for(FILM_FIELDS)):
+            if self.leaderboards is not None and genre_id is not None and film_type is None and sort_by == "-rating":
+                page = self.leaderboards.page(genre_id, skip, limit)
+                if page is not None:
+                    return page
+            if self.film_columns is not None:
+                page = self.film_columns.page(sort_by, skip, limit, genre_id=genre_id, film_type=film_type)
+                if page is not None:
+                    return page
+        key = ("film_list", skip, limit, sort_by, genre_id, film_type, self.use_film_cards, columns)
+        return await self._coalesce(
+            key, lambda repository: self._load_films(repository, skip, limit, sort_by, genre_id, columns, film_type)
+        )
+
+    async def _load_films(self, repository: FilmRepository, skip: int, limit: int, sort_by: str,
+                          genre_id: Optional[uuid.UUID], columns: Sequence[str],
+                          film_type: Optional[str] = None) -> List[Any]:
+        if self.use_film_cards:
+            return await repository.get_cards(skip=skip, limit=limit, sort_by=sort_by, genre_id=genre_id,
+                                              columns=columns, film_type=film_type)
+        return await repository.get_all(skip=skip, limit=limit, sort_by=sort_by, genre_id=genre_id,
+                                        columns=columns, film_type=film_type)
 
     async def get_film(self, film_id: uuid.UUID) -> Optional[models.FilmWork]:
         """Get film by ID with related data"""
@@ -112,43 +239,136 @@ class FilmService(BaseService[models.FilmWork]):
         data_dict = self._convert_schema_to_dict(film_data)
         return await self.update(film_id, data_dict)
 
-    async def search_films(self, query: str, skip: int = 0, limit: int = 50) -> List[models.FilmWork]:
-        """Search films by title"""
-        return await self.repository.search_by_title(query, skip, limit)
+    async def save_film_with_links(self, film_data: schemas.FilmWithLinks,
+                                   film_id: Optional[uuid.UUID] = None) -> Optional[Dict[str, Any]]:
+        """Create a film, or replace the one with ``film_id``, with its genre and person links in one transaction"""
+        # Imported here: the unit of work module builds services itself
+        from .unit_of_work import AsyncUnitOfWork
+
+        genre_ids = list(dict.fromkeys(film_data.genre_ids))
+        persons = list(dict.fromkeys((link.person_id, link.role) for link in film_data.persons))
+        async with AsyncUnitOfWork(self.session) as uow:
+            film = await uow.films.save_with_links(
+                film_data.model_dump(exclude={"genre_ids", "persons"}), genre_ids, persons, film_id
+            )
+        if film is None:
+            return None
+        film = dict(film._mapping)
+        await self._notify(film["id"], "update" if film_id is not None else "create")
+        # Their films_count changed (e.g. in the suggest index)
+        await self._notify_many(film.pop("changed_person_ids", None) or [], "update", "Person")
+        return {
+            **film,
+            "genre_ids": genre_ids,
+            "persons": [{"person_id": person_id, "role": role} for person_id, role in persons],
+        }
+
+    async def change_links(self, kind: str, operation: str, links: Sequence[Tuple]) -> Dict[str, int]:
+        """Attach or detach many genre or person links of films in one transaction.
+
+        ``kind`` is "genres" (``(film_id, genre_id)`` pairs) or "persons"
+        (``(film_id, person_id, role)`` triples); ``operation`` is "attach" or "detach".
+        """
+        from .unit_of_work import AsyncUnitOfWork
+
+        write = self.LINK_WRITES.get((kind, operation))
+        if write is None:
+            raise ValueError(f"Unknown link write: {operation} {kind}")
+        links = list(dict.fromkeys(links))
+        async with AsyncUnitOfWork(self.session) as uow:
+            changed, film_ids = await write(uow.films, links)
+        await self._notify_many(film_ids, "update")
+        if kind == "persons" and changed:
+            await self._notify_many(list(dict.fromkeys(link[1] for link in links)), "update", "Person")
+        self.logger.info(f"{operation.capitalize()}ed {changed} of {len(links)} {kind} links on {len(film_ids)} films")
+        return {"requested": len(links), "changed": changed, "films": len(film_ids)}
+
+    async def search_films(self, query: str, skip: int = 0, limit: int = 50,
+                           columns: Optional[Sequence[str]] = None) -> List[models.FilmWork]:
+        """Search films by title as rows of ``columns`` (the list fields by default)"""
+        columns = tuple(columns) if columns is not None else columns_for(self.list_fields)
+        key = ("film_search", query, skip, limit, self.use_film_cards, columns)
+        return await self._coalesce(key, lambda repository: self._search_films(repository, query, skip, limit, columns))
+
+    async def _search_films(self, repository: FilmRepository, query: str, skip: int, limit: int,
+                            columns: Sequence[str]) -> List[Any]:
+        if self.use_film_cards:
+            return await repository.search_cards(query, skip, limit, columns)
+        return await repository.search_by_title(query, skip, limit, columns)
+
+    async def suggest_films(self, prefix: str, limit: int = 10) -> List[Any]:
+        """Films whose title starts with a prefix, best rated first"""
+        return await self.repository.suggest_by_title(prefix, limit)
+
+    async def get_film_facets(
+            self,
+            facets: Sequence[str],
+            genre_id: Optional[uuid.UUID] = None,
+            query: Optional[str] = None,
+            film_type: Optional[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get facet counts for the films matching a list or search filter"""
+        key = (tuple(sorted(facets)), genre_id, query.lower() if query else None, film_type)
+        if self.facet_cache is not None:
+            cached = self.facet_cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = await self.repository.get_facets(facets, genre_id=genre_id, title_query=query, film_type=film_type)
+        if self.facet_cache is not None:
+            self.facet_cache.set(key, result)
+        return result
+
+    async def get_film_expansions(self, film_ids: Sequence[uuid.UUID],
+                                  expand: Sequence[str]) -> Dict[uuid.UUID, Dict[str, Any]]:
+        """Get genres and/or role-grouped persons for a page of films with one query"""
+        return await self.repository.get_expansions(film_ids, expand)
 
-    async def get_film_detail(self, film_id: uuid.UUID) -> Optional[Dict[str, Any]]:
-        """Get detailed film information with related data"""
-        film = await self.get_film(film_id)
+    async def get_film_detail(self, film_id: uuid.UUID, fields: Optional[Fields] = None) -> Optional[Dict[str, Any]]:
+        """Get detailed film information with related data, limited to ``fields`` when given"""
+        return await self._coalesce(
+            ("film_detail", film_id, fields), lambda repository: self._load_film_detail(repository, film_id, fields)
+        )
+
+    async def _load_film_detail(self, repository: FilmRepository, film_id: uuid.UUID,
+                                fields: Optional[Fields] = None) -> Optional[Dict[str, Any]]:
+        film = await repository.get_columns(film_id, columns_for(fields or FILM_DETAIL_FIELDS))
         if not film:
             return None
 
-        # Get persons by role
-        actors = await self.repository.get_persons_by_role(film_id, "actor")
-        writers = await self.repository.get_persons_by_role(film_id, "writer")
-        directors = await self.repository.get_persons_by_role(film_id, "director")
-
-        return {
-            "uuid": str(film.id),
-            "title": film.title,
-            "imdb_rating": film.rating,
-            "description": film.description,
-            "genre": [
+        detail = {}
+        if wants(fields, "uuid"):
+            detail["uuid"] = str(film.id)
+        if wants(fields, "title"):
+            detail["title"] = film.title
+        if wants(fields, "imdb_rating"):
+            detail["imdb_rating"] = film.rating
+        if wants(fields, "description"):
+            detail["description"] = film.description
+        # Relationships are only aggregated when a requested field needs them
+        if wants(fields, "genre"):
+            detail["genre"] = [
                 {"uuid": str(genre.id), "name": genre.name}
-                for genre in film.genres
-            ],
-            "actors": [
-                {"uuid": str(actor.id), "full_name": actor.full_name}
-                for actor in actors
-            ],
-            "writers": [
-                {"uuid": str(writer.id), "full_name": writer.full_name}
-                for writer in writers
-            ],
-            "directors": [
-                {"uuid": str(director.id), "full_name": director.full_name}
-                for director in directors
+                for genre in await repository.get_genres(film_id)
             ]
-        }
+        for field, role in (("actors", "actor"), ("writers", "writer"), ("directors", "director")):
+            if wants(fields, field):
+                detail[field] = [
+                    {"uuid": str(person.id), "full_name": person.full_name}
+                    for person in await repository.get_persons_by_role(film_id, role)
+                ]
+        return detail
+
+    async def get_similar_films(self, film_id: uuid.UUID, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Films most similar to ``film_id``; None when the film does not exist"""
+        similar = await self.repository.get_similar(film_id, limit)
+        # Films without stored neighbours (new since the last build) still answer with an empty list
+        if not similar and await self.repository.get_columns(film_id, ("id",)) is None:
+            return None
+        return [
+            {"uuid": str(film.id), "title": film.title, "imdb_rating": film.rating, "score": round(film.score, 4)}
+            for film in similar
+        ]
 
     async def get_films_by_genre(self, genre_id: uuid.UUID, skip: int = 0, limit: int = 50) -> List[models.FilmWork]:
         """Get films filtered by genre"""
@@ -158,39 +378,61 @@ class FilmService(BaseService[models.FilmWork]):
 class GenreService(BaseService[models.Genre]):
     """Service for Genre business logic"""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, catalog: Optional[GenreCatalog] = None,
+                 listeners: Sequence[ChangeListener] = ()):
         repository = GenreRepository(session)
-        super().__init__(session, repository)
-
-    async def get_genres(self, skip: int = 0, limit: int = 100) -> List[models.Genre]:
-        """Get all genres"""
-        return await self.get_all(skip=skip, limit=limit)
-
-    async def get_genre(self, genre_id: uuid.UUID) -> Optional[models.Genre]:
-        """Get genre by ID"""
+        super().__init__(session, repository, listeners)
+        self.catalog = catalog
+
+    async def get_genres(self, skip: int = 0, limit: int = 100,
+                         columns: Optional[Sequence[str]] = None) -> List[models.Genre]:
+        """Get all genres; ``columns`` narrows the SELECT list"""
+        return await self.get_all(skip=skip, limit=limit, columns=columns)
+
+    async def get_genre(self, genre_id: uuid.UUID, columns: Optional[Sequence[str]] = None) -> Optional[models.Genre]:
+        """Get genre by ID; ``columns`` narrows the SELECT list"""
+        if columns is not None:
+            return await self.repository.get_columns(genre_id, columns)
         return await self.get_by_id(genre_id)
 
     async def create_genre(self, genre_data: schemas.GenreCreate) -> models.Genre:
         """Create new genre"""
         data_dict = self._convert_schema_to_dict(genre_data)
-        return await self.create(data_dict)
+        genre = await self.create(data_dict)
+        await self._rebuild_catalog()
+        return genre
 
     async def update_genre(self, genre_id: uuid.UUID, genre_data: schemas.GenreUpdate) -> Optional[models.Genre]:
         """Update genre"""
         data_dict = self._convert_schema_to_dict(genre_data)
-        return await self.update(genre_id, data_dict)
+        genre = await self.update(genre_id, data_dict)
+        if genre:
+            await self._rebuild_catalog()
+        return genre
 
     async def delete_genre(self, genre_id: uuid.UUID) -> bool:
         """Delete genre"""
-        return await self.delete(genre_id)
+        deleted = await self.delete(genre_id)
+        if deleted:
+            await self._rebuild_catalog()
+        return deleted
+
+    async def _rebuild_catalog(self):
+        """Swap in a fresh catalog snapshot after a write"""
+        if self.catalog is not None and self.catalog.loaded:
+            await self.catalog.reload(self.session)
 
 
 class PersonService(BaseService[models.Person]):
     """Service for Person business logic"""
 
-    def __init__(self, session: AsyncSession):
+    ROLES = ("actor", "writer", "director")
+
+    def __init__(self, session: AsyncSession, listeners: Sequence[ChangeListener] = (),
+                 graph: Optional[CollaborationGraph] = None):
         repository = PersonRepository(session)
-        super().__init__(session, repository)
+        super().__init__(session, repository, listeners)
+        self.graph = graph
 
     async def get_persons(self, skip: int = 0, limit: int = 50) -> List[models.Person]:
         """Get all persons"""
@@ -214,13 +456,160 @@ class PersonService(BaseService[models.Person]):
         """Delete person"""
         return await self.delete(person_id)
 
-    async def search_persons(self, query: str, skip: int = 0, limit: int = 50) -> List[models.Person]:
-        """Search persons by name"""
-        return await self.repository.search_by_name(query, skip, limit)
+    async def search_persons(self, query: str, skip: int = 0, limit: int = 50,
+                             columns: Optional[Sequence[str]] = None) -> List[models.Person]:
+        """Search persons by name; ``columns`` narrows the SELECT list"""
+        return await self.repository.search_by_name(query, skip, limit, columns)
+
+    async def suggest_persons(self, prefix: str, limit: int = 10) -> List[Any]:
+        """Persons whose name starts with a prefix, most prolific first"""
+        return await self.repository.suggest_by_name(prefix, limit)
+
+    async def get_person_films(self, person_id: uuid.UUID, skip: int = 0, limit: int = 50,
+                               cursor: Optional[str] = None,
+                               columns: Optional[Sequence[str]] = None) -> List[models.FilmWork]:
+        """Get films by person, optionally continuing from a filmography cursor"""
+        after = decode_cursor(cursor, 2)
+        if after is not None:
+            try:
+                after = [None if after[0] is None else float(after[0]), uuid.UUID(str(after[1]))]
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursorError(f"Malformed cursor: {cursor}") from exc
+        if columns is not None:
+            # The next-page cursor is built from (rating, id)
+            columns = tuple(dict.fromkeys((*columns, "id", "rating")))
+        return await self.repository.get_films_by_person(person_id, skip, limit, after=after, columns=columns)
+
+    async def get_person_detail(self, person_id: uuid.UUID, films_limit: int = 10,
+                                fields: Optional[Fields] = None) -> Optional[Dict[str, Any]]:
+        """Get person with top rated films, per-role counts and a cursor to the full filmography.
+
+        With ``fields``, the filmography and role counts are only queried when a requested field needs them.
+        """
+        person = await self.repository.get_columns(person_id, columns_for(fields or PERSON_DETAIL_FIELDS))
+        if not person:
+            return None
+
+        films = []
+        if wants(fields, "films", "films_cursor"):
+            film_columns = ("id", "title", "rating") if wants(fields, "films") else ("id", "rating")
+            films = await self.repository.get_films_by_person(person_id, limit=films_limit, columns=film_columns)
+        counts = {"total": 0}
+        if wants(fields, "roles", "films_total", "films_cursor"):
+            counts = await self.repository.get_role_counts(person_id)
+
+        detail = {}
+        if wants(fields, "uuid"):
+            detail["uuid"] = str(person.id)
+        if wants(fields, "full_name"):
+            detail["full_name"] = person.full_name
+        if wants(fields, "films"):
+            detail["films"] = [
+                {"uuid": str(film.id), "title": film.title, "imdb_rating": film.rating}
+                for film in films
+            ]
+        if wants(fields, "roles"):
+            detail["roles"] = {role: counts.get(role, 0) for role in self.ROLES}
+        if wants(fields, "films_total"):
+            detail["films_total"] = counts["total"]
+        if wants(fields, "films_cursor"):
+            detail["films_cursor"] = None
+            if films and counts["total"] > len(films):
+                detail["films_cursor"] = encode_cursor(films[-1].rating, films[-1].id)
+        return detail
+
+    async def get_collaborators(self, person_id: uuid.UUID, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """Persons who worked with ``person_id``, most shared films first; None when the person does not exist"""
+        if self.graph is not None and self.graph.loaded:
+            ranked = self.graph.snapshot.collaborators(person_id, limit)
+        else:
+            ranked = await self.repository.get_collaborators(person_id, limit)
+        if not ranked and await self.repository.get_columns(person_id, ("id",)) is None:
+            return None
+        # The graph can lag behind deletes until its next rebuild
+        names = await self.repository.get_many_columns([collaborator for collaborator, _ in ranked], ("id", "full_name"))
+        return [
+            {"uuid": str(collaborator), "full_name": names[collaborator].full_name, "shared_films": shared}
+            for collaborator, shared in ranked if collaborator in names
+        ]
+
+    async def get_connection(self, source_id: uuid.UUID, target_id: uuid.UUID,
+                             max_degrees: int = 6) -> Optional[Dict[str, Any]]:
+        """Shortest chain of shared films linking two persons; None when there is none within ``max_degrees``"""
+        if self.graph is None or not self.graph.loaded:
+            raise GraphUnavailableError("Collaboration graph is not available")
+        chain = self.graph.snapshot.path(source_id, target_id, max_degrees)
+        if chain is None:
+            return None
+        person_ids, film_ids = chain
+        persons = await self.repository.get_many_columns(person_ids, ("id", "full_name"))
+        films = await FilmRepository(self.session).get_many_columns(film_ids, ("id", "title"))
+        return {
+            "degrees": len(film_ids),
+            "persons": [
+                {"uuid": str(person_id), "full_name": getattr(persons.get(person_id), "full_name", None)}
+                for person_id in person_ids
+            ],
+            # films[i] links persons[i] and persons[i + 1]
+            "films": [
+                {"uuid": str(film_id), "title": getattr(films.get(film_id), "title", None)}
+                for film_id in film_ids
+            ]
+        }
+
+
+class ChangeService:
+    """Incremental change feed of created, updated and deleted films, persons and genres.
+
+    The ``since`` token holds one ``(timestamp, key)`` position per source, so
+    every source is read with its own index range scan and merged here.
+    """
+
+    SOURCES = ("film", "person", "genre", "deleted")
+
+    def __init__(self, session: AsyncSession, settle_seconds: float = 0.0):
+        self.repository = ChangeRepository(session)
+        self.settle_seconds = settle_seconds
+
+    async def get_changes(self, since: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+        """Next ``limit`` changes after the ``since`` token (from the beginning when omitted)"""
+        positions = self._decode_positions(since)
+        rows = await self.repository.get_changes(positions, limit + 1, self.settle_seconds)
+
+        # Every source returned a prefix of its own order, so the first ``limit`` rows overall are safe to emit
+        order = {source: index for index, source in enumerate(self.SOURCES)}
+        rows = sorted(rows, key=lambda row: (row.at, order[row.source], row.seq or str(row.entity_id)))
+        page = rows[:limit]
+        changes = []
+        for row in page:
+            deleted = row.source == "deleted"
+            positions[row.source] = [row.at, row.seq if deleted else row.entity_id]
+            changes.append({
+                "type": row.entity_type,
+                "id": str(row.entity_id),
+                "operation": "delete" if deleted else "upsert",
+                "modified": row.at.isoformat()
+            })
+
+        return {
+            "changes": changes,
+            "next": encode_cursor(*(value for source in self.SOURCES for value in positions[source] or (None, None))),
+            "has_more": len(rows) > len(page)
+        }
 
-    async def get_person_films(self, person_id: uuid.UUID, skip: int = 0, limit: int = 50) -> List[models.FilmWork]:
-        """Get films by person"""
-        return await self.repository.get_films_by_person(person_id, skip, limit)
+    def _decode_positions(self, since: Optional[str]) -> Dict[str, Optional[List[Any]]]:
+        values = decode_cursor(since, 2 * len(self.SOURCES)) or [None] * (2 * len(self.SOURCES))
+        positions = {}
+        try:
+            for index, source in enumerate(self.SOURCES):
+                at, key = values[2 * index:2 * index + 2]
+                if at is None:
+                    positions[source] = None
+                    continue
+                positions[source] = [datetime.fromisoformat(at), int(key) if source == "deleted" else uuid.UUID(key)]
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursorError(f"Malformed cursor: {since}") from exc
+        return positions
 
 
 # Utility service for common operations
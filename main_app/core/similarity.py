@@ -0,0 +1,243 @@
+"""Offline "similar films" build.
+
+Every film becomes a sparse row of weighted features (genres, directors,
+writers and its first billed actors, scaled by inverse document frequency)
+and the top-k films by cosine similarity are written to
+``content.film_similarity``, which ``GET /films/{id}/similar/`` reads with
+a single indexed lookup::
+
+    python -m main_app.core.similarity --top-k 20 --workers 4
+
+Candidates of a film are the films sharing one of its features; features
+held by more than ``--max-df`` films (large genres) still add to the score
+but do not generate candidates, which keeps the work per film bounded.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import logging
+import os
+import time
+
+from sqlalchemy import select, func, literal, union_all, Text, LargeBinary, text
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a shared feature by kind, before the IDF factor
+FEATURE_WEIGHTS = {"genre": 1.0, "director": 3.0, "writer": 2.0, "actor": 1.5}
+
+
+class FeatureMatrix:
+    """Row-normalized film x feature matrix in CSR form plus its transpose for candidate lookups"""
+
+    def __init__(self, film_ids, indptr, features, weights, feature_indptr, feature_films, feature_df):
+        self.film_ids = film_ids
+        self.indptr = indptr
+        self.features = features
+        self.weights = weights
+        self.feature_indptr = feature_indptr
+        self.feature_films = feature_films
+        self.feature_df = feature_df
+
+    @classmethod
+    def build(cls, film_bytes: Sequence[bytes], feature_keys: Sequence[bytes],
+              kinds: Sequence[str]) -> "FeatureMatrix":
+        """Build from parallel columns: raw film id, feature key (kind + id bytes) and feature kind"""
+        import numpy as np
+
+        film_ids, films = np.unique(np.array(film_bytes, dtype="S16"), return_inverse=True)
+        _, features = np.unique(np.array(feature_keys, dtype="S17"), return_inverse=True)
+        films, features = films.astype(np.int64).ravel(), features.astype(np.int64).ravel()
+        kind_weights = np.array([FEATURE_WEIGHTS[kind] for kind in kinds], dtype=np.float32)
+
+        # One entry per (film, feature); a person credited twice in a role counts once
+        _, first = np.unique(films * (features.max() + 1) + features, return_index=True)
+        films, features, kind_weights = films[first], features[first], kind_weights[first]
+
+        n_films, n_features = len(film_ids), int(features.max()) + 1
+        df = np.bincount(features, minlength=n_features)
+        weights = kind_weights * np.log1p(n_films / df[features]).astype(np.float32)
+        norms = np.sqrt(np.bincount(films, weights=weights.astype(np.float64) ** 2, minlength=n_films))
+        weights = (weights / norms[films]).astype(np.float32)
+
+        order = np.lexsort((features, films))
+        indptr = np.zeros(n_films + 1, dtype=np.int64)
+        np.cumsum(np.bincount(films, minlength=n_films), out=indptr[1:])
+        by_feature = np.argsort(features, kind="stable")
+        feature_indptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(df, out=feature_indptr[1:])
+        return cls(
+            film_ids, indptr, features[order].astype(np.int32), weights[order],
+            feature_indptr, films[by_feature].astype(np.int32), df
+        )
+
+    def __len__(self) -> int:
+        return len(self.film_ids)
+
+
+def _ranges(indptr, rows):
+    """Positions of the concatenated CSR ``rows`` and the row of each position"""
+    import numpy as np
+
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.arange(total, dtype=np.int64) + np.repeat(starts - offsets, lengths)
+    return positions, np.repeat(rows, lengths)
+
+
+def top_k_similar(matrix: FeatureMatrix, film: int, k: int, max_df: int) -> List[Tuple[int, float]]:
+    """The ``k`` films with the highest cosine similarity to ``film``"""
+    import numpy as np
+
+    row = slice(matrix.indptr[film], matrix.indptr[film + 1])
+    features, weights = matrix.features[row], matrix.weights[row]
+    generating = features[matrix.feature_df[features] <= max_df].astype(np.int64)
+    if len(generating) == 0:
+        return []
+    positions, _ = _ranges(matrix.feature_indptr, generating)
+    candidates = np.unique(matrix.feature_films[positions])
+    candidates = candidates[candidates != film].astype(np.int64)
+    if len(candidates) == 0:
+        return []
+
+    # Exact dot products over the candidates' whole rows, large features included
+    lookup = np.zeros(len(matrix.feature_df), dtype=np.float32)
+    lookup[features] = weights
+    positions, owners = _ranges(matrix.indptr, candidates)
+    contributions = lookup[matrix.features[positions]] * matrix.weights[positions]
+    _, owner_index = np.unique(owners, return_inverse=True)
+    scores = np.bincount(owner_index.ravel(), weights=contributions, minlength=len(candidates))
+
+    top = np.argpartition(-scores, min(k, len(scores) - 1))[:k] if len(scores) > k else np.arange(len(scores))
+    top = top[np.lexsort((candidates[top], -scores[top]))]
+    return [(int(candidates[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+_worker_matrix: Optional[FeatureMatrix] = None
+
+
+def _init_worker(matrix: FeatureMatrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _similar_chunk(films: range, k: int, max_df: int) -> List[Tuple[int, int, float]]:
+    rows = []
+    for film in films:
+        rows.extend((film, other, score) for other, score in top_k_similar(_worker_matrix, film, k, max_df))
+    return rows
+
+
+def compute_similarities(matrix: FeatureMatrix, k: int = 20, max_df: int = 5000, workers: int = 1,
+                         chunk_size: int = 2000) -> List[Tuple[int, int, float]]:
+    """``(film, similar film, score)`` rows for every film, chunks spread over a process pool"""
+    chunks = [range(start, min(start + chunk_size, len(matrix))) for start in range(0, len(matrix), chunk_size)]
+    if workers <= 1:
+        _init_worker(matrix)
+        return [row for chunk in chunks for row in _similar_chunk(chunk, k, max_df)]
+    rows = []
+    # The matrix is sent to each worker once, not with every chunk
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrix,)) as pool:
+        for chunk_rows in pool.map(_similar_chunk, chunks, [k] * len(chunks), [max_df] * len(chunks)):
+            rows.extend(chunk_rows)
+    return rows
+
+
+def features_query(top_actors: int = 5):
+    """``(film id bytes, feature id bytes, kind)`` rows for every film"""
+    gfw, pfw = models.genre_film_work, models.person_film_work
+    genres = select(
+        func.uuid_send(gfw.c.film_work_id, type_=LargeBinary).label('film'),
+        func.uuid_send(gfw.c.genre_id, type_=LargeBinary).label('feature'),
+        literal("genre", Text).label('kind')
+    )
+    billing = func.row_number().over(
+        partition_by=(pfw.c.film_work_id, pfw.c.role), order_by=(pfw.c.created, pfw.c.person_id)
+    ).label('billing')
+    credits = select(pfw.c.film_work_id, pfw.c.person_id, pfw.c.role, billing).where(
+        pfw.c.role.in_(("actor", "writer", "director"))
+    ).subquery()
+    persons = select(
+        func.uuid_send(credits.c.film_work_id, type_=LargeBinary),
+        func.uuid_send(credits.c.person_id, type_=LargeBinary),
+        credits.c.role
+    ).where((credits.c.role != "actor") | (credits.c.billing <= top_actors))
+    return union_all(genres, persons)
+
+
+def store_similarities(connection, matrix: FeatureMatrix, rows: List[Tuple[int, int, float]], batch: int = 50000):
+    """Replace ``content.film_similarity`` in one transaction; readers keep the old rows until commit"""
+    import uuid
+
+    def film_id(index: int) -> str:
+        return str(uuid.UUID(bytes=bytes(matrix.film_ids[index]).ljust(16, b"\0")))
+
+    connection.execute(text("DELETE FROM content.film_similarity"))
+    statement = text(
+        "INSERT INTO content.film_similarity (film_id, similar_film_id, score) "
+        "SELECT * FROM unnest(CAST(:films AS uuid[]), CAST(:similar AS uuid[]), CAST(:scores AS real[]))"
+    )
+    for start in range(0, len(rows), batch):
+        chunk = rows[start:start + batch]
+        connection.execute(statement, {
+            "films": [film_id(film) for film, _, _ in chunk],
+            "similar": [film_id(other) for _, other, _ in chunk],
+            "scores": [round(score, 6) for _, _, score in chunk],
+        })
+
+
+def build(k: int = 20, max_df: int = 5000, workers: int = 1, top_actors: int = 5) -> Dict[str, float]:
+    """Read features, compute top-k per film and store the result; returns timings"""
+    from database import get_sync_engine
+
+    timings = {}
+    started = time.perf_counter()
+    engine = get_sync_engine()
+    with engine.connect() as connection:
+        rows = connection.execute(features_query(top_actors)).all()
+    timings["read_s"] = round(time.perf_counter() - started, 3)
+    if not rows:
+        logger.warning("No film features found, nothing to build")
+        return timings
+
+    started = time.perf_counter()
+    # A person is one feature whatever the role; genres and persons never share ids
+    matrix = FeatureMatrix.build(
+        [bytes(row[0]) for row in rows],
+        [(b"g" if row[2] == "genre" else b"p") + bytes(row[1]) for row in rows],
+        [row[2] for row in rows]
+    )
+    del rows
+    timings["matrix_s"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    similarities = compute_similarities(matrix, k=k, max_df=max_df, workers=workers)
+    timings["similarity_s"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        store_similarities(connection, matrix, similarities)
+    timings["store_s"] = round(time.perf_counter() - started, 3)
+    timings.update(films=len(matrix), rows=len(similarities))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top-k", type=int, default=20, help="Similar films stored per film")
+    parser.add_argument("--max-df", type=int, default=5000, help="Features on more films do not generate candidates")
+    parser.add_argument("--top-actors", type=int, default=5, help="First billed actors used as features")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes computing similarities")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    timings = build(k=args.top_k, max_df=args.max_df, workers=args.workers, top_actors=args.top_actors)
+    logger.info(", ".join(f"{name}={value}" for name, value in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
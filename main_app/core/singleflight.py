@@ -0,0 +1,72 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "leader_cancelled")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+        self.leader_cancelled = False
+
+
+class SingleFlight:
+    """Coalesce identical concurrent reads into one in-flight coroutine.
+
+    The first caller for a key (the leader) starts the work as a separate
+    task; callers arriving while it runs await the same result. Each caller
+    awaits through ``asyncio.shield`` so a cancelled caller never cancels the
+    shared work for the others, and the work is cancelled only when every
+    caller is gone. If the leader is cancelled and the work then fails,
+    followers retry on their own. Callers must not hand the work anything
+    owned by one request (such as its database session).
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.logger = logging.getLogger(__name__)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            self.logger.debug(f"Coalesced read {key}: {flight.waiters} caller(s) already waiting")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if leader:
+                flight.leader_cancelled = True
+            if flight.waiters == 1 and not flight.task.done():
+                # Last interested caller left: stop the work and let new callers start fresh
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        except Exception:
+            if not leader and flight.leader_cancelled:
+                return await factory()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,142 @@
+from collections import deque
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+import sys
+import time
+
+import greenlet
+from sqlalchemy import event
+
+from main_app.core.query_stats import statement_shape
+
+_REPOSITORY_MODULE = "main_app.core.repositories"
+
+# Set inside EXPLAIN tasks so their own statements are not recorded
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Describe bound parameters by type only, so values never reach the log"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def find_caller() -> Optional[str]:
+    """Name the repository method that issued the current statement.
+
+    Async statements run in a greenlet spawned by SQLAlchemy, whose stack
+    ends at the driver call; the awaiting coroutine (and so the repository
+    method) sits on the parent greenlet's suspended stack.
+    """
+    frames = [sys._getframe(1)]
+    parent = greenlet.getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        frames.append(parent.gr_frame)
+    for frame in frames:
+        while frame is not None:
+            if frame.f_globals.get("__name__") == _REPOSITORY_MODULE:
+                owner = frame.f_locals.get("self")
+                name = frame.f_code.co_name
+                return f"{type(owner).__name__}.{name}" if owner is not None else name
+            frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Bounded ring buffer of statements slower than a threshold.
+
+    Each entry records the SQL, the types of its bound parameters and the
+    repository method that issued it. The first time a statement shape is
+    seen, a plain ``EXPLAIN`` (never ``ANALYZE``) of the SELECT runs on a
+    separate connection in the background and its plan is attached to the
+    entries of that shape.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.entries: deque = deque(maxlen=size)
+        self.plans: Dict[str, Optional[List[str]]] = {}
+        self.recorded = 0
+        self._engine = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.logger = logging.getLogger('films_api')
+
+    def instrument(self, engine):
+        """Attach the recorder to an (async) engine; EXPLAIN runs on the same engine"""
+        self._engine = engine
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if not event.contains(sync_engine, "after_cursor_execute", self._after_cursor_execute):
+            event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        entries = list(self.entries)[::-1]
+        if limit is not None:
+            entries = entries[:limit]
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "recorded": self.recorded,
+            "entries": [{**entry, "plan": self.plans.get(entry["shape"])} for entry in entries],
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.plans.clear()
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        if duration < self.threshold or _explaining.get():
+            return
+        shape = statement_shape(statement)
+        self.recorded += 1
+        self.entries.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "caller": find_caller(),
+            "statement": statement,
+            "parameters": parameter_shape(parameters),
+            "shape": shape,
+        })
+        self.logger.warning(f"Slow query ({duration * 1000:.1f}ms) from {self.entries[-1]['caller']}: {shape[:200]}")
+        if shape not in self.plans:
+            self.plans[shape] = None
+            if self.explain and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                self._schedule_explain(shape, statement, parameters)
+
+    def _schedule_explain(self, shape: str, statement: str, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync engine usage (scripts, migrations)
+        # Start from an empty context so the EXPLAIN is not counted against the request
+        task = Context().run(loop.create_task, self._explain(shape, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, shape: str, statement: str, parameters):
+        _explaining.set(True)
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                self.plans[shape] = [row[0] for row in result.all()]
+        except Exception as e:
+            self.plans[shape] = [f"EXPLAIN failed: {e}"]
@@ -0,0 +1,189 @@
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import logging
+import re
+import time
+import uuid
+
+from sqlalchemy import select, func
+
+from .. import models
+
+_WORD_START = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Normalize text for case-insensitive prefix matching"""
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    """Sorted prefix index of one entity type.
+
+    Every entry is indexed under its full text and under each later word
+    start (so "godf" finds "The Godfather"), as the database fallback
+    matches them. Lookups bisect into the sorted keys and keep the best
+    ``CACHE_DEPTH`` matches by score, cached per prefix until a write
+    changes an entry matching that prefix.
+    """
+
+    CACHE_DEPTH = 100
+    CACHE_SIZE = 4096
+
+    def __init__(self):
+        self._keys: List[Tuple[str, uuid.UUID]] = []
+        self._entries: Dict[uuid.UUID, Tuple[str, float]] = {}
+        # Ranked results per prefix, recomputed lazily after writes
+        self._cache: Dict[str, List[uuid.UUID]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def _index_keys(cls, text: str) -> List[str]:
+        normalized = normalize(text)
+        starts = [match.start() for match in _WORD_START.finditer(normalized)]
+        return sorted({normalized[start:] for start in starts} | {normalized})
+
+    def load(self, rows):
+        """Bulk load ``(id, text, score)`` rows"""
+        keys = []
+        entries = {}
+        for entity_id, text, score in rows:
+            entries[entity_id] = (text, score)
+            keys.extend((key, entity_id) for key in self._index_keys(text))
+        keys.sort()
+        self._keys = keys
+        self._entries = entries
+        self._cache = {}
+
+    def upsert(self, entity_id: uuid.UUID, text: str, score: Optional[float]):
+        self.remove(entity_id)
+        self._entries[entity_id] = (text, score)
+        for key in self._index_keys(text):
+            insort(self._keys, (key, entity_id))
+        self._invalidate(text)
+
+    def remove(self, entity_id: uuid.UUID):
+        entry = self._entries.pop(entity_id, None)
+        if entry is None:
+            return
+        for key in self._index_keys(entry[0]):
+            position = bisect_left(self._keys, (key, entity_id))
+            if position < len(self._keys) and self._keys[position] == (key, entity_id):
+                del self._keys[position]
+        self._invalidate(entry[0])
+
+    def _invalidate(self, text: str):
+        """Drop the cached results of every prefix that matches ``text``"""
+        if not self._cache:
+            return
+        for key in self._index_keys(text):
+            for end in range(1, len(key) + 1):
+                self._cache.pop(key[:end], None)
+
+    def _rank(self, entity_id: uuid.UUID) -> Tuple[float, str]:
+        text, score = self._entries[entity_id]
+        return -(score or 0.0), text
+
+    def _ranked_ids(self, prefix: str, limit: int) -> List[uuid.UUID]:
+        """Best ``limit`` matches of a prefix without sorting every match"""
+        matched = set()
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+            matched.add(self._keys[position][1])
+            position += 1
+        return heapq.nsmallest(limit, matched, key=self._rank)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[uuid.UUID, str, float]]:
+        """Entries whose text or a word in it starts with ``query``, best score first"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        if limit > self.CACHE_DEPTH:
+            ranked = self._ranked_ids(prefix, limit)
+        else:
+            ranked = self._cache.get(prefix)
+            if ranked is None:
+                if len(self._cache) >= self.CACHE_SIZE:
+                    # Drop the oldest prefix
+                    del self._cache[next(iter(self._cache))]
+                ranked = self._cache[prefix] = self._ranked_ids(prefix, self.CACHE_DEPTH)
+        return [(entity_id, *self._entries[entity_id]) for entity_id in ranked[:limit]]
+
+
+class SuggestIndex:
+    """Typeahead index over film titles (ranked by rating) and person names (ranked by film count)"""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.films = PrefixIndex()
+        self.persons = PrefixIndex()
+        self.loaded = False
+        self.logger = logging.getLogger(__name__)
+
+    async def load(self):
+        """Build both indexes from the database"""
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            films = await session.execute(select(models.FilmWork.id, models.FilmWork.title, models.FilmWork.rating))
+            persons = await session.execute(self._persons_query())
+            film_index, person_index = PrefixIndex(), PrefixIndex()
+            film_index.load(films.all())
+            person_index.load(persons.all())
+        self.films, self.persons = film_index, person_index
+        self.loaded = True
+        self.logger.info(
+            f"Suggest index built in {time.perf_counter() - started:.3f}s: "
+            f"{len(film_index)} films, {len(person_index)} persons"
+        )
+
+    @staticmethod
+    def _persons_query(person_id: Optional[uuid.UUID] = None):
+        pfw = models.person_film_work
+        query = select(
+            models.Person.id, models.Person.full_name, func.count(pfw.c.film_work_id.distinct())
+        ).outerjoin(pfw, pfw.c.person_id == models.Person.id).group_by(models.Person.id, models.Person.full_name)
+        if person_id is not None:
+            query = query.where(models.Person.id == person_id)
+        return query
+
+    async def entity_changed(self, entity_type: str, entity_id: uuid.UUID, operation: str) -> None:
+        """Change listener hook: keep the indexes in step with service-layer writes"""
+        if not self.loaded or entity_type not in ("FilmWork", "Person"):
+            return
+        index = self.films if entity_type == "FilmWork" else self.persons
+        if operation == "delete":
+            index.remove(entity_id)
+            return
+
+        async with self.session_factory() as session:
+            if entity_type == "FilmWork":
+                query = select(models.FilmWork.id, models.FilmWork.title, models.FilmWork.rating).where(
+                    models.FilmWork.id == entity_id
+                )
+            else:
+                query = self._persons_query(entity_id)
+            row = (await session.execute(query)).first()
+        if row is None:
+            index.remove(entity_id)
+        else:
+            index.upsert(*row)
+
+    async def invalidate_all(self) -> None:
+        """Rebuild both indexes when changes may have been missed"""
+        if self.loaded:
+            await self.load()
+
+    def suggest(self, query: str, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            "films": [
+                {"uuid": str(film_id), "title": title, "imdb_rating": rating}
+                for film_id, title, rating in self.films.search(query, limit)
+            ],
+            "persons": [
+                {"uuid": str(person_id), "full_name": full_name, "films_count": int(films_count)}
+                for person_id, full_name, films_count in self.persons.search(query, limit)
+            ]
+        }
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Float, Date, DateTime, Text, ForeignKey, Table
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Float, Date, DateTime, Text, ForeignKey, Table, BigInteger, Identity, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -13,6 +13,7 @@ genre_film_work = Table(
     Column('genre_id', UUID(as_uuid=True), ForeignKey('content.genre.id'), nullable=False),
     Column('film_work_id', UUID(as_uuid=True), ForeignKey('content.film_work.id'), nullable=False),
     Column('created', DateTime, default=datetime.utcnow),
+    UniqueConstraint('film_work_id', 'genre_id', name='genre_film_work_film_genre_key'),
     schema='content'
 )
 
@@ -24,9 +25,38 @@ person_film_work = Table(
     Column('film_work_id', UUID(as_uuid=True), ForeignKey('content.film_work.id'), nullable=False),
     Column('role', Text, nullable=False),
     Column('created', DateTime, default=datetime.utcnow),
+    UniqueConstraint('film_work_id', 'person_id', 'role', name='person_film_work_film_person_role_key'),
     schema='content'
 )
 
+# Top-k similar films per film, written by the offline build in main_app.core.similarity
+film_similarity = Table(
+    'film_similarity',
+    Base.metadata,
+    Column('film_id', UUID(as_uuid=True), ForeignKey('content.film_work.id', ondelete='CASCADE'), primary_key=True),
+    Column('similar_film_id', UUID(as_uuid=True), ForeignKey('content.film_work.id', ondelete='CASCADE'),
+           primary_key=True),
+    Column('score', Float, nullable=False),
+    schema='content'
+)
+
+# Read models (materialized views managed by Alembic, never created from metadata)
+film_card = Table(
+    'film_card',
+    Base.metadata,
+    Column('id', UUID(as_uuid=True), primary_key=True),
+    Column('title', Text, nullable=False),
+    Column('rating', Float),
+    Column('type', Text, nullable=False),
+    Column('creation_date', Date),
+    Column('modified', DateTime),
+    Column('genre_ids', ARRAY(UUID(as_uuid=True)), nullable=False),
+    Column('genres', ARRAY(Text), nullable=False),
+    Column('top_cast', JSONB, nullable=False),
+    schema='content',
+    info={'is_view': True}
+)
+
 class FilmWork(Base):
     __tablename__ = 'film_work'
     __table_args__ = {'schema': 'content'}
@@ -38,7 +68,9 @@ class FilmWork(Base):
     rating = Column(Float)  # This corresponds to imdb_rating in the API
     type = Column(Text, nullable=False)
     created = Column(DateTime, default=datetime.utcnow)
-    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Stamped by the database clock (touch_modified trigger) on insert and update
+    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                      server_default=text("timezone('utc', now())"))
     
     # Relationships
     genres = relationship("Genre", secondary=genre_film_work, back_populates="films", lazy="selectin")
@@ -52,7 +84,9 @@ class Genre(Base):
     name = Column(Text, nullable=False)
     description = Column(Text)
     created = Column(DateTime, default=datetime.utcnow)
-    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Stamped by the database clock (touch_modified trigger) on insert and update
+    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                      server_default=text("timezone('utc', now())"))
     
     # Relationships
     films = relationship("FilmWork", secondary=genre_film_work, back_populates="genres", lazy="selectin")
@@ -64,7 +98,19 @@ class Person(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     full_name = Column(Text, nullable=False)
     created = Column(DateTime, default=datetime.utcnow)
-    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Stamped by the database clock (touch_modified trigger) on insert and update
+    modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow,
+                      server_default=text("timezone('utc', now())"))
     
     # Relationships
-    films = relationship("FilmWork", secondary=person_film_work, back_populates="persons", lazy="selectin") 
\ No newline at end of file
+    films = relationship("FilmWork", secondary=person_film_work, back_populates="persons", lazy="selectin") 
+
+class Tombstone(Base):
+    """Deleted film, person or genre, recorded by a delete trigger for the change feed"""
+    __tablename__ = 'tombstone'
+    __table_args__ = {'schema': 'content'}
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    entity_type = Column(Text, nullable=False)  # "film", "person" or "genre"
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=text("timezone('utc', now())"))
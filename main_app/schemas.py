@@ -1,5 +1,6 @@
 from pydantic import BaseModel, UUID4, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
+from uuid import UUID
 from datetime import date, datetime
 
 # Base schemas
@@ -21,6 +22,36 @@ class PersonBase(BaseModel):
 class FilmCreate(FilmBase):
     pass
 
+class FilmPersonLink(BaseModel):
+    person_id: UUID
+    role: Literal["actor", "writer", "director"]
+
+class FilmWithLinks(FilmBase):
+    """Film written together with its genre and person links; on replace the lists are the full new sets"""
+    genre_ids: List[UUID] = []
+    persons: List[FilmPersonLink] = []
+
+class GenreLink(BaseModel):
+    film_id: UUID
+    genre_id: UUID
+
+class PersonLink(FilmPersonLink):
+    film_id: UUID
+
+# Upper bound of links per bulk request, so one statement stays a manageable transaction
+MAX_LINKS_PER_REQUEST = 50000
+
+class GenreLinkBatch(BaseModel):
+    links: List[GenreLink] = Field(..., min_length=1, max_length=MAX_LINKS_PER_REQUEST)
+
+class PersonLinkBatch(BaseModel):
+    links: List[PersonLink] = Field(..., min_length=1, max_length=MAX_LINKS_PER_REQUEST)
+
+class LinkBatchResult(BaseModel):
+    requested: int
+    changed: int
+    films: int
+
 class GenreCreate(GenreBase):
     pass
 
@@ -64,6 +95,10 @@ class FilmResponse(FilmBase):
         from_attributes = True
         populate_by_name = True
 
+class FilmWithLinksResponse(FilmResponse):
+    genre_ids: List[UUID] = []
+    persons: List[FilmPersonLink] = []
+
 # Detailed response schemas
 class FilmDetailResponse(BaseModel):
     uuid: UUID4 = Field(alias="id")
@@ -2,4 +2,33 @@ import sys
 import os
 
 # Ensure project root is in sys.path for test imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture
+def assert_query_count():
+    """Assert the exact number of SQL statements executed inside the block.
+
+    Usage::
+
+        with assert_query_count(3):
+            response = await ac.get("/api/v1/films/<id>/")
+    """
+    from database import get_async_engine
+    from main_app.core.query_stats import capture_queries, instrument_engine
+
+    # Counting works whether or not query_stats_enabled instrumented the engine
+    instrument_engine(get_async_engine())
+
+    @contextmanager
+    def _assert_query_count(expected: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count == expected, (
+            f"expected {expected} statements, got {stats.count}: {dict(stats.shapes)}"
+        )
+
+    return _assert_query_count
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from starlette.responses import StreamingResponse
+
+from main_app.core.admission import AdmissionController, AdmissionRejected, classify_request, release_after_body
+
+EXPORT = ["/changes"]
+
+CLASSES = {
+    "reads": {"concurrency": 1, "queue": 5, "timeout": 1.0, "priority": 0},
+    "search": {"concurrency": 1, "queue": 1, "timeout": 0.05, "priority": 2},
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_queue_deadline_rejects_with_retry_after():
+    controller = AdmissionController(total=1, classes=CLASSES)
+    await controller.acquire("search")
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire("search")
+    assert exc_info.value.retry_after == 1
+    assert controller.stats()["search"] == {"active": 1, "waiting": 0, "rejected": 1}
+    controller.release("search")
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_freed_slot_goes_to_higher_priority_class():
+    controller = AdmissionController(total=1, classes={**CLASSES, "search": {**CLASSES["search"], "timeout": 1.0}})
+    await controller.acquire("reads")
+    order = []
+
+    async def run(route_class):
+        async with controller.admit(route_class):
+            order.append(route_class)
+
+    search = asyncio.ensure_future(run("search"))
+    await asyncio.sleep(0)
+    read = asyncio.ensure_future(run("reads"))
+    await asyncio.sleep(0)
+    controller.release("reads")
+    await asyncio.gather(search, read)
+    assert order == ["reads", "search"]
+
+
+@pytest.mark.unit
+def test_classify_request():
+    assert classify_request("GET", "/api/v1/films/search/", "/api/v1", EXPORT) == "search"
+    assert classify_request("GET", "/api/v1/films/abc/", "/api/v1", EXPORT) == "reads"
+    assert classify_request("DELETE", "/api/v1/films/abc/", "/api/v1", EXPORT) == "writes"
+    assert classify_request("GET", "/health", "/api/v1", EXPORT) is None
+    assert classify_request("GET", "/api/v1/changes/", "/api/v1", EXPORT) == "export"
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_slot_is_held_until_the_body_is_sent():
+    controller = AdmissionController(total=1, classes=CLASSES)
+    await controller.acquire("reads")
+
+    async def body():
+        yield b"first"
+        yield b"second"
+
+    response = release_after_body(StreamingResponse(body()), lambda: controller.release("reads"))
+    chunks = response.body_iterator
+    assert await chunks.__anext__() == b"first"
+    assert controller.stats()["reads"]["active"] == 1
+    assert [chunk async for chunk in chunks] == [b"second"]
+    assert controller.stats()["reads"]["active"] == 0
+    # The background fallback does not release a second time
+    await response.background()
+    assert controller.stats()["reads"]["active"] == 0
@@ -0,0 +1,132 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from httpx import AsyncClient
+from main import app
+from main_app.core.pagination import InvalidCursorError, decode_cursor
+from main_app.core.services import ChangeService
+
+FILM_ID = "550e8400-e29b-41d4-a716-446655440000"
+PERSON_ID = "550e8400-e29b-41d4-a716-446655440001"
+
+
+class MockChangeService:
+    async def get_changes(self, since=None, limit=500):
+        if since == "bad":
+            raise InvalidCursorError("Malformed cursor: bad")
+        changes = [{"type": "film", "id": FILM_ID, "operation": "upsert", "modified": "2026-01-01T00:00:00"}]
+        return {"changes": changes[:limit], "next": "token", "has_more": False}
+
+
+class FakeChangeRepository:
+    def __init__(self, rows):
+        self.rows = rows
+        self.positions = None
+
+    async def get_changes(self, positions, limit, settle_seconds=0.0):
+        self.positions = positions
+        return self.rows
+
+
+def row(source, entity_id, at, seq=None, entity_type=None):
+    return SimpleNamespace(source=source, entity_type=entity_type or source, entity_id=entity_id,
+                           at=datetime.fromisoformat(at), seq=seq)
+
+
+@pytest.fixture(autouse=True)
+def override_changes_dependency():
+    from main_app.core.dependencies import get_change_service
+    app.dependency_overrides[get_change_service] = lambda: MockChangeService()
+    yield
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_changes_feed():
+    async with AsyncClient(app=app, base_url="http://test", follow_redirects=True) as ac:
+        response = await ac.get("/api/v1/changes?limit=10")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changes"][0]["id"] == FILM_ID
+    assert body["next"] == "token"
+
+
+@pytest.mark.asyncio
+async def test_changes_invalid_token():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/changes/?since=bad")
+    assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_change_service_merges_sources_and_advances_positions():
+    import uuid
+    service = ChangeService(session=None)
+    service.repository = FakeChangeRepository([
+        row("person", uuid.UUID(PERSON_ID), "2026-01-01T00:00:02"),
+        row("film", uuid.UUID(FILM_ID), "2026-01-01T00:00:01"),
+        row("deleted", uuid.UUID(FILM_ID), "2026-01-01T00:00:03", seq=7, entity_type="film"),
+    ])
+
+    feed = await service.get_changes(limit=2)
+
+    assert [change["operation"] for change in feed["changes"]] == ["upsert", "upsert"]
+    assert [change["type"] for change in feed["changes"]] == ["film", "person"]
+    assert feed["has_more"] is True
+    # The tombstone was not emitted, so its source stays at the beginning
+    values = decode_cursor(feed["next"], 8)
+    assert values[0:2] == ["2026-01-01 00:00:01", FILM_ID]
+    assert values[6:8] == [None, None]
+
+    service.repository = FakeChangeRepository([])
+    await service.get_changes(since=feed["next"])
+    assert service.repository.positions["person"][1] == uuid.UUID(PERSON_ID)
+    assert service.repository.positions["deleted"] is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_change_service_rejects_malformed_positions():
+    from main_app.core.pagination import encode_cursor
+    service = ChangeService(session=None)
+    with pytest.raises(InvalidCursorError):
+        await service.get_changes(since=encode_cursor("not a date", FILM_ID, None, None, None, None, None, None))
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_raw_sql_insert_appears_in_the_feed():
+    # Needs a database migrated with alembic upgrade head
+    import uuid
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    from database import AsyncSessionLocal, dispose_engines
+    from main_app.core.repositories import ChangeRepository
+
+    film_id = uuid.uuid4()
+    try:
+        async with AsyncSessionLocal() as session:
+            if (await session.execute(text("SELECT to_regclass('content.tombstone')"))).scalar() is None:
+                pytest.skip("database schema missing, run alembic upgrade head")
+            before = (await session.execute(text("SELECT timezone('utc', now())"))).scalar()
+            # A bulk load style insert that leaves modified to the database
+            await session.execute(text(
+                "INSERT INTO content.film_work (id, title, type) VALUES (:id, 'Raw insert', 'movie')"
+            ), {"id": film_id})
+            await session.commit()
+    except (OSError, DBAPIError) as e:
+        await dispose_engines()
+        pytest.skip(f"database unavailable: {e}")
+
+    try:
+        async with AsyncSessionLocal() as session:
+            positions = {"film": [before, uuid.UUID(int=0)]}
+            # A negative settle window lets the just committed row through
+            rows = await ChangeRepository(session).get_changes(positions, limit=1000, settle_seconds=-60)
+        assert film_id in [row.entity_id for row in rows if row.source == "film"]
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("DELETE FROM content.film_work WHERE id = :id"), {"id": film_id})
+            await session.commit()
+        await dispose_engines()
@@ -0,0 +1,120 @@
+import datetime
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from main import app
+from main_app.core.columnar import ColumnarFilmIndex, FilmColumns
+from main_app.core.config import config_provider
+from main_app.core.services import FilmService
+
+DRAMA = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+COMEDY = uuid.UUID("00000000-0000-0000-0000-0000000000bb")
+
+
+def film_id(n):
+    return uuid.UUID(int=n)
+
+
+# n: (title, rating, creation_date, type, genres)
+FILMS = {
+    1: ("Alien", 8.5, datetime.date(1979, 5, 25), "movie", {DRAMA}),
+    2: ("Brazil", 7.9, None, "movie", {COMEDY}),
+    3: ("Cosmos", 9.3, datetime.date(1980, 9, 28), "tv_show", {DRAMA}),
+    4: ("Dune", None, datetime.date(1984, 12, 14), "movie", {DRAMA, COMEDY}),
+    5: ("Eraserhead", 7.9, datetime.date(1977, 3, 19), "movie", set()),
+}
+
+
+def build(films=FILMS):
+    # Title ranks as Postgres returns them for ORDER BY title, id
+    ranked = sorted(films, key=lambda n: (films[n][0], n))
+    rows = [(film_id(n).bytes, title, rating, date, kind, ranked.index(n) + 1)
+            for n, (title, rating, date, kind, _) in films.items()]
+    links = [(film_id(n).bytes, genre) for n, film in films.items() for genre in film[4]]
+    return FilmColumns.build(rows, links)
+
+
+def ids(page):
+    return [film.id.int for film in page]
+
+
+@pytest.mark.unit
+def test_sorts_match_sql_order_both_ways():
+    columns = build()
+    # ASC puts NULL last and DESC puts it first; ties break on id in the same direction
+    assert ids(columns.page("rating", 0, 10)) == [2, 5, 1, 3, 4]
+    assert ids(columns.page("-rating", 0, 10)) == [4, 3, 1, 5, 2]
+    assert ids(columns.page("creation_date", 0, 10)) == [5, 1, 3, 4, 2]
+    assert ids(columns.page("-title", 1, 2)) == [4, 3]
+    assert columns.page("modified", 0, 10) is None
+
+
+@pytest.mark.unit
+def test_genre_and_type_filters():
+    columns = build()
+    assert ids(columns.page("-rating", 0, 10, genre_id=DRAMA)) == [4, 3, 1]
+    assert ids(columns.page("-rating", 1, 10, genre_id=DRAMA, film_type="movie")) == [1]
+    assert ids(columns.page("title", 0, 10, film_type="tv_show")) == [3]
+    assert columns.page("title", 0, 10, genre_id=uuid.uuid4()) == []
+    assert columns.page("title", 0, 10, film_type="cartoon") == []
+
+
+@pytest.mark.unit
+def test_deltas_keep_orders_and_bitsets():
+    columns = build()
+    columns.upsert(film_id(6), "Fargo", 8.1, datetime.date(1996, 3, 8), "movie", {COMEDY})
+    columns.upsert(film_id(1), "Alien", 6.0, datetime.date(1979, 5, 25), "movie", {COMEDY})
+    columns.remove(film_id(3))
+    assert ids(columns.page("-rating", 0, 10)) == [4, 6, 5, 2, 1]
+    assert ids(columns.page("-rating", 0, 10, genre_id=COMEDY)) == [4, 6, 2, 1]
+    assert ids(columns.page("-rating", 0, 10, genre_id=DRAMA)) == [4]
+    # A new title has no collation rank until the next rebuild
+    assert columns.title_stale
+    assert columns.page("title", 0, 10) is None
+
+
+@pytest.mark.unit
+def test_compare_with_database_state():
+    columns = build()
+    assert build().compare(columns)["consistent"]
+
+    films = dict(FILMS)
+    films[2] = ("Brazil", 8.0, None, "movie", {COMEDY, DRAMA})
+    films[7] = ("Gattaca", 7.8, None, "movie", set())
+    report = columns.compare(build(films))
+    assert report["missing"] == 1 and report["changed"] == 1
+    assert report["misordered"] == ["rating", "creation_date", "title"]
+    assert not report["consistent"]
+    # Films written while the database was read are left out
+    assert columns.compare(build(films), {film_id(2), film_id(7)})["consistent"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_film_service_serves_list_pages_from_columns():
+    index = ColumnarFilmIndex(session_factory=None)
+    index._columns = build()
+    service = FilmService(session=None, film_columns=index)
+    films = await service.get_films(skip=0, limit=2, sort_by="-creation_date", film_type="movie")
+    assert [film.title for film in films] == ["Brazil", "Dune"]
+    assert index.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_consistency_endpoint_disabled(monkeypatch):
+    monkeypatch.setattr(config_provider.settings, "admin_token", "secret")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/admin/film-columns/consistency/", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_consistency_endpoint_requires_admin_token(monkeypatch):
+    monkeypatch.setattr(config_provider.settings, "admin_token", "secret")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/admin/film-columns/consistency/")
+    assert response.status_code == 401
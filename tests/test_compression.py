@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from main_app.core.compression import CompressionMiddleware, negotiate_encoding
+
+ITEMS = [{"uuid": str(index), "title": f"Film {index}", "imdb_rating": 7.5} for index in range(200)]
+
+
+async def large(request):
+    return JSONResponse(ITEMS)
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def stream(request):
+    async def lines():
+        for item in ITEMS:
+            yield json.dumps(item).encode() + b"\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def make_app(**options):
+    app = Starlette(routes=[Route("/large", large), Route("/small", small), Route("/stream", stream)])
+    return CompressionMiddleware(app, **options)
+
+
+@pytest.mark.unit
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("gzip;q=0, *;q=0.1", ("gzip",)) is None
+    assert negotiate_encoding("identity", ("br", "gzip")) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_gzip_above_threshold_only():
+    async with AsyncClient(app=make_app(brotli_enabled=False), base_url="http://test") as ac:
+        compressed = await ac.get("/large", headers={"Accept-Encoding": "gzip"})
+        plain = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(json.dumps(ITEMS))
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.json() == ITEMS
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == {"ok": True}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_streaming_response_compressed_chunk_by_chunk():
+    chunks = []
+
+    async def inner(scope, receive, send):
+        await make_app(brotli_enabled=False).app(scope, receive, send)
+
+    middleware = CompressionMiddleware(inner, brotli_enabled=False)
+
+    received = []
+
+    async def receive():
+        if received:
+            await asyncio.Event().wait()  # the client never disconnects
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        chunks.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+             "headers": [(b"accept-encoding", b"gzip")], "scheme": "http", "server": ("test", 80), "root_path": ""}
+    await middleware(scope, receive, send)
+
+    start, bodies = chunks[0], chunks[1:]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert len(bodies) > 2 and all(body["body"] for body in bodies[:-1])
+    lines = gzip.decompress(b"".join(body["body"] for body in bodies)).splitlines()
+    assert [json.loads(line) for line in lines] == ITEMS
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_brotli_preferred_when_available():
+    pytest.importorskip("brotli")
+    async with AsyncClient(app=make_app(), base_url="http://test") as ac:
+        response = await ac.get("/large", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == ITEMS  # httpx decodes br when brotli is installed
@@ -0,0 +1,21 @@
+import pytest
+
+import database
+
+
+@pytest.mark.unit
+def test_engines_are_created_lazily():
+    # Nothing in the API touches the sync engine, so importing the app must not build it
+    assert database._sync_engine is None
+    assert database.get_async_engine() is database.async_engine
+    assert database._sync_engine is None
+
+
+@pytest.mark.unit
+def test_pool_limits_split_connection_budget_across_workers():
+    from main_app.core.config import ConfigProvider, Settings
+    single = ConfigProvider(Settings(web_workers=1)).get_pool_limits()
+    assert single == {"pool_size": 5, "max_overflow": 10}
+    eight = ConfigProvider(Settings(web_workers=8, db_max_connections=100, db_reserved_connections=10)).get_pool_limits()
+    assert eight["pool_size"] + eight["max_overflow"] == 11
+    assert 8 * (eight["pool_size"] + eight["max_overflow"]) <= 90
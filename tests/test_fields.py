@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+
+from main_app.core.fields import FILM_DETAIL_FIELDS, InvalidFieldsError, columns_for, parse_fields
+from main_app.core.services import FilmService
+
+
+@pytest.mark.unit
+def test_parse_fields_validates_and_orders():
+    assert parse_fields("title,uuid,title", FILM_DETAIL_FIELDS) == ("uuid", "title")
+    assert parse_fields(None, FILM_DETAIL_FIELDS) is None
+    with pytest.raises(InvalidFieldsError):
+        parse_fields("uuid,password", FILM_DETAIL_FIELDS)
+
+
+@pytest.mark.unit
+def test_columns_for_maps_public_names_and_skips_relationships():
+    assert columns_for(("imdb_rating", "genre", "description")) == ("id", "rating", "description")
+
+
+class RecordingFilmRepository:
+    def __init__(self):
+        self.calls = []
+
+    async def get_columns(self, film_id, columns):
+        self.calls.append(("get_columns", columns))
+        return type("Row", (), {"id": film_id, "title": "Heat"})()
+
+    async def get_genres(self, film_id):
+        self.calls.append(("get_genres",))
+        return []
+
+    async def get_persons_by_role(self, film_id, role):
+        self.calls.append(("get_persons_by_role", role))
+        return []
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_film_detail_skips_relationships_not_requested():
+    service = FilmService(session=None)
+    service.repository = RecordingFilmRepository()
+    film_id = uuid.uuid4()
+    detail = await service.get_film_detail(film_id, fields=("uuid", "title"))
+    assert detail == {"uuid": str(film_id), "title": "Heat"}
+    assert service.repository.calls == [("get_columns", ("id", "title"))]
+
+
+class RowsSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = 0
+
+    async def execute(self, statement):
+        self.statements += 1
+        rows = self.rows
+        return type("Result", (), {"all": lambda self: rows})()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_expansions_use_one_statement_per_page():
+    from main_app.core.repositories import FilmRepository
+    first, second = uuid.uuid4(), uuid.uuid4()
+    session = RowsSession([
+        (first, "genres", [{"uuid": "g", "name": "Drama"}]),
+        (first, "director", [{"uuid": "p", "full_name": "Michael Mann"}]),
+    ])
+    expansions = await FilmRepository(session).get_expansions([first, second], ("genres", "persons"))
+    assert session.statements == 1
+    assert expansions[first]["genres"][0]["name"] == "Drama"
+    assert expansions[first]["persons"]["directors"][0]["full_name"] == "Michael Mann"
+    assert expansions[second] == {"genres": [], "persons": {"actors": [], "writers": [], "directors": []}}
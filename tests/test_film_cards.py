@@ -0,0 +1,129 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from main_app.core.read_models import FilmCardRefresher
+from main_app.core.repositories import FilmRepository
+from main_app.core.services import FilmService
+
+DRAMA = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+
+
+class CardSession:
+    """Compiles statements for Postgres and returns canned rows"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(all=lambda: self.rows, scalars=lambda: SimpleNamespace(all=lambda: self.rows))
+
+
+class RefreshSession:
+    def __init__(self, log, view_exists):
+        self.log = log
+        self.view_exists = view_exists
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        self.log.append(str(statement))
+        return SimpleNamespace(scalar=lambda: "content.film_card" if self.view_exists else None)
+
+    async def commit(self):
+        pass
+
+
+def refresher(log, view_exists=True, interval=600, debounce=0.05):
+    return FilmCardRefresher(lambda: RefreshSession(log, view_exists), interval=interval, debounce=debounce)
+
+
+def refreshes(log):
+    return sum(statement.startswith("REFRESH MATERIALIZED VIEW CONCURRENTLY") for statement in log)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_get_cards_reads_the_read_model_only():
+    session = CardSession()
+    await FilmRepository(session).get_cards(skip=10, limit=5, genre_id=DRAMA, film_type="movie")
+    statement = session.statements[0]
+    assert "FROM content.film_card" in statement
+    assert "film_work" not in statement
+    assert "content.film_card.genre_ids @>" in statement
+    assert "content.film_card.type =" in statement
+    assert "ORDER BY content.film_card.rating DESC, content.film_card.id DESC" in statement
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_search_cards_selects_requested_columns():
+    session = CardSession()
+    await FilmRepository(session).search_cards("heat", limit=5, columns=("id", "title"))
+    statement = session.statements[0]
+    assert statement.startswith("SELECT content.film_card.id, content.film_card.title \nFROM content.film_card")
+    assert "content.film_card.title ILIKE" in statement
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_film_service_lists_from_cards_when_enabled():
+    card = SimpleNamespace(id=DRAMA, title="Heat", rating=8.3)
+    session = CardSession([card])
+    films = await FilmService(session, use_film_cards=True).get_films(limit=1)
+    assert films == [card]
+    # Card items carry the genre names and top cast of the read model
+    assert session.statements[0].startswith(
+        "SELECT content.film_card.id, content.film_card.title, content.film_card.rating, "
+        "content.film_card.genres, content.film_card.top_cast \nFROM content.film_card"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_refresher_coalesces_a_burst_of_writes():
+    log = []
+    cards = refresher(log)
+    await cards.start()
+    try:
+        for _ in range(5):
+            await cards.entity_changed("film", DRAMA, "update")
+        await asyncio.sleep(0.02)
+        assert refreshes(log) == 0
+        await asyncio.sleep(0.1)
+        assert refreshes(log) == 1
+        assert cards.last_refreshed is not None
+    finally:
+        await cards.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_refresher_refreshes_periodically_without_writes():
+    log = []
+    cards = refresher(log, interval=0.02)
+    await cards.start()
+    await asyncio.sleep(0.07)
+    await cards.stop()
+    assert refreshes(log) >= 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_refresher_stays_idle_without_the_view():
+    log = []
+    cards = refresher(log, view_exists=False)
+    await cards.start()
+    await cards.invalidate_all()
+    await asyncio.sleep(0.07)
+    assert not cards.available
+    assert refreshes(log) == 0
@@ -0,0 +1,173 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from main_app import schemas
+from main_app.core.repositories import InvalidLinkError
+from main_app.core.services import FilmService
+
+GENRE = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+ACTOR = uuid.UUID("00000000-0000-0000-0000-0000000000bb")
+
+
+class FakeSession:
+    """Records statements and transaction calls instead of talking to Postgres"""
+
+    def __init__(self, row=None, error=None):
+        self.row = row
+        self.error = error
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(one_or_none=lambda: self.row, one=lambda: self.row)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class Recorder:
+    def __init__(self):
+        self.changes = []
+        self.flushes = 0
+
+    async def entity_changed(self, entity_type, entity_id, operation):
+        self.changes.append((entity_type, entity_id, operation))
+
+    async def invalidate_all(self):
+        self.flushes += 1
+
+
+def film_row(film_id, changed_person_ids=()):
+    values = {"id": film_id, "title": "Heat", "description": None, "creation_date": None, "rating": 8.3,
+              "type": "movie", "changed_person_ids": list(changed_person_ids)}
+    return SimpleNamespace(_mapping=values, **values)
+
+
+def integrity_error(sqlstate, constraint_name):
+    """IntegrityError shaped like the asyncpg adapter's: SQLSTATE on the error, constraint on its cause"""
+    orig = Exception("integrity violation")
+    orig.sqlstate = sqlstate
+    orig.__cause__ = Exception("driver error")
+    orig.__cause__.constraint_name = constraint_name
+    return IntegrityError("INSERT", {}, orig)
+
+
+def payload():
+    return schemas.FilmWithLinks(
+        title="Heat", rating=8.3, type="movie", genre_ids=[GENRE, GENRE],
+        persons=[{"person_id": ACTOR, "role": "actor"}, {"person_id": ACTOR, "role": "director"}]
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_with_links_is_one_statement_and_one_commit():
+    film_id = uuid.uuid4()
+    session, recorder = FakeSession(film_row(film_id, [ACTOR])), Recorder()
+    service = FilmService(session=session, listeners=[recorder])
+    film = await service.save_film_with_links(payload())
+
+    assert len(session.statements) == 1 and session.commits == 1
+    statement, params = session.statements[0]
+    assert "INSERT INTO content.film_work" in statement and "stale_genre_links" not in statement
+    # Duplicates are dropped; the same person may hold several roles
+    assert params["genre_ids"] == [GENRE]
+    assert params["roles"] == ["actor", "director"]
+    assert film["genre_ids"] == [GENRE] and len(film["persons"]) == 2
+    assert "changed_person_ids" not in film
+    assert recorder.changes == [("FilmWork", film_id, "create"), ("Person", ACTOR, "update")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_replace_with_links_diffs_existing_links():
+    film_id = uuid.uuid4()
+    session, recorder = FakeSession(film_row(film_id)), Recorder()
+    service = FilmService(session=session, listeners=[recorder])
+    await service.save_film_with_links(payload(), film_id=film_id)
+
+    statement, params = session.statements[0]
+    assert "UPDATE content.film_work" in statement and "stale_person_links" in statement
+    assert params["film_id"] == film_id
+    # Persons whose links were linked or unlinked come back from the statement
+    assert "RETURNING existing.person_id" in statement
+    assert recorder.changes == [("FilmWork", film_id, "update")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_replace_missing_film_and_unknown_links():
+    service = FilmService(session=FakeSession(row=None))
+    assert await service.save_film_with_links(payload(), film_id=uuid.uuid4()) is None
+
+    session = FakeSession(error=integrity_error("23503", "person_film_work_person_id_fkey"))
+    with pytest.raises(InvalidLinkError, match="Unknown person id"):
+        await FilmService(session=session).save_film_with_links(payload())
+    assert session.rollbacks == 1 and session.commits == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_other_integrity_errors_are_not_reported_as_unknown_links():
+    for error in (integrity_error("23505", "film_work_pkey"), integrity_error("23503", "film_similarity_film_id_fkey"),
+                  IntegrityError("INSERT", {}, Exception("violates not-null constraint"))):
+        session = FakeSession(error=error)
+        with pytest.raises(IntegrityError):
+            await FilmService(session=session).save_film_with_links(payload())
+        assert session.rollbacks == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_attach_links_is_one_set_based_statement():
+    films = [uuid.uuid4(), uuid.uuid4()]
+    session, recorder = FakeSession(SimpleNamespace(changed=2, films=films)), Recorder()
+    service = FilmService(session=session, listeners=[recorder])
+    links = [(films[0], GENRE), (films[1], GENRE), (films[0], GENRE)]
+    result = await service.change_links("genres", "attach", links)
+
+    assert result == {"requested": 2, "changed": 2, "films": 2}
+    assert len(session.statements) == 1 and session.commits == 1
+    statement, params = session.statements[0]
+    assert "unnest" in statement and "ON CONFLICT (film_work_id, genre_id) DO NOTHING" in statement
+    assert params["film_ids"] == films and params["genre_ids"] == [GENRE, GENRE]
+    assert recorder.changes == [("FilmWork", film, "update") for film in films]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_detach_links_flushes_listeners_for_large_batches():
+    films = [uuid.uuid4() for _ in range(FilmService.BULK_NOTIFY_LIMIT + 1)]
+    session, recorder = FakeSession(SimpleNamespace(changed=len(films), films=films)), Recorder()
+    service = FilmService(session=session, listeners=[recorder])
+    await service.change_links("persons", "detach", [(film, ACTOR, "actor") for film in films])
+
+    statement, params = session.statements[0]
+    assert "DELETE FROM content.person_film_work" in statement and params["roles"] == ["actor"] * len(films)
+    assert recorder.changes == [("Person", ACTOR, "update")] and recorder.flushes == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_link_writes_map_foreign_key_violations_only():
+    links = [(uuid.uuid4(), GENRE)]
+    session = FakeSession(error=integrity_error("23503", "genre_film_work_film_work_id_fkey"))
+    with pytest.raises(InvalidLinkError, match="Unknown film id"):
+        await FilmService(session=session).change_links("genres", "attach", links)
+
+    session = FakeSession(error=integrity_error("23505", "genre_film_work_film_work_id_genre_id_key"))
+    with pytest.raises(IntegrityError):
+        await FilmService(session=session).change_links("genres", "attach", links)
+
+    with pytest.raises(ValueError):
+        await FilmService(session=FakeSession()).change_links("genres", "count", links)
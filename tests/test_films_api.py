@@ -2,10 +2,15 @@ import pytest
 from httpx import AsyncClient
 from main import app
 from unittest.mock import AsyncMock
+from main_app.core.fields import FILM_CARD_FIELDS, FILM_FIELDS
+from main_app.core.repositories import InvalidLinkError
 
 VALID_UUID = "550e8400-e29b-41d4-a716-446655440000"  # valid v4 UUID
+MISSING_UUID = "6f1c2d3e-4b5a-4c6d-8e7f-901234567890"
 
 class MockFilmService:
+    list_fields = FILM_FIELDS
+
     async def get_films(self, *args, **kwargs):
         return [type("Film", (), {"id": VALID_UUID, "title": "Test Film", "rating": 8.5, "type": "movie", "description": "desc", "creation_date": "2023-01-01"})()]
     async def search_films(self, *args, **kwargs):
@@ -20,6 +25,19 @@ class MockFilmService:
         return str(film_id) == VALID_UUID
     async def delete(self, film_id):
         return await self.delete_film(film_id)
+    async def save_film_with_links(self, film, film_id=None):
+        if film_id is not None and str(film_id) != VALID_UUID:
+            return None
+        if any(str(genre_id) == MISSING_UUID for genre_id in film.genre_ids):
+            raise InvalidLinkError("Unknown genre or person id")
+        return {**film.model_dump(exclude={"persons"}), "id": VALID_UUID,
+                "persons": [link.model_dump() for link in film.persons]}
+    async def get_similar_films(self, film_id, limit=10):
+        if str(film_id) != VALID_UUID:
+            return None
+        return [{"uuid": VALID_UUID, "title": "Similar Film", "imdb_rating": 7.5, "score": 0.42}][:limit]
+    async def get_film_facets(self, facets, genre_id=None, query=None):
+        return {facet: [{"value": "movie", "count": 1}] for facet in facets}
 
 @pytest.fixture(autouse=True)
 def override_films_dependency():
@@ -75,4 +93,129 @@ async def test_films_delete():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.delete(f"/api/v1/films/{VALID_UUID}/")
     assert response.status_code == 200
-    assert response.json()["message"] == "Film deleted successfully" 
\ No newline at end of file
+    assert response.json()["message"] == "Film deleted successfully" 
+
+@pytest.mark.asyncio
+@pytest.mark.api
+@pytest.mark.unit
+async def test_films_search_with_facets():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/films/search/?query=test&facets=type,decade")
+        unknown = await ac.get("/api/v1/films/?facets=budget")
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Test Film"
+    assert set(response.json()["facets"]) == {"type", "decade"}
+    assert unknown.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_films_list_sparse_fields():
+    captured = {}
+
+    class NarrowFilmService(MockFilmService):
+        async def get_films(self, *args, **kwargs):
+            captured.update(kwargs)
+            return [type("Film", (), {"id": VALID_UUID, "title": "Test Film"})()]
+
+    from main_app.core.dependencies import get_film_service
+    app.dependency_overrides[get_film_service] = lambda: NarrowFilmService()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/films/?fields=title,uuid")
+        invalid = await ac.get("/api/v1/films/?fields=uuid,description")
+    assert response.status_code == 200
+    assert response.json() == [{"uuid": VALID_UUID, "title": "Test Film"}]
+    assert captured["columns"] == ("id", "title")
+    assert invalid.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_films_list_card_fields():
+    card = {"id": VALID_UUID, "title": "Heat", "rating": 8.3, "genres": ["Crime", "Drama"],
+            "top_cast": [{"uuid": VALID_UUID, "full_name": "Al Pacino"}]}
+
+    class CardFilmService(MockFilmService):
+        list_fields = FILM_CARD_FIELDS
+
+        async def get_films(self, *args, **kwargs):
+            return [type("FilmCard", (), card)()]
+
+    from main_app.core.dependencies import get_film_service
+    app.dependency_overrides[get_film_service] = lambda: CardFilmService()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/films/")
+    app.dependency_overrides[get_film_service] = lambda: MockFilmService()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        without_cards = await ac.get("/api/v1/films/?fields=uuid,genre_names")
+    assert response.json() == [{"uuid": VALID_UUID, "title": "Heat", "imdb_rating": 8.3,
+                                "genre_names": ["Crime", "Drama"], "top_cast": card["top_cast"]}]
+    assert without_cards.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.api
+@pytest.mark.unit
+async def test_films_composite_create_and_replace():
+    payload = {"title": "Heat", "type": "movie", "genre_ids": [VALID_UUID],
+               "persons": [{"person_id": VALID_UUID, "role": "director"}]}
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        created = await ac.post("/api/v1/films/composite/", json=payload)
+        replaced = await ac.put(f"/api/v1/films/{VALID_UUID}/composite/", json=payload)
+        missing = await ac.put(f"/api/v1/films/{MISSING_UUID}/composite/", json=payload)
+        unknown = await ac.post("/api/v1/films/composite/", json={**payload, "genre_ids": [MISSING_UUID]})
+        bad_role = await ac.post("/api/v1/films/composite/", json={**payload, "persons": [
+            {"person_id": VALID_UUID, "role": "producer"}]})
+    assert created.status_code == 200
+    assert created.json()["persons"] == [{"person_id": VALID_UUID, "role": "director"}]
+    assert created.json()["genre_ids"] == [VALID_UUID]
+    assert replaced.status_code == 200
+    assert missing.status_code == 404
+    assert unknown.status_code == 400
+    assert bad_role.status_code == 422
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_films_list_type_filter():
+    captured = {}
+
+    class TypedFilmService(MockFilmService):
+        async def get_films(self, *args, **kwargs):
+            captured.update(kwargs)
+            return await super().get_films(*args, **kwargs)
+
+    from main_app.core.dependencies import get_film_service
+    app.dependency_overrides[get_film_service] = lambda: TypedFilmService()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/films/?type=movie&sort=title")
+    assert response.status_code == 200
+    assert captured["film_type"] == "movie"
+    assert captured["sort_by"] == "title"
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_films_list_expand():
+    requested = []
+
+    class ExpandingFilmService(MockFilmService):
+        async def get_film_expansions(self, film_ids, expand):
+            requested.append((list(film_ids), expand))
+            return {VALID_UUID: {"genres": [{"uuid": VALID_UUID, "name": "Drama"}]}}
+
+    from main_app.core.dependencies import get_film_service
+    app.dependency_overrides[get_film_service] = lambda: ExpandingFilmService()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/films/?expand=genres")
+        invalid = await ac.get("/api/v1/films/?expand=reviews")
+    assert response.status_code == 200
+    assert response.json()[0]["genres"][0]["name"] == "Drama"
+    assert requested == [([VALID_UUID], ("genres",))]
+    assert invalid.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.api
+@pytest.mark.unit
+async def test_films_similar():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/films/{VALID_UUID}/similar/?limit=5")
+        missing = await ac.get("/api/v1/films/00000000-0000-0000-0000-000000000000/similar/")
+    assert response.status_code == 200
+    assert response.json()[0]["score"] == 0.42
+    assert missing.status_code == 404
@@ -2,6 +2,7 @@ import pytest
 from httpx import AsyncClient
 from main import app
 from unittest.mock import AsyncMock
+import uuid
 
 VALID_UUID = "550e8400-e29b-41d4-a716-446655440000"
 
@@ -52,4 +53,32 @@ async def test_genres_delete():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.delete(f"/api/v1/genres/{VALID_UUID}/")
     assert response.status_code == 200
-    assert response.json()["message"] == "Genre deleted successfully" 
\ No newline at end of file
+    assert response.json()["message"] == "Genre deleted successfully" 
+
+@pytest.mark.asyncio
+async def test_genres_served_from_catalog():
+    from main_app.core.catalog import GenreCatalog, GenreSnapshot
+    from main_app.core.dependencies import get_genre_catalog
+    catalog = GenreCatalog()
+    catalog._snapshot = GenreSnapshot([type("Genre", (), {"id": uuid.UUID(VALID_UUID), "name": "Cached Genre", "description": None})()])
+    app.dependency_overrides[get_genre_catalog] = lambda: catalog
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        listed = await ac.get("/api/v1/genres/")
+        detail = await ac.get(f"/api/v1/genres/{VALID_UUID}/")
+        missing = await ac.get("/api/v1/genres/6ba7b810-9dad-41d1-80b4-00c04fd430c8/")
+    assert listed.json()[0]["name"] == "Cached Genre"
+    assert detail.json()["id"] == VALID_UUID
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_genres_catalog_sparse_fields():
+    from main_app.core.catalog import GenreCatalog, GenreSnapshot
+    from main_app.core.dependencies import get_genre_catalog
+    catalog = GenreCatalog()
+    catalog._snapshot = GenreSnapshot([type("Genre", (), {"id": uuid.UUID(VALID_UUID), "name": "Cached Genre", "description": "Long text"})()])
+    app.dependency_overrides[get_genre_catalog] = lambda: catalog
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        listed = await ac.get("/api/v1/genres/?fields=id,name")
+        detail = await ac.get(f"/api/v1/genres/{VALID_UUID}/?fields=name")
+    assert listed.json() == [{"id": VALID_UUID, "name": "Cached Genre"}]
+    assert detail.json() == {"name": "Cached Genre"}
@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from main_app.core.graph import GraphSnapshot
+
+
+def person(n):
+    return uuid.UUID(int=n)
+
+
+def film(n):
+    return uuid.UUID(int=1000 + n)
+
+
+def graph(credits):
+    return GraphSnapshot.build([person(p).bytes for p, _ in credits], [film(f).bytes for _, f in credits])
+
+
+# 1-2 share films 0 and 4, 2-3 share film 1, 3-4 share film 2, 5-6 only know each other
+CREDITS = [(1, 0), (2, 0), (2, 1), (3, 1), (3, 2), (4, 2), (5, 3), (6, 3), (1, 4), (2, 4), (1, 0)]
+
+
+@pytest.mark.unit
+def test_collaborators_ranked_by_shared_films():
+    snapshot = graph(CREDITS)
+    assert snapshot.edges == 10  # the duplicate credit is one edge
+    assert snapshot.collaborators(person(2)) == [(person(1), 2), (person(3), 1)]
+    assert snapshot.collaborators(uuid.uuid4()) == []
+
+
+@pytest.mark.unit
+def test_path_is_shortest_chain_of_shared_films():
+    snapshot = graph(CREDITS)
+    persons, films = snapshot.path(person(1), person(4))
+    assert persons == [person(1), person(2), person(3), person(4)]
+    assert films[1:] == [film(1), film(2)] and films[0] in (film(0), film(4))
+    assert snapshot.path(person(4), person(1))[0] == persons[::-1]
+    assert snapshot.path(person(1), person(1)) == ([person(1)], [])
+
+
+@pytest.mark.unit
+def test_path_respects_max_degrees_and_components():
+    snapshot = graph(CREDITS)
+    assert snapshot.path(person(1), person(4), max_degrees=2) is None
+    assert snapshot.path(person(1), person(5)) is None
+
+
+@pytest.mark.unit
+def test_ids_with_trailing_zero_bytes_round_trip():
+    zero_tail = uuid.UUID(bytes=b"\x01" + b"\x00" * 15)
+    snapshot = GraphSnapshot.build([zero_tail.bytes, person(2).bytes], [film(0).bytes, film(0).bytes])
+    assert snapshot.collaborators(person(2)) == [(zero_tail, 1)]
@@ -0,0 +1,134 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from main_app.core.leaderboards import FilmRow, GenreLeaderboards
+from main_app.core.services import FilmService
+
+GENRE = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+
+
+def film_id(n):
+    return uuid.UUID(int=n)
+
+
+def leaderboards(ratings, depth=3):
+    boards = GenreLeaderboards(session_factory=None, depth=depth)
+    # Rows as returned by the windowed query: at most depth + 1 per genre
+    rows = sorted(((GENRE, film_id(n), f"Film {n}", rating) for n, rating in ratings.items()),
+                  key=lambda row: (row[3] is not None, -(row[3] or 0), -row[1].int))[:depth + 1]
+    boards._boards, boards._films = boards._build(rows)
+    boards._film_genres = boards._index_genres(boards._boards)
+    boards.loaded = True
+    return boards
+
+
+def ids(page):
+    return [film.id.int for film in page]
+
+
+@pytest.mark.unit
+def test_page_matches_sql_order_and_falls_back_past_depth():
+    boards = leaderboards({1: 7.0, 2: 9.0, 3: 7.0, 4: 5.0, 5: None})
+    # NULL sorts first under ORDER BY rating DESC, ties by id DESC
+    assert ids(boards.page(GENRE, 0, 3)) == [5, 2, 3]
+    assert boards.page(GENRE, 2, 2) is None
+    assert boards.page(uuid.uuid4(), 0, 3) is None
+
+
+@pytest.mark.unit
+def test_small_genre_is_complete():
+    boards = leaderboards({1: 7.0, 2: 9.0})
+    assert ids(boards.page(GENRE, 0, 10)) == [2, 1]
+    assert boards.page(GENRE, 10, 10) == []
+
+
+@pytest.mark.unit
+def test_updates_keep_the_held_prefix_exact():
+    boards = leaderboards({1: 8.0, 2: 9.0, 3: 7.0, 4: 5.0})
+    # A new film ranking inside the top pushes the last one out
+    boards._add_film(FilmRow(film_id(6), "Film 6", 8.5), {GENRE})
+    assert ids(boards.page(GENRE, 0, 3)) == [2, 6, 1]
+    # Dropping below the held films makes it unknown: the servable depth shrinks
+    boards._remove_film(film_id(2))
+    boards._add_film(FilmRow(film_id(2), "Film 2", 1.0), {GENRE})
+    assert ids(boards.page(GENRE, 0, 2)) == [6, 1]
+    assert boards.page(GENRE, 0, 3) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_film_service_serves_rating_pages_from_leaderboards():
+    boards = leaderboards({1: 8.0, 2: 9.0})
+    service = FilmService(session=None, leaderboards=boards)
+    films = await service.get_films(skip=0, limit=2, sort_by="-rating", genre_id=GENRE)
+    assert [film.title for film in films] == ["Film 2", "Film 1"]
+    assert boards.stats()["hits"] == 1
+
+
+class FakeSession:
+    """Answers the leaderboard queries from a dict of film ratings"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "row_number" in sql:
+            self.db["ranked_reads"] += 1
+            rows = [(GENRE, film_id(n), f"Film {n}", rating) for n, rating in self.db["ratings"].items()]
+            return SimpleNamespace(all=lambda: rows)
+        if "genre_film_work" in sql:
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [GENRE]))
+        rating = self.db["ratings"][7]
+        gate = self.db.pop("gate", None)
+        if gate is not None:
+            await gate.wait()
+        return SimpleNamespace(first=lambda: (film_id(7), "Film 7", rating))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_changes_of_one_film_apply_in_order():
+    boards = leaderboards({1: 8.0, 2: 9.0}, depth=5)
+    db = {"ratings": {7: 6.0}, "gate": asyncio.Event(), "ranked_reads": 0}
+    boards.session_factory = lambda: FakeSession(db)
+    gate = db["gate"]
+    # The first change read the old rating and is still in flight when the film is updated again
+    first = asyncio.create_task(boards.entity_changed("FilmWork", film_id(7), "update"))
+    await asyncio.sleep(0)
+    db["ratings"][7] = 9.5
+    second = asyncio.create_task(boards.entity_changed("FilmWork", film_id(7), "update"))
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, second)
+    assert ids(boards.page(GENRE, 0, 5)) == [7, 2, 1]
+    assert not boards._film_locks
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shallow_genres_are_refilled_in_the_background():
+    ratings = {1: 8.0, 2: 9.0, 3: 7.0, 4: 5.0, 5: 4.0, 6: 3.0}
+    boards = leaderboards(ratings, depth=4)
+    db = {"ratings": {n: ratings[n] for n in (3, 4, 5, 6)}, "ranked_reads": 0}
+    boards.session_factory = lambda: FakeSession(db)
+    boards._remove_film(film_id(1))
+    boards._remove_film(film_id(2))
+    await boards.entity_changed("FilmWork", film_id(3), "delete")
+    del db["ratings"][3]
+    # The write path returns before the genre is read again
+    assert db["ranked_reads"] == 0
+    assert boards.page(GENRE, 0, 2) is None
+    await boards._refill_task
+    assert ids(boards.page(GENRE, 0, 3)) == [4, 5, 6]
+    assert boards.stats()["refills"] == 1
+    await boards.stop()
@@ -0,0 +1,60 @@
+import pytest
+from httpx import AsyncClient
+
+from main import app
+from main_app.core.repositories import InvalidLinkError
+
+FILM = "550e8400-e29b-41d4-a716-446655440000"
+GENRE = "6f1c2d3e-4b5a-4c6d-8e7f-901234567890"
+MISSING = "7a2b3c4d-5e6f-4a1b-9c2d-3e4f5a6b7c8d"
+
+
+class MockFilmService:
+    def __init__(self):
+        self.calls = []
+
+    async def change_links(self, kind, operation, links):
+        self.calls.append((kind, operation, links))
+        if any(MISSING in map(str, link) for link in links):
+            raise InvalidLinkError("Unknown film, genre or person id")
+        return {"requested": len(links), "changed": len(links), "films": len({link[0] for link in links})}
+
+
+@pytest.fixture
+def film_service():
+    from main_app.core.dependencies import get_film_service
+    service = MockFilmService()
+    app.dependency_overrides[get_film_service] = lambda: service
+    yield service
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+@pytest.mark.unit
+async def test_attach_and_detach_genres(film_service):
+    body = {"links": [{"film_id": FILM, "genre_id": GENRE}]}
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        attached = await ac.post("/api/v1/links/genres/attach/", json=body)
+        detached = await ac.post("/api/v1/links/genres/detach/", json=body)
+    assert attached.status_code == 200 and detached.status_code == 200
+    assert attached.json() == {"requested": 1, "changed": 1, "films": 1}
+    assert [call[:2] for call in film_service.calls] == [("genres", "attach"), ("genres", "detach")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+@pytest.mark.unit
+async def test_person_links_validate_roles_and_references(film_service):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        attached = await ac.post("/api/v1/links/persons/attach/", json={
+            "links": [{"film_id": FILM, "person_id": GENRE, "role": "writer"}]})
+        unknown = await ac.post("/api/v1/links/persons/attach/", json={
+            "links": [{"film_id": FILM, "person_id": MISSING, "role": "actor"}]})
+        bad_role = await ac.post("/api/v1/links/persons/detach/", json={
+            "links": [{"film_id": FILM, "person_id": GENRE, "role": "grip"}]})
+        empty = await ac.post("/api/v1/links/persons/detach/", json={"links": []})
+    assert attached.status_code == 200
+    assert str(film_service.calls[0][2][0][1]) == GENRE and film_service.calls[0][2][0][2] == "writer"
+    assert unknown.status_code == 400
+    assert bad_role.status_code == 422 and empty.status_code == 422
@@ -16,4 +16,15 @@ async def test_health():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.get("/health")
     assert response.status_code == 200
-    assert response.json()["status"] == "healthy" 
\ No newline at end of file
+    assert response.json()["status"] == "healthy" 
+@pytest.mark.unit
+def test_app_import_defers_numpy():
+    # Optional engines import NumPy when they are built, not when the app is imported
+    import os
+    import subprocess
+    import sys
+    result = subprocess.run(
+        [sys.executable, "-c", "import main, sys; print('numpy' in sys.modules)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "False"
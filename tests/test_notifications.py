@@ -0,0 +1,194 @@
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from main_app.core.notifications import CHANNEL, ChangeNotificationListener, listen_dsn
+
+FILM_ID = uuid.UUID("550e8400-e29b-41d4-a716-446655440000")
+
+
+class RecordingListener:
+    def __init__(self):
+        self.changes = []
+        self.flushes = 0
+
+    async def entity_changed(self, entity_type, entity_id, operation):
+        self.changes.append((entity_type, entity_id, operation))
+
+    async def invalidate_all(self):
+        self.flushes += 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.callbacks = {}
+        self.on_termination = None
+
+    def add_termination_listener(self, callback):
+        self.on_termination = callback
+
+    async def add_listener(self, channel, callback):
+        self.callbacks[channel] = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def execute(self, statement):
+        return "SELECT 1"
+
+    async def close(self, timeout=None):
+        self.closed = True
+
+    def notify(self, payload, pid=1234):
+        self.callbacks[CHANNEL](self, pid, CHANNEL, payload)
+
+    def drop(self):
+        self.closed = True
+        self.on_termination(self)
+
+
+def payload(entity_type="FilmWork", op="update"):
+    return json.dumps({"type": entity_type, "id": str(FILM_ID), "op": op})
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+def test_listen_dsn_drops_the_sqlalchemy_driver():
+    assert listen_dsn("postgresql+asyncpg://app:secret@db:5432/movies") == "postgresql://app:secret@db:5432/movies"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_notifications_reach_local_listeners():
+    connections = []
+
+    async def connect(dsn, timeout=None):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    listener = RecordingListener()
+    notifications = ChangeNotificationListener("postgresql://db", lambda: [listener], connect=connect)
+    await notifications.start()
+    try:
+        connections[0].notify(payload(op="delete"))
+        connections[0].notify("not json")
+        await settle()
+    finally:
+        await notifications.stop()
+
+    assert listener.changes == [("FilmWork", FILM_ID, "delete")]
+    assert notifications.stats()["received"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_reconnect_flushes_every_listener():
+    connections = []
+
+    async def connect(dsn, timeout=None):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    listener = RecordingListener()
+    notifications = ChangeNotificationListener(
+        "postgresql://db", lambda: [listener], reconnect_delay=0, connect=connect
+    )
+    await notifications.start()
+    try:
+        connections[0].drop()
+        await settle()
+        assert len(connections) == 2
+        assert listener.flushes == 1
+        connections[1].notify(payload("Genre"))
+        await settle()
+    finally:
+        await notifications.stop()
+
+    assert listener.changes == [("Genre", FILM_ID, "update")]
+    assert notifications.stats()["reconnects"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_first_connect_is_retried_in_background():
+    attempts = []
+
+    async def connect(dsn, timeout=None):
+        attempts.append(dsn)
+        if len(attempts) == 1:
+            raise OSError("connection refused")
+        return FakeConnection()
+
+    listener = RecordingListener()
+    notifications = ChangeNotificationListener(
+        "postgresql://db", lambda: [listener], reconnect_delay=0, connect=connect
+    )
+    await notifications.start()
+    try:
+        await settle()
+        assert notifications.connected
+        # Caches were loaded without LISTEN, so they are flushed once connected
+        assert listener.flushes == 1
+    finally:
+        await notifications.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_own_writes_are_skipped_and_duplicates_coalesced():
+    connections = []
+
+    async def connect(dsn, timeout=None):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    listener = RecordingListener()
+    notifications = ChangeNotificationListener("postgresql://db", lambda: [listener], connect=connect)
+    record = SimpleNamespace(info={})
+    notifications._track_pid(SimpleNamespace(driver_connection=SimpleNamespace(get_server_pid=lambda: 77)), record)
+    await notifications.start()
+    try:
+        # Applied by this worker's services already
+        connections[0].notify(payload(), pid=77)
+        # Queued twice before the dispatcher ran: handled once
+        connections[0].notify(payload(op="delete"))
+        connections[0].notify(payload(op="delete"))
+        await settle()
+        notifications._forget_pid(None, record)
+        connections[0].notify(payload(), pid=77)
+        await settle()
+    finally:
+        await notifications.stop()
+
+    assert listener.changes == [("FilmWork", FILM_ID, "delete"), ("FilmWork", FILM_ID, "update")]
+    assert notifications.stats()["skipped_own"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_notification_invalidates_every_listener():
+    connections = []
+
+    async def connect(dsn, timeout=None):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    listener = RecordingListener()
+    notifications = ChangeNotificationListener("postgresql://db", lambda: [listener], connect=connect)
+    await notifications.start()
+    try:
+        connections[0].notify(json.dumps({"type": "FilmWork", "op": "flush"}))
+        await settle()
+    finally:
+        await notifications.stop()
+
+    assert listener.flushes == 1
+    assert listener.changes == []
@@ -2,8 +2,12 @@ import pytest
 from httpx import AsyncClient
 from main import app
 from unittest.mock import AsyncMock
+from main_app.core.graph import GraphUnavailableError
+from main_app.core.pagination import InvalidCursorError
 
 VALID_UUID = "550e8400-e29b-41d4-a716-446655440000"
+OTHER_UUID = "550e8400-e29b-41d4-a716-446655440001"
+UNAVAILABLE_UUID = "550e8400-e29b-41d4-a716-446655440002"
 
 class MockPersonService:
     async def search_persons(self, *args, **kwargs):
@@ -16,6 +20,35 @@ class MockPersonService:
         return None
     async def delete_person(self, person_id):
         return str(person_id) == VALID_UUID
+    async def get_person_detail(self, person_id, films_limit=10, fields=None):
+        if str(person_id) != VALID_UUID:
+            return None
+        return {
+            "uuid": VALID_UUID,
+            "full_name": "Test Person",
+            "films": [{"uuid": VALID_UUID, "title": "Test Film", "imdb_rating": 8.5}][:films_limit],
+            "roles": {"actor": 3, "writer": 0, "director": 1},
+            "films_total": 3,
+            "films_cursor": "cursor"
+        }
+    async def get_collaborators(self, person_id, limit=20):
+        if str(person_id) != VALID_UUID:
+            return None
+        return [{"uuid": OTHER_UUID, "full_name": "Co Star", "shared_films": 3}][:limit]
+    async def get_connection(self, source_id, target_id, max_degrees=6):
+        if str(target_id) == UNAVAILABLE_UUID:
+            raise GraphUnavailableError("Collaboration graph is not available")
+        if str(target_id) != OTHER_UUID:
+            return None
+        return {
+            "degrees": 1,
+            "persons": [{"uuid": VALID_UUID, "full_name": "Test Person"}, {"uuid": OTHER_UUID, "full_name": "Co Star"}],
+            "films": [{"uuid": VALID_UUID, "title": "Test Film"}]
+        }
+    async def get_person_films(self, person_id, skip=0, limit=50, cursor=None, columns=None):
+        if cursor == "bad":
+            raise InvalidCursorError("Malformed cursor: bad")
+        return [type("Film", (), {"id": VALID_UUID, "title": "Test Film", "rating": 8.5})()]
 
 @pytest.fixture(autouse=True)
 def override_persons_dependency():
@@ -52,4 +85,42 @@ async def test_persons_delete():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.delete(f"/api/v1/persons/{VALID_UUID}/")
     assert response.status_code == 200
-    assert response.json()["message"] == "Person deleted successfully" 
\ No newline at end of file
+    assert response.json()["message"] == "Person deleted successfully" 
+
+@pytest.mark.asyncio
+async def test_persons_detail():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/persons/{VALID_UUID}/?films_limit=1")
+    assert response.status_code == 200
+    assert response.json()["roles"]["actor"] == 3
+    assert response.json()["films_cursor"] == "cursor"
+    assert len(response.json()["films"]) == 1
+
+@pytest.mark.asyncio
+async def test_persons_films_next_cursor():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/persons/{VALID_UUID}/film/?page_size=1")
+        bad = await ac.get(f"/api/v1/persons/{VALID_UUID}/film/?cursor=bad")
+    assert response.status_code == 200
+    assert "x-next-cursor" in response.headers
+    assert bad.status_code == 400
+
+@pytest.mark.asyncio
+async def test_person_collaborators():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/persons/{VALID_UUID}/collaborators/?limit=5")
+        missing = await ac.get(f"/api/v1/persons/{OTHER_UUID}/collaborators/")
+    assert response.status_code == 200
+    assert response.json()[0]["shared_films"] == 3
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_person_path():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get(f"/api/v1/persons/{VALID_UUID}/path/{OTHER_UUID}/")
+        unconnected = await ac.get(f"/api/v1/persons/{VALID_UUID}/path/{VALID_UUID[:-1]}9/?max_degrees=3")
+        unavailable = await ac.get(f"/api/v1/persons/{VALID_UUID}/path/{UNAVAILABLE_UUID}/")
+    assert response.status_code == 200
+    assert response.json()["degrees"] == 1
+    assert unconnected.status_code == 404
+    assert unavailable.status_code == 503
@@ -0,0 +1,109 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import delete, insert, text
+from sqlalchemy.exc import DBAPIError
+
+from database import AsyncSessionLocal, dispose_engines
+from main import app
+from main_app import models
+from main_app.core.dependencies import get_service_container
+
+# Exact statement counts of the read endpoints against a migrated database
+# (alembic upgrade head). A changed count is an N+1 or an overfetch to look at.
+pytestmark = [pytest.mark.integration, pytest.mark.asyncio]
+
+
+@pytest_asyncio.fixture
+async def catalog():
+    """One film with two genres and an actor, writer and director; removed afterwards"""
+    film_id = uuid.uuid4()
+    # A type of its own keeps the lists to this film on a shared database
+    film_type = f"query-count-{film_id.hex[:8]}"
+    genre_ids = [uuid.uuid4(), uuid.uuid4()]
+    person_ids = {role: uuid.uuid4() for role in ("actor", "writer", "director")}
+    try:
+        async with AsyncSessionLocal() as session:
+            migrated = (await session.execute(text("SELECT to_regclass('content.film_work')"))).scalar()
+    except (OSError, DBAPIError) as e:
+        await dispose_engines()
+        pytest.skip(f"database unavailable: {e}")
+    if migrated is None:
+        await dispose_engines()
+        pytest.skip("database schema missing, run alembic upgrade head")
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(models.FilmWork), [
+            {"id": film_id, "title": "Query count", "rating": 7.5, "type": film_type}
+        ])
+        await session.execute(insert(models.Genre), [
+            {"id": genre_id, "name": f"Genre {genre_id}"} for genre_id in genre_ids
+        ])
+        await session.execute(insert(models.Person), [
+            {"id": person_id, "full_name": f"{role} {person_id}"} for role, person_id in person_ids.items()
+        ])
+        await session.execute(insert(models.genre_film_work), [
+            {"film_work_id": film_id, "genre_id": genre_id} for genre_id in genre_ids
+        ])
+        await session.execute(insert(models.person_film_work), [
+            {"film_work_id": film_id, "person_id": person_id, "role": role}
+            for role, person_id in person_ids.items()
+        ])
+        await session.commit()
+
+    # Facet counts of an earlier request would be served from the cache
+    get_service_container().get_facet_cache().clear()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac, film_id, film_type, person_ids["actor"]
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.genre_film_work).where(models.genre_film_work.c.film_work_id == film_id))
+        await session.execute(delete(models.person_film_work).where(models.person_film_work.c.film_work_id == film_id))
+        await session.execute(delete(models.FilmWork).where(models.FilmWork.id == film_id))
+        await session.execute(delete(models.Genre).where(models.Genre.id.in_(genre_ids)))
+        await session.execute(delete(models.Person).where(models.Person.id.in_(list(person_ids.values()))))
+        await session.commit()
+    # Pooled asyncpg connections belong to this test's event loop
+    await dispose_engines()
+
+
+async def test_film_list_query_count(catalog, assert_query_count):
+    ac, film_id, film_type, _ = catalog
+    with assert_query_count(1):
+        response = await ac.get(f"/api/v1/films/?type={film_type}")
+    assert [item["uuid"] for item in response.json()] == [str(film_id)]
+
+
+async def test_film_list_with_expand_query_count(catalog, assert_query_count):
+    ac, _, film_type, _ = catalog
+    with assert_query_count(2):
+        response = await ac.get(f"/api/v1/films/?type={film_type}&expand=genres,persons")
+    assert len(response.json()[0]["genres"]) == 2
+
+
+async def test_film_list_with_facets_query_count(catalog, assert_query_count):
+    ac, _, film_type, _ = catalog
+    with assert_query_count(2):
+        response = await ac.get(f"/api/v1/films/?type={film_type}&facets=genre,type,decade,rating_bucket")
+    assert len(response.json()["facets"]["genre"]) == 2
+
+
+async def test_film_detail_query_count(catalog, assert_query_count):
+    ac, film_id, _, _ = catalog
+    # Film columns, genres and one statement per role
+    with assert_query_count(5):
+        response = await ac.get(f"/api/v1/films/{film_id}/")
+    assert len(response.json()["actors"]) == 1
+    with assert_query_count(1):
+        response = await ac.get(f"/api/v1/films/{film_id}/?fields=uuid,title")
+    assert response.status_code == 200
+
+
+async def test_person_detail_query_count(catalog, assert_query_count):
+    ac, film_id, _, actor_id = catalog
+    # Person columns, top films and role counts
+    with assert_query_count(3):
+        response = await ac.get(f"/api/v1/persons/{actor_id}/")
+    assert response.json()["films"][0]["uuid"] == str(film_id)
@@ -0,0 +1,36 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+
+from main import app
+from main_app.core.query_stats import capture_queries, instrument_engine, statement_shape
+
+
+@pytest.mark.unit
+def test_repeated_statement_shapes_are_flagged():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with capture_queries() as stats, engine.connect() as conn:
+        for film_id in range(6):
+            conn.execute(text("SELECT :film_id AS id"), {"film_id": film_id})
+        conn.execute(text("SELECT 1"))
+    assert stats.count == 7
+    assert stats.repeated(5) == [("SELECT ? AS id", 6)]
+
+
+@pytest.mark.unit
+def test_statement_shape_ignores_parameters():
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3)") == statement_shape(
+        "SELECT * FROM t WHERE id IN ($1, $2)"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_query_count_header_and_fixture(assert_query_count, monkeypatch):
+    from main_app.core.config import config_provider
+    monkeypatch.setattr(config_provider.settings, "query_stats_enabled", True)
+    with assert_query_count(0):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/health")
+    assert response.headers["X-Query-Count"] == "0"
@@ -0,0 +1,100 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from main_app.core.repositories import FilmRepository, GenreRepository
+from main_app.core.services import FilmService
+
+FILM_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+class ReturningSession:
+    """Compiles statements for Postgres and answers them with canned RETURNING rows"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        rows = self.rows
+        return SimpleNamespace(
+            all=lambda: rows,
+            scalar_one_or_none=lambda: rows[0] if rows else None,
+        )
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_update_returns_the_updated_row():
+    film = SimpleNamespace(id=FILM_ID, title="Heat")
+    session = ReturningSession([film])
+    assert await FilmRepository(session).update(FILM_ID, {"title": "Heat", "rating": None}) is film
+    statement = session.statements[0]
+    assert statement.startswith("UPDATE content.film_work SET title=")
+    assert "rating" not in statement.split("WHERE")[0]
+    assert "RETURNING content.film_work.id" in statement
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_update_of_missing_id_returns_none():
+    session = ReturningSession()
+    assert await FilmRepository(session).update(FILM_ID, {"title": "Heat"}) is None
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_delete_of_missing_id_returns_false():
+    session = ReturningSession()
+    assert await GenreRepository(session).delete(FILM_ID) is False
+    assert await GenreRepository(session).delete_unlinking(FILM_ID) is None
+    session.statements.pop()
+    assert len(session.statements) == 1
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_bulk_delete_removes_links_in_the_same_statement():
+    genre_id, person_id = uuid.uuid4(), uuid.uuid4()
+    unlinked = ([genre_id], [person_id, person_id])
+    session = ReturningSession([(FILM_ID, *unlinked), (uuid.uuid4(), *unlinked)])
+    deleted, unlinked_ids = await FilmRepository(session).bulk_delete_unlinking([FILM_ID, uuid.uuid4()])
+    assert deleted == 2
+    assert unlinked_ids == {"Genre": [genre_id], "Person": [person_id]}
+    assert len(session.statements) == 1
+    statement = session.statements[0]
+    assert "deleted_genre_film_work AS \n(DELETE FROM content.genre_film_work" in statement
+    assert "deleted_person_film_work AS \n(DELETE FROM content.person_film_work" in statement
+    assert "DELETE FROM content.film_work WHERE content.film_work.id IN" in statement
+    assert "RETURNING content.person_film_work.person_id" in statement
+    assert 'RETURNING content.film_work.id, (SELECT array_agg(deleted_genre_film_work.genre_id)' in statement
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_film_delete_notifies_the_unlinked_persons():
+    person_id = uuid.uuid4()
+    changes = []
+
+    class Recorder:
+        async def entity_changed(self, entity_type, entity_id, operation):
+            changes.append((entity_type, entity_id, operation))
+
+        async def invalidate_all(self):
+            pass
+
+    session = ReturningSession([(FILM_ID, None, [person_id])])
+    assert await FilmService(session, listeners=[Recorder()]).delete(FILM_ID) is True
+    # Listeners skip this worker's own trigger notifications, so the service reports the persons itself
+    assert changes == [("FilmWork", FILM_ID, "delete"), ("Person", person_id, "update")]
@@ -0,0 +1,50 @@
+import uuid
+
+import pytest
+
+from main_app.core.similarity import FeatureMatrix, compute_similarities, top_k_similar
+
+
+def film(n):
+    return uuid.UUID(int=n).bytes
+
+
+def feature(kind, n):
+    return (b"g" if kind == "genre" else b"p") + uuid.UUID(int=1000 + n).bytes
+
+
+def matrix(credits):
+    return FeatureMatrix.build(
+        [film(f) for f, _, _ in credits], [feature(kind, n) for _, kind, n in credits], [kind for _, kind, _ in credits]
+    )
+
+
+# Films 1 and 2 share a director and a genre, 1 and 3 only the genre, 4 shares nothing
+CREDITS = [
+    (1, "genre", 0), (1, "director", 1), (1, "actor", 2),
+    (2, "genre", 0), (2, "director", 1), (2, "actor", 3),
+    (3, "genre", 0), (3, "actor", 4),
+    (4, "genre", 5), (4, "writer", 6),
+]
+
+
+@pytest.mark.unit
+def test_shared_director_outranks_shared_genre():
+    similar = top_k_similar(matrix(CREDITS), 0, k=5, max_df=100)
+    assert [other for other, _ in similar] == [1, 2]
+    assert similar[0][1] > similar[1][1] > 0
+    assert top_k_similar(matrix(CREDITS), 3, k=5, max_df=100) == []
+
+
+@pytest.mark.unit
+def test_frequent_features_score_but_do_not_generate_candidates():
+    # With max_df=2 the genre (on 3 films) no longer makes film 3 a candidate of film 1
+    similar = top_k_similar(matrix(CREDITS), 0, k=5, max_df=2)
+    assert [other for other, _ in similar] == [1]
+    assert similar[0][1] == pytest.approx(top_k_similar(matrix(CREDITS), 0, k=5, max_df=100)[0][1])
+
+
+@pytest.mark.unit
+def test_process_pool_matches_single_process():
+    features = matrix(CREDITS)
+    assert compute_similarities(features, k=2, workers=2, chunk_size=1) == compute_similarities(features, k=2)
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from main_app.core.services import FilmService
+from main_app.core.singleflight import SingleFlight
+
+FILM_ID = uuid.UUID("550e8400-e29b-41d4-a716-446655440000")
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"title": "Test Film"}
+
+    results = await asyncio.gather(*[flight.do("film", load) for _ in range(5)])
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return 42
+
+    leader = asyncio.ensure_future(flight.do("film", load))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("film", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == 42
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+class FactorySession:
+    """Session handed out by the session factory; records its lifetime"""
+
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        self.log.append("open")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.log.append("close")
+        return False
+
+    async def execute(self, statement, params=None):
+        await asyncio.sleep(0.01)
+        row = SimpleNamespace(id=FILM_ID, title="Heat")
+        return SimpleNamespace(one_or_none=lambda: row)
+
+
+class ClosedSession:
+    async def execute(self, statement, params=None):
+        raise AssertionError("a shared read must not use the request session")
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_shared_film_read_runs_on_its_own_session():
+    log = []
+    flight = SingleFlight()
+
+    def service():
+        return FilmService(ClosedSession(), single_flight=flight, session_factory=lambda: FactorySession(log))
+
+    details = await asyncio.gather(*[service().get_film_detail(FILM_ID, fields=("uuid", "title")) for _ in range(3)])
+    assert details == [{"uuid": str(FILM_ID), "title": "Heat"}] * 3
+    assert log == ["open", "close"]
+    assert flight.stats()["coalesced"] == 2
@@ -0,0 +1,74 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+
+from main import app
+from main_app.core.config import config_provider
+from main_app.core.slow_queries import SlowQueryLog, parameter_shape
+
+
+@pytest.mark.unit
+def test_slow_queries_are_kept_in_bounded_buffer():
+    engine = create_engine("sqlite://")
+    log = SlowQueryLog(threshold_ms=0, size=3)
+    log.instrument(engine)
+    with engine.connect() as conn:
+        for value in range(5):
+            conn.execute(text("SELECT :value"), {"value": value})
+    snapshot = log.snapshot()
+    assert log.recorded == 5
+    assert len(snapshot["entries"]) == 3
+    assert snapshot["entries"][0]["parameters"] == ["int"]
+    # No running event loop: the plan is left empty instead of failing
+    assert snapshot["entries"][0]["plan"] is None
+
+
+@pytest.mark.unit
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"title": "secret", "limit": 10}) == {"title": "str", "limit": "int"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_slow_queries_endpoint(monkeypatch):
+    from main_app.core.dependencies import get_slow_query_log
+    monkeypatch.setattr(config_provider.settings, "admin_token", "secret")
+    log = SlowQueryLog(threshold_ms=0, size=10)
+    log.entries.append({"at": "now", "duration_ms": 350.0, "caller": "FilmRepository.search",
+                        "statement": "SELECT 1", "parameters": [], "shape": "SELECT ?"})
+    log.plans["SELECT ?"] = ["Result  (cost=0.00..0.01 rows=1 width=4)"]
+    app.dependency_overrides[get_slow_query_log] = lambda: log
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/api/v1/admin/slow-queries/", headers={"X-Admin-Token": "secret"})
+            cleared = await ac.delete("/api/v1/admin/slow-queries/", headers={"X-Admin-Token": "secret"})
+    finally:
+        app.dependency_overrides = {}
+    assert response.status_code == 200
+    entry = response.json()["entries"][0]
+    assert entry["caller"] == "FilmRepository.search"
+    assert entry["plan"][0].startswith("Result")
+    assert cleared.status_code == 204
+    assert not log.entries
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_slow_queries_disabled(monkeypatch):
+    monkeypatch.setattr(config_provider.settings, "admin_token", "secret")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/admin/slow-queries/", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_slow_queries_require_admin_token(monkeypatch):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        unconfigured = await ac.get("/api/v1/admin/slow-queries/", headers={"X-Admin-Token": ""})
+        monkeypatch.setattr(config_provider.settings, "admin_token", "secret")
+        missing = await ac.delete("/api/v1/admin/slow-queries/")
+        wrong = await ac.get("/api/v1/admin/slow-queries/", headers={"X-Admin-Token": "guess"})
+    assert unconfigured.status_code == 403
+    assert missing.status_code == 401
+    assert wrong.status_code == 401
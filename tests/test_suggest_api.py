@@ -0,0 +1,106 @@
+import pytest
+from httpx import AsyncClient
+from main import app
+import uuid
+from types import SimpleNamespace
+
+from main_app.core.suggest import PrefixIndex, SuggestIndex
+
+VALID_UUID = "550e8400-e29b-41d4-a716-446655440000"
+
+class MockFilmService:
+    async def suggest_films(self, prefix, limit=10):
+        return [type("Film", (), {"id": VALID_UUID, "title": "Test Film", "rating": 8.5})()]
+
+class MockPersonService:
+    async def suggest_persons(self, prefix, limit=10):
+        return [type("Person", (), {"id": VALID_UUID, "full_name": "Test Person", "films_count": 2})()]
+
+@pytest.fixture(autouse=True)
+def override_suggest_dependencies():
+    from main_app.core.dependencies import get_film_service, get_person_service
+    app.dependency_overrides[get_film_service] = lambda: MockFilmService()
+    app.dependency_overrides[get_person_service] = lambda: MockPersonService()
+    yield
+    app.dependency_overrides = {}
+
+@pytest.mark.asyncio
+async def test_suggest_database_fallback():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/suggest?q=te")
+    assert response.status_code == 200
+    assert response.json()["films"][0]["title"] == "Test Film"
+    assert response.json()["persons"][0]["films_count"] == 2
+
+@pytest.mark.asyncio
+async def test_suggest_from_index():
+    from main_app.core.dependencies import get_suggest_index
+    index = SuggestIndex(session_factory=None)
+    index.films.load([(uuid.uuid4(), "The Godfather", 9.2), (uuid.uuid4(), "Godzilla", 6.0), (uuid.uuid4(), "Heat", 8.3)])
+    index.persons.load([(uuid.uuid4(), "Francis Ford Coppola", 20)])
+    index.loaded = True
+    app.dependency_overrides[get_suggest_index] = lambda: index
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/v1/suggest?q=GOD")
+        by_word = await ac.get("/api/v1/suggest?q=ford")
+    assert [film["title"] for film in response.json()["films"]] == ["The Godfather", "Godzilla"]
+    assert by_word.json()["persons"][0]["full_name"] == "Francis Ford Coppola"
+
+
+@pytest.mark.unit
+def test_prefix_index_keeps_the_best_matches_and_drops_only_matching_prefixes_on_writes():
+    index = PrefixIndex()
+    rows = [(uuid.UUID(int=n), f"Film {n:03d}", float(n % 17)) for n in range(300)]
+    index.load(rows)
+    index.upsert(uuid.uuid4(), "Heat", 8.3)
+    expected = sorted(rows, key=lambda row: (-row[2], row[1]))
+    assert [row[0] for row in index.search("film", 10)] == [row[0] for row in expected[:10]]
+    index.search("he", 1)
+    assert {"film", "he"} <= set(index._cache)
+
+    best = uuid.UUID(int=1000)
+    index.upsert(best, "Film best", 99.0)
+    # Prefixes of the written title are recomputed, others stay cached
+    assert "film" not in index._cache and "he" in index._cache
+    assert index.search("fil", 1)[0][0] == best
+    assert index.search("be", 1)[0][0] == best
+    index.remove(best)
+    assert index.search("be", 1) == []
+
+
+class PersonCountSession:
+    def __init__(self, row):
+        self.row = row
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        return SimpleNamespace(first=lambda: self.row)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_person_films_count_follows_link_writes():
+    person_id = uuid.uuid4()
+    index = SuggestIndex(session_factory=lambda: PersonCountSession((person_id, "Al Pacino", 3)))
+    index.persons.load([(person_id, "Al Pacino", 2)])
+    index.loaded = True
+    assert index.suggest("pacino")["persons"][0]["films_count"] == 2
+    # FilmService announces the persons of attached or detached links
+    await index.entity_changed("Person", person_id, "update")
+    assert index.suggest("pacino")["persons"][0]["films_count"] == 3
+
+
+@pytest.mark.unit
+def test_database_fallback_matches_word_starts_like_the_index():
+    from sqlalchemy.dialects import postgresql
+    from main_app import models
+    from main_app.core.repositories import word_prefix_match
+    compiled = word_prefix_match(models.FilmWork.title, "Godf.").compile(dialect=postgresql.dialect())
+    assert "lower(content.film_work.title) LIKE" in str(compiled)
+    assert "lower(content.film_work.title) ~" in str(compiled)
+    assert r"\mgodf\." in compiled.params.values()